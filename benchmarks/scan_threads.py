@@ -0,0 +1,51 @@
+"""
+Benchmarks directory traversal throughput (files/sec) as the number of
+scan worker threads grows.
+
+Usage:
+    python benchmarks/scan_threads.py PATH [--threads 1 2 4 8] [--repeat 1]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.traversal import create_walker
+
+def run_once(path, workers):
+    walker = create_walker(path, workers=workers)
+    files = dirs = 0
+    start = time.perf_counter()
+    for item in walker.walk():
+        if item['type'] == 'file':
+            files += 1
+        else:
+            dirs += 1
+    return files, dirs, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan throughput vs. worker thread count")
+    parser.add_argument("path", help="Directory tree to scan")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per thread count (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'files':>10} {'dirs':>8} {'seconds':>9} {'files/sec':>11} {'speedup':>8}")
+    baseline = None
+    for workers in args.threads:
+        best = None
+        for _ in range(args.repeat):
+            result = run_once(args.path, workers)
+            if best is None or result[2] < best[2]:
+                best = result
+        files, dirs, elapsed = best
+        rate = files / elapsed if elapsed > 0 else 0.0
+        if baseline is None:
+            baseline = rate
+        speedup = rate / baseline if baseline else 0.0
+        print(f"{workers:>8} {files:>10} {dirs:>8} {elapsed:>9.2f} {rate:>11.0f} {speedup:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import re
 
 # Define categories
 CAT_SYSTEM = "Essential System Files"
@@ -11,13 +12,19 @@ CAT_USER = "Other User Files"
 CAT_UNKNOWN = "Unknown"
 
 # Known paths and extensions
-SYSTEM_PATHS = [
-    os.environ.get('SystemRoot', 'C:\\Windows').lower()
-]
-PROGRAM_FILES_PATHS = [
-    os.environ.get('ProgramFiles', 'C:\\Program Files').lower(),
-    os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)').lower()
-]
+if os.name == 'nt':
+    SYSTEM_PATHS = [
+        os.environ.get('SystemRoot', 'C:\\Windows').lower()
+    ]
+    PROGRAM_FILES_PATHS = [
+        os.environ.get('ProgramFiles', 'C:\\Program Files').lower(),
+        os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)').lower()
+    ]
+else:
+    # Matched as plain prefixes, so each ends in a separator to keep /library out of /lib
+    SYSTEM_PATHS = ['/bin/', '/boot/', '/etc/', '/lib/', '/lib32/', '/lib64/', '/sbin/', '/usr/', '/system/']
+    PROGRAM_FILES_PATHS = ['/opt/', '/applications/', '/snap/', '/var/lib/flatpak/']
+
 # More specific user paths
 DOWNLOADS_PATH = os.path.expanduser('~/Downloads').lower()
 DOCUMENTS_PATH = os.path.expanduser('~/Documents').lower()
@@ -33,52 +40,215 @@ SAFE_DELETE_FOLDERS = ['temp', 'tmp', 'cache', 'prefetch', '__pycache__']
 
 DEV_PROJECT_INDICATORS = ['.git', 'node_modules', 'package.json', 'requirements.txt', '.sln', 'venv', '.idea', '.vscode']
 
+# Checked before the development project test, then after it; first match wins
+_PREFIX_RULES_BEFORE_DEV = [(CAT_SYSTEM, SYSTEM_PATHS), (CAT_APP, PROGRAM_FILES_PATHS)]
+_PREFIX_RULES_AFTER_DEV = [(CAT_USER_DOWNLOADS, [DOWNLOADS_PATH]), (CAT_USER_DOCUMENTS, [DOCUMENTS_PATH]),
+                           (CAT_USER, list(USER_PATHS.values()))]
+
+MAX_CACHED_DIRECTORIES = 100000
+
+
+def _compile_prefixes(rules):
+    """
+    Compiles [(category, prefixes)] into one anchored regex whose alternatives
+    keep the rule order, plus a map from group name to category.
+    """
+    alternatives = []
+    categories = {}
+    for category, prefixes in rules:
+        for prefix in prefixes:
+            group = f"p{len(alternatives)}"
+            alternatives.append(f"(?P<{group}>{re.escape(prefix)})")
+            categories[group] = category
+    if not alternatives:
+        return None, categories
+    return re.compile('|'.join(alternatives)), categories
+
+
+def _match_prefix(compiled, lower_path):
+    regex, categories = compiled
+    if regex is None:
+        return None
+    match = regex.match(lower_path)
+    return categories[match.lastgroup] if match else None
+
+
+def _home_and_parents():
+    """The home directory and its parents hold projects but never are one themselves."""
+    containers = set()
+    path = os.path.normcase(os.path.expanduser('~'))
+    while True:
+        containers.add(path.lower())
+        parent = os.path.dirname(path)
+        if parent == path:
+            return frozenset(containers)
+        path = parent
+
+
+_BEFORE_DEV = _compile_prefixes(_PREFIX_RULES_BEFORE_DEV)
+_AFTER_DEV = _compile_prefixes(_PREFIX_RULES_AFTER_DEV)
+_ALL_PREFIXES = tuple(prefix for _, prefixes in _PREFIX_RULES_BEFORE_DEV + _PREFIX_RULES_AFTER_DEV
+                      for prefix in prefixes)
+_SAFE_FOLDERS = frozenset(SAFE_DELETE_FOLDERS)
+_SAFE_EXTENSIONS = frozenset(SAFE_DELETE_EXT)
+_DEV_INDICATORS = frozenset(DEV_PROJECT_INDICATORS)
+_PROJECT_CONTAINERS = _home_and_parents()
+
+
+class DirectoryRule:
+    """
+    The categorization decision for one directory. Everything that depends
+    only on the directory (path prefixes, safe-to-delete parents, development
+    project status) is decided once; categorize() only looks at the entry's
+    own name.
+    """
+    __slots__ = ('category', 'safe', 'dev_project', 'boundary', 'lower_prefix', 'rules')
+
+    def __init__(self, category, safe, dev_project, boundary, lower_prefix, rules=None):
+        self.category = category
+        self.safe = safe
+        self.dev_project = dev_project
+        # A rule prefix ends below this directory, inside an entry's name,
+        # so the prefix rules have to look at each entry's full path
+        self.boundary = boundary
+        self.lower_prefix = lower_prefix
+        # User rules (core.category_rules.CategoryRules), checked before the built-in ones
+        self.rules = rules
+
+    def categorize(self, name, is_dir=False, size=0, mtime=None):
+        """
+        Returns the category of the entry `name` inside this directory. Size
+        and mtime are only looked at by user rules with size or age limits.
+        """
+        lower_name = name.lower()
+        if self.rules:
+            category = self.rules.match(self.lower_prefix + lower_name, lower_name, is_dir, size, mtime)
+            if category is not None:
+                return category
+        if self.safe:
+            return CAT_SAFE_DELETE
+        if lower_name in _SAFE_FOLDERS:
+            return CAT_SAFE_DELETE
+        dot = lower_name.rfind('.')
+        if dot != -1 and lower_name[dot:] in _SAFE_EXTENSIONS:
+            return CAT_SAFE_DELETE
+        if not self.boundary:
+            return self.category
+        lower_path = self.lower_prefix + lower_name
+        category = _match_prefix(_BEFORE_DEV, lower_path)
+        if category is None:
+            if self.dev_project:
+                return CAT_DEV_PROJECT
+            category = _match_prefix(_AFTER_DEV, lower_path) or CAT_UNKNOWN
+        return category
+
+
+class Categorizer:
+    """
+    Categorizes paths with one memoized DirectoryRule per directory, so a file
+    costs a dict lookup and a name check instead of a scan of its folder.
+
+    A directory belongs to a development project if it contains one of
+    DEV_PROJECT_INDICATORS, is named like one (node_modules, venv, ...), or
+    its parent does; the status is inherited by the whole subtree. The home
+    directory and its parents only count by name, so a stray ~/.vscode
+    doesn't turn every user file into a project file.
+
+    User rules (core.category_rules.CategoryRules) take precedence over the
+    built-in ones; they match per entry, as they can look at size and age.
+
+    Decisions are cached for the lifetime of the instance; a walk uses its
+    own Categorizer and long-lived users call clear() when markers change.
+    Safe to share between walker threads: a race only computes a rule twice.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = rules if rules else None
+        if self.rules:
+            self.rules.set_time()
+        self._directory_rules = {}
+        self._dev_projects = {}
+
+    def clear(self):
+        self._directory_rules = {}
+        self._dev_projects = {}
+
+    def rule_for(self, directory, names=None):
+        """
+        Returns the DirectoryRule for `directory`. `names` are the entries of
+        the directory if the caller has already listed it, which saves a scan
+        when checking for development project markers.
+        """
+        rule = self._directory_rules.get(directory)
+        if rule is None:
+            rule = self._make_rule(directory, names)
+            if len(self._directory_rules) >= MAX_CACHED_DIRECTORIES:
+                self.clear()
+            self._directory_rules[directory] = rule
+        return rule
+
+    def categorize(self, path, is_dir=False, size=0, mtime=None):
+        """Categorizes a single path, reusing the decision for its parent directory."""
+        directory, name = os.path.split(path)
+        return self.rule_for(directory).categorize(name, is_dir, size, mtime)
+
+    def is_dev_project(self, directory, names=None):
+        status = self._dev_projects.get(directory)
+        if status is None:
+            parent = os.path.dirname(directory)
+            if parent != directory and self.is_dev_project(parent):
+                status = True
+            else:
+                status = self._has_project_marker(directory, names)
+            if len(self._dev_projects) >= MAX_CACHED_DIRECTORIES:
+                self._dev_projects = {}
+            self._dev_projects[directory] = status
+        return status
+
+    @staticmethod
+    def _has_project_marker(directory, names):
+        lower_directory = directory.lower()
+        if os.path.basename(lower_directory) in _DEV_INDICATORS:
+            return True
+        if lower_directory in _PROJECT_CONTAINERS:
+            return False
+        if names is None:
+            try:
+                with os.scandir(directory) as it:
+                    names = [entry.name for entry in it]
+            except OSError:
+                return False
+        return any(name.lower() in _DEV_INDICATORS for name in names)
+
+    def _make_rule(self, directory, names):
+        lower_directory = directory.lower()
+        lower_prefix = lower_directory if lower_directory.endswith(os.sep) else lower_directory + os.sep
+        if not _SAFE_FOLDERS.isdisjoint(lower_directory.split(os.sep)):
+            return DirectoryRule(CAT_SAFE_DELETE, True, False, False, lower_prefix, self.rules)
+        boundary = any(len(prefix) > len(lower_prefix) and prefix.startswith(lower_prefix)
+                       for prefix in _ALL_PREFIXES)
+        dev_project = self.is_dev_project(directory, names)
+        category = _match_prefix(_BEFORE_DEV, lower_prefix)
+        if category is None:
+            if dev_project:
+                category = CAT_DEV_PROJECT
+            else:
+                category = _match_prefix(_AFTER_DEV, lower_prefix) or CAT_UNKNOWN
+        return DirectoryRule(category, False, dev_project, boundary, lower_prefix, self.rules)
+
+
+_default_categorizer = Categorizer()
+
+
 def is_dev_project(path):
     """Checks if a path seems to be part of a development project."""
-    path_parts = path.lower().split(os.sep)
-    if any(indicator in path_parts for indicator in DEV_PROJECT_INDICATORS):
-        return True
-    try:
-        for entry in os.scandir(path):
-            if entry.name.lower() in DEV_PROJECT_INDICATORS:
-                return True
-    except (PermissionError, FileNotFoundError):
-        pass
-    return False
+    return _default_categorizer.is_dev_project(path)
+
 
 def categorize_path(path):
     """
-    Categorizes a given path based on a set of rules.
-    Order is important here.
+    Categorizes a given path based on a set of rules, in order: safe-to-delete
+    folders and extensions, system paths, program files, development projects,
+    then the user folders.
     """
-    lower_path = path.lower()
-    
-    # Check for safe to delete folders and extensions
-    if any(folder in lower_path.split(os.sep) for folder in SAFE_DELETE_FOLDERS):
-        return CAT_SAFE_DELETE
-    if any(lower_path.endswith(ext) for ext in SAFE_DELETE_EXT):
-        return CAT_SAFE_DELETE
-
-    # Check for system paths
-    if any(lower_path.startswith(p) for p in SYSTEM_PATHS):
-        return CAT_SYSTEM
-
-    # Check for program files
-    if any(lower_path.startswith(p) for p in PROGRAM_FILES_PATHS):
-        return CAT_APP
-
-    # Check for development projects
-    if is_dev_project(os.path.dirname(path)):
-        return CAT_DEV_PROJECT
-
-    # Check for specific user folders
-    if lower_path.startswith(DOWNLOADS_PATH):
-        return CAT_USER_DOWNLOADS
-    if lower_path.startswith(DOCUMENTS_PATH):
-        return CAT_USER_DOCUMENTS
-
-    # Check for other user files
-    if any(lower_path.startswith(p) for p in USER_PATHS.values()):
-        return CAT_USER
-
-    return CAT_UNKNOWN 
\ No newline at end of file
+    return _default_categorizer.categorize(path)
@@ -0,0 +1,227 @@
+import os
+import re
+import json
+import time
+import fnmatch
+import logging
+
+# Keys a rule may have besides "category"; every key given must match
+RULE_KEYS = ('paths', 'names', 'extensions', 'type', 'min_size', 'max_size', 'older_than_days', 'newer_than_days')
+
+_SIZE_UNITS = {'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3, 'tb': 1024 ** 4}
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmgt]?b)?\s*$', re.IGNORECASE)
+_DAY = 24 * 60 * 60
+
+RULES_TEMPLATE = {
+    "rules": [],
+}
+
+
+def parse_size(value):
+    """Returns a size given as a number of bytes or a string like "500 MB" in bytes."""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid size: {value!r}")
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _SIZE_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[(match.group(2) or 'b').lower()])
+
+
+def _glob_regex(patterns, expand_user=False):
+    """Compiles case-insensitive globs into one anchored regex, or None for no patterns."""
+    translated = []
+    for pattern in patterns:
+        if expand_user:
+            pattern = os.path.normpath(os.path.expanduser(pattern))
+        translated.append(fnmatch.translate(pattern.lower()))
+    return re.compile('|'.join(translated)) if translated else None
+
+
+def _as_list(rule, key):
+    value = rule.get(key, [])
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"'{key}' must be a string or a list of strings")
+    return value
+
+
+class CategoryRule:
+    """One compiled rule: every predicate it has must hold for an entry to get its category."""
+    __slots__ = ('category', 'kind', 'path_re', 'name_re', 'extensions', 'min_size', 'max_size',
+                 'older_than', 'newer_than', 'older_cutoff', 'newer_cutoff')
+
+    def __init__(self, rule):
+        unknown = set(rule) - set(RULE_KEYS) - {'category'}
+        if unknown:
+            raise ValueError(f"Unknown rule keys: {', '.join(sorted(unknown))}")
+        category = rule.get('category')
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError("Every rule needs a 'category'")
+        self.category = category.strip()
+        self.kind = rule.get('type')
+        if self.kind not in (None, 'file', 'dir'):
+            raise ValueError(f"'type' must be 'file' or 'dir', not {self.kind!r}")
+        self.path_re = _glob_regex(_as_list(rule, 'paths'), expand_user=True)
+        self.name_re = _glob_regex(_as_list(rule, 'names'))
+        self.extensions = frozenset(ext.lower() if ext.startswith('.') else '.' + ext.lower()
+                                    for ext in _as_list(rule, 'extensions'))
+        self.min_size = parse_size(rule['min_size']) if 'min_size' in rule else None
+        self.max_size = parse_size(rule['max_size']) if 'max_size' in rule else None
+        self.older_than = float(rule['older_than_days']) if 'older_than_days' in rule else None
+        self.newer_than = float(rule['newer_than_days']) if 'newer_than_days' in rule else None
+        self.set_time(time.time())
+
+    def set_time(self, now):
+        self.older_cutoff = now - self.older_than * _DAY if self.older_than is not None else None
+        self.newer_cutoff = now - self.newer_than * _DAY if self.newer_than is not None else None
+
+    def matches(self, lower_path, lower_name, is_dir, size, mtime):
+        if self.kind is not None and (self.kind == 'dir') != is_dir:
+            return False
+        if self.name_re is not None and not self.name_re.match(lower_name):
+            return False
+        if self.path_re is not None and not self.path_re.match(lower_path):
+            return False
+        # Size and age only describe files; directories have neither
+        if self.min_size is not None and (is_dir or size < self.min_size):
+            return False
+        if self.max_size is not None and (is_dir or size > self.max_size):
+            return False
+        if self.older_cutoff is not None and (mtime is None or mtime >= self.older_cutoff):
+            return False
+        if self.newer_cutoff is not None and (mtime is None or mtime < self.newer_cutoff):
+            return False
+        return True
+
+
+class CategoryRules:
+    """
+    User categorization rules, compiled for matching one entry at a time.
+
+    Rules are tried in file order and the first match wins; entries no rule
+    matches fall back to the built-in categories. Rules that name extensions
+    are indexed by extension, so an entry is only tested against the rules
+    that can apply to it. Apart from set_time() the rules never change once
+    built, so they can be shared between threads; reloading builds new ones.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = [rule if isinstance(rule, CategoryRule) else CategoryRule(rule) for rule in rules]
+        self._generic = tuple(rule for rule in self.rules if not rule.extensions)
+        by_extension = {}
+        for position, rule in enumerate(self.rules):
+            for extension in rule.extensions:
+                by_extension.setdefault(extension, []).append(position)
+        # Each extension's candidates are its own rules merged with the generic ones, in file order
+        generic_positions = [position for position, rule in enumerate(self.rules) if not rule.extensions]
+        self._by_extension = {
+            extension: tuple(self.rules[p] for p in sorted(positions + generic_positions))
+            for extension, positions in by_extension.items()
+        }
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def categories(self):
+        """Returns the target categories in rule order, without repeats."""
+        return list(dict.fromkeys(rule.category for rule in self.rules))
+
+    def set_time(self, now=None):
+        """Re-anchors the age predicates to `now`; done at the start of every walk or re-categorization."""
+        now = time.time() if now is None else now
+        for rule in self.rules:
+            rule.set_time(now)
+
+    def match(self, lower_path, lower_name, is_dir=False, size=0, mtime=None):
+        """Returns the category of the first matching rule, or None."""
+        dot = lower_name.rfind('.')
+        candidates = self._by_extension.get(lower_name[dot:], self._generic) if dot != -1 else self._generic
+        for rule in candidates:
+            if rule.matches(lower_path, lower_name, is_dir, size, mtime):
+                return rule.category
+        return None
+
+
+def parse_rules(data):
+    """Builds CategoryRules from the decoded JSON of a rules file: {"rules": [...]} or a bare list."""
+    if isinstance(data, dict):
+        data = data.get('rules', [])
+    if not isinstance(data, list):
+        raise ValueError("The rules file must hold a list of rules")
+    rules = []
+    for number, rule in enumerate(data, 1):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule {number} is not an object")
+        try:
+            rules.append(CategoryRule(rule))
+        except (ValueError, TypeError, re.error) as e:
+            raise ValueError(f"Rule {number}: {e}") from None
+    return CategoryRules(rules)
+
+
+def load_rules(path):
+    """Returns the CategoryRules in the file at `path`. Raises OSError or ValueError."""
+    with open(path, encoding='utf-8') as f:
+        return parse_rules(json.load(f))
+
+
+class CategoryRulesFile:
+    """
+    A rules file that is reloaded when it changes on disk.
+
+    reload_if_changed() is cheap enough to poll: it only stats the file. A
+    file that fails to parse is logged and the previous rules stay in force,
+    so a half-saved edit never wipes them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rules = CategoryRules()
+        self.error = None
+        self._signature = None
+
+    def _stat_signature(self):
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def reload_if_changed(self):
+        """Re-reads the file if it changed since the last load. Returns True if the rules changed."""
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        if signature is None:
+            if not self.rules:
+                return False
+            logging.info(f"Categorization rules file {self.path} was removed; using the built-in rules only.")
+            self.rules = CategoryRules()
+            return True
+        try:
+            rules = load_rules(self.path)
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            logging.error(f"Could not load categorization rules from {self.path}: {e}")
+            return False
+        self.error = None
+        self.rules = rules
+        logging.info(f"Loaded {len(rules)} categorization rules from {self.path}.")
+        return True
+
+    def ensure_exists(self):
+        """Creates an empty rules file to edit if there is none yet."""
+        if os.path.exists(self.path):
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(RULES_TEMPLATE, f, indent=2)
@@ -0,0 +1,216 @@
+"""
+Headless command line interface for the scanners, for cron jobs and shell
+pipelines on machines without a display. No widgets are created; results
+are streamed one record at a time as NDJSON or CSV.
+
+Usage:
+    python -m core.cli scan PATH [--workers N] [--format ndjson|csv] [--output FILE]
+    python -m core.cli duplicates PATH [...]
+    python -m core.cli empty-folders PATH [...]
+
+Add --throttle (optionally with --max-files-per-sec / --max-mb-per-sec) to
+run at idle priority on shared machines.
+
+Exclusions saved in the GUI are applied unless --no-saved-exclusions is
+given; --exclude adds more patterns. Categories come from the same
+categorizer the GUI uses, including its rules file unless --rules names
+another one.
+"""
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+from PyQt6.QtCore import QSettings
+from .traversal import create_walker
+from .duplicate_finder import DuplicateFinderWorker, DEFAULT_HASH_WORKERS, DEFAULT_QUEUE_DEPTH, DEFAULT_SAMPLE_COUNT
+from .hash_cache import HashCache
+from .empty_folder_finder import EmptyFolderFinderWorker
+from .throttle import Throttle
+from .category_rules import load_rules
+from .scanner import CATEGORY_RULES_PATH
+
+ORGANIZATION_NAME = "YourCompany"
+APPLICATION_NAME = "MasterDeleter"
+
+SCAN_FIELDS = ['type', 'path', 'size', 'disk_size', 'category', 'mtime', 'files', 'entries']
+DUPLICATE_FIELDS = ['group', 'size', 'path']
+EMPTY_FOLDER_FIELDS = ['path']
+
+
+def load_saved_exclusions():
+    """Returns the exclusion list saved by the GUI, or [] if there is none."""
+    exclusions = QSettings(ORGANIZATION_NAME, APPLICATION_NAME).value("exclusions", [])
+    if isinstance(exclusions, str):  # Single-entry lists can come back as a plain string
+        exclusions = [exclusions]
+    return list(exclusions or [])
+
+
+class RecordWriter:
+    """Writes records as NDJSON lines or CSV rows, flushing every `flush_every` records."""
+
+    def __init__(self, stream, fmt, fields, flush_every=1000):
+        self.stream = stream
+        self.fields = fields
+        self.flush_every = flush_every
+        self.count = 0
+        self.is_csv = fmt == 'csv'
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.stream.flush()
+
+
+def load_scan_rules(path=None):
+    """Returns the categorization rules in `path`, or the GUI's rules file; None if there is none."""
+    if path is None:
+        if not os.path.exists(CATEGORY_RULES_PATH):
+            return None
+        path = CATEGORY_RULES_PATH
+    return load_rules(path)
+
+
+def run_scan(args, exclusions, writer, throttle):
+    walker = create_walker(args.path, exclusions, workers=args.workers, throttle=throttle,
+                           one_filesystem=args.one_file_system, rules=args.category_rules)
+    try:
+        for item in walker.walk():
+            if item['type'] == 'dir':
+                # A folder's size is only known once its subtree is done; it comes in a trailing dir_total record
+                item = {key: value for key, value in item.items() if key != 'size'}
+            writer.write(item)
+    finally:
+        walker.stop()
+    for path, totals in walker.dir_totals.items():
+        writer.write({'type': 'dir_total', 'path': path, 'size': totals.size, 'disk_size': totals.disk_size,
+                      'files': totals.files, 'entries': totals.entries})
+    logging.info(f"Scanned {walker.listed_dirs} directories, wrote {writer.count} records.")
+
+
+def run_duplicates(args, exclusions, writer, throttle):
+    hash_cache = None if args.no_hash_cache else HashCache()
+    finder = DuplicateFinderWorker(args.path, exclusions, throttle=throttle, hash_cache=hash_cache,
+                                   hash_workers=args.hash_workers, queue_depth=args.queue_depth,
+                                   sample_count=args.samples)
+    if args.verbose:
+        finder.progress_update.connect(logging.debug)
+    try:
+        for group, paths in enumerate(finder.iter_duplicates(), 1):
+            size = os.path.getsize(paths[0]) if os.path.exists(paths[0]) else None
+            if writer.is_csv:  # One row per file, tied together by the group number
+                for path in paths:
+                    writer.write({'group': group, 'size': size, 'path': path})
+            else:
+                writer.write({'group': group, 'size': size, 'paths': paths})
+    finally:
+        finder.stop()
+
+
+def run_empty_folders(args, exclusions, writer, throttle):
+    finder = EmptyFolderFinderWorker(args.path, exclusions, throttle=throttle)
+    try:
+        for path in finder.iter_empty_folders():
+            writer.write({'path': path})
+    finally:
+        finder.stop()
+    logging.info(f"Found {finder.folder_count} empty folders.")
+
+
+COMMANDS = {
+    'scan': (run_scan, SCAN_FIELDS),
+    'duplicates': (run_duplicates, DUPLICATE_FIELDS),
+    'empty-folders': (run_empty_folders, EMPTY_FOLDER_FIELDS),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core.cli",
+                                     description="Run Master Deleter scans without the GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('scan', "List every file and folder with its size and category"),
+                            ('duplicates', "Find sets of files with identical content"),
+                            ('empty-folders', "Find folders with nothing in them")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("path", help="Directory to scan")
+        sub.add_argument("--format", choices=['ndjson', 'csv'], default='ndjson', help="Output format (default: ndjson)")
+        sub.add_argument("--output", "-o", help="Write to this file instead of stdout")
+        sub.add_argument("--exclude", action='append', default=[], metavar="PATTERN",
+                         help="Additional exclusion (path, name or glob); may be repeated")
+        sub.add_argument("--no-saved-exclusions", action='store_true',
+                         help="Ignore the exclusions configured in the GUI")
+        sub.add_argument("--verbose", "-v", action='store_true', help="Log progress to stderr")
+        sub.add_argument("--throttle", action='store_true',
+                         help="Run at idle priority and slow down while the system is busy")
+        sub.add_argument("--max-files-per-sec", type=int, default=0, help="Cap on files per second (implies --throttle)")
+        sub.add_argument("--max-mb-per-sec", type=int, default=0, help="Cap on MB read per second (implies --throttle)")
+        if name == 'scan':
+            sub.add_argument("--workers", type=int, default=1, help="Directory listing threads (default: 1)")
+            sub.add_argument("--one-file-system", "-x", action='store_true',
+                             help="Don't descend into other mounted filesystems")
+            sub.add_argument("--rules", metavar="FILE",
+                             help="Categorization rules file (default: the one edited in the GUI, if any)")
+        if name == 'duplicates':
+            sub.add_argument("--no-hash-cache", action='store_true',
+                             help="Hash every file again instead of reusing hashes from earlier searches")
+            sub.add_argument("--hash-workers", type=int, default=DEFAULT_HASH_WORKERS,
+                             help=f"Threads reading and hashing files per non-rotational device (default: {DEFAULT_HASH_WORKERS})")
+            sub.add_argument("--queue-depth", type=int, default=DEFAULT_QUEUE_DEPTH,
+                             help=f"Hashed files the readers may queue ahead (default: {DEFAULT_QUEUE_DEPTH})")
+            sub.add_argument("--samples", type=int, default=DEFAULT_SAMPLE_COUNT,
+                             help="Samples from the middle of files over 1 MB compared before reading them in full, "
+                                  f"besides the end (default: {DEFAULT_SAMPLE_COUNT}; -1 skips this stage)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        stream=sys.stderr, format="%(levelname)s: %(message)s")
+
+    if not os.path.isdir(args.path):
+        logging.error(f"Not a directory: {args.path}")
+        return 2
+
+    if args.command == 'scan':
+        try:
+            args.category_rules = load_scan_rules(args.rules)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load categorization rules: {e}")
+            return 2
+
+    exclusions = ([] if args.no_saved_exclusions else load_saved_exclusions()) + args.exclude
+    command, fields = COMMANDS[args.command]
+    throttle = None
+    if args.throttle or args.max_files_per_sec or args.max_mb_per_sec:
+        throttle = Throttle(max_files_per_sec=args.max_files_per_sec, max_mb_per_sec=args.max_mb_per_sec)
+
+    stream = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        writer = RecordWriter(stream, args.format, fields)
+        command(args, exclusions, writer, throttle)
+        stream.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into `head`); stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if args.output:
+            stream.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,8 +8,18 @@ APP_NAME = "MasterDeleter"
 DB_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME)
 DB_PATH = os.path.join(DB_DIR, "history.db")
 
+# Set once the tables exist; the database is only touched when the first event is logged
+_database_ready = False
+
 def get_db_connection():
-    """Establishes a connection to the SQLite database, creating it if necessary."""
+    """Establishes a connection to the SQLite database, creating it and its tables if necessary."""
+    global _database_ready
+    if not _database_ready:
+        setup_database()
+        _database_ready = True
+    return _connect()
+
+def _connect():
     if not os.path.exists(DB_DIR):
         os.makedirs(DB_DIR)
     conn = sqlite3.connect(DB_PATH)
@@ -17,7 +27,7 @@ def get_db_connection():
 
 def setup_database():
     """Sets up the necessary tables in the database if they don't exist."""
-    conn = get_db_connection()
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS deletion_history (
@@ -42,6 +52,3 @@ def log_event(event_type, path, size_bytes=None, destination=None):
     ''', (time.time(), event_type, path, size_bytes, destination))
     conn.commit()
     conn.close()
-
-# Initialize the database on startup
-setup_database() 
\ No newline at end of file
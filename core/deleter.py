@@ -134,6 +134,14 @@ class Deleter(QObject):
                     item_metadata['reason'] = item_data['reason']
                 if 'confidence' in item_data:
                     item_metadata['confidence'] = item_data['confidence']
+                # Preserve the scan metadata the suggester learns from if the item is restored
+                if item_data.get('category'):
+                    item_metadata['scan_category'] = item_data['category']
+                for key in ('mtime', 'type'):
+                    if item_data.get(key) is not None:
+                        item_metadata[key] = item_data[key]
+            if full_item_data.get('size') is not None:
+                item_metadata['size'] = full_item_data['size']
 
         metadata[quarantined_name] = item_metadata
 
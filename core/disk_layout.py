@@ -0,0 +1,71 @@
+import os
+import errno
+import struct
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+SYS_DEV_BLOCK = '/sys/dev/block'
+
+# FIEMAP ioctl (linux/fiemap.h): maps a file's logical extents to physical disk offsets
+FS_IOC_FIEMAP = 0xC020660B
+FIEMAP_MAX_OFFSET = 2 ** 64 - 1
+_FIEMAP_HEADER = struct.Struct('=QQIIII')     # fm_start, fm_length, fm_flags, fm_mapped_extents, fm_extent_count, fm_reserved
+_FIEMAP_EXTENT = struct.Struct('=QQQQQIIII')  # fe_logical, fe_physical, fe_length, 2 reserved, fe_flags, 3 reserved
+# What the ioctl fails with on a filesystem that doesn't implement it
+_FIEMAP_UNSUPPORTED_ERRNOS = {errno.ENOTTY, errno.EOPNOTSUPP, errno.EINVAL}
+
+
+class FiemapUnsupported(OSError):
+    """Raised when the filesystem (or the platform) can't report where files are on disk."""
+
+
+def is_rotational(st_dev):
+    """
+    Returns True if the block device behind `st_dev` is a spinning disk,
+    False if it is not, and None if that can't be told (not Linux, or a
+    device without a sysfs queue such as network, FUSE and btrfs
+    filesystems).
+    """
+    if not hasattr(os, 'major'):
+        return None
+    device_dir = os.path.join(SYS_DEV_BLOCK, f"{os.major(st_dev)}:{os.minor(st_dev)}")
+    # Partitions have no queue of their own; it belongs to the disk they are on
+    for queue_dir in (os.path.join(device_dir, 'queue'), os.path.join(os.path.realpath(device_dir), '..', 'queue')):
+        try:
+            with open(os.path.join(queue_dir, 'rotational'), encoding='ascii') as f:
+                return f.read().strip() == '1'
+        except OSError:
+            continue
+    return None
+
+
+def physical_offset(path):
+    """
+    Returns where the first extent of `path` starts on its disk, in bytes,
+    or None if that isn't known for this file (it can't be opened, or has
+    no extents, e.g. an empty or inline file).
+    Raises FiemapUnsupported if the filesystem doesn't report it for any
+    file: FIEMAP is Linux-only, and not every filesystem supports it.
+    """
+    if fcntl is None:
+        raise FiemapUnsupported("FIEMAP is only available on Linux")
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    _FIEMAP_HEADER.pack_into(request, 0, 0, FIEMAP_MAX_OFFSET, 0, 0, 1, 0)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            fcntl.ioctl(fd, FS_IOC_FIEMAP, request, True)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        if e.errno in _FIEMAP_UNSUPPORTED_ERRNOS:
+            raise FiemapUnsupported(e.errno, f"FIEMAP not supported for {path}: {e.strerror}") from e
+        logging.debug(f"Could not map {path}: {e}")
+        return None
+    if _FIEMAP_HEADER.unpack_from(request, 0)[3] == 0:  # No extents mapped, e.g. an empty or inline file
+        return None
+    return _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)[1]
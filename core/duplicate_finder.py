@@ -1,115 +1,551 @@
 import os
+import json
+import time
+import sqlite3
 import hashlib
+import logging
+import threading
+import queue
 from PyQt6.QtCore import QObject, pyqtSignal
+from .exclusions import ExclusionMatcher, EXCLUDED
+from .mounts import mounts_below, PSEUDO_FS_TYPES
+from .hash_cache import HashCache
+from .disk_layout import is_rotational, physical_offset, FiemapUnsupported
+
+# Files this small are not worth comparing
+MIN_DUPLICATE_SIZE = 1024
+# The quick hash covers this much of the start of a file
+QUICK_HASH_SIZE = 8192
+# Read size for full hashes; hashlib releases the GIL for updates this large
+HASH_BUFFER_SIZE = 1024 * 1024
+# Between the quick and the full hash, files at least SAMPLE_MIN_SIZE long are compared by a
+# sample of SAMPLE_SIZE bytes at the end and DEFAULT_SAMPLE_COUNT spread evenly through the middle
+DEFAULT_SAMPLE_COUNT = 4
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_MIN_SIZE = 1024 * 1024
+# Threads reading and hashing files per solid-state (or unknown) device; a spinning disk gets one.
+# Readers wait once this many hashed files are queued for the worker thread.
+DEFAULT_HASH_WORKERS = 4
+DEFAULT_QUEUE_DEPTH = 32
+# Seconds between hash_rate reports
+RATE_INTERVAL = 0.5
+
+
+class ScanCoverage:
+    """
+    What a finished Smart Cleaner scan already knows about the tree below
+    its root: the sizes of its files, and which folders it listed.
+
+    A duplicate search inside that tree takes its size groups from here
+    instead of walking and stat-ing everything again. Only folders the scan
+    has a row for but did not list (other filesystems with "stay on one
+    filesystem", folders added by watch mode without a listing, ...) still
+    have to be walked. Subclasses provide the rows: is_listed(path),
+    files(path, min_size) yielding (path, size) below `path`, and
+    unlisted_dirs(path).
+    """
+
+    def __init__(self, root, exclusions=()):
+        self.root = os.path.normpath(root) if root else None
+        self.exclusions = set(ExclusionMatcher(exclusions).patterns)
+
+    def covers(self, path, matcher):
+        """True if the scan listed `path` with no exclusion the search (`matcher`) doesn't also have."""
+        if self.root is None or not self.exclusions <= set(matcher.patterns):
+            return False
+        path = os.path.normpath(path)
+        if path != self.root and not path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return False
+        return self.is_listed(path)
+
+    def close(self):
+        pass
+
+
+class ResultsCoverage(ScanCoverage):
+    """
+    Coverage of the in-memory results (a ScanResults store and its DirTotals)
+    of the last scan. The store can't be searched while the GUI thread adds
+    to it, so the rows below the searched folder are found up front, on the
+    GUI thread, and passed in as `rows`.
+    """
+
+    def __init__(self, root, exclusions, scan_results, dir_totals, rows):
+        super().__init__(root, exclusions)
+        self.scan_results = scan_results
+        self.dir_totals = dir_totals
+        self.rows = rows
+
+    def is_listed(self, path):
+        return path in self.dir_totals
+
+    def files(self, path, min_size=0):
+        store = self.scan_results
+        for index in self.rows:
+            if not store.is_dir(index) and store.size(index) > min_size:
+                yield store.path(index), store.size(index)
+
+    def unlisted_dirs(self, path):
+        store = self.scan_results
+        return [store.path(index) for index in self.rows
+                if store.is_dir(index) and store.path(index) not in self.dir_totals]
+
+
+class IndexCoverage(ScanCoverage):
+    """
+    Coverage of the scan index on disk. It opens its own read-only
+    connection on first use, so it can be created on the GUI thread and
+    used on the worker's. Only complete scans that recorded their
+    exclusions cover anything.
+    """
+
+    def __init__(self, index_path):
+        super().__init__(None)
+        self.index_path = index_path
+        self.conn = None
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+            info = dict(self.conn.execute("SELECT key, value FROM scan_info").fetchall())
+            if info.get('complete') == '1' and info.get('start_path') and 'exclusions' in info:
+                self.root = os.path.normpath(info['start_path'])
+                self.exclusions = set(ExclusionMatcher(json.loads(info['exclusions'])).patterns)
+        return self.conn
+
+    def covers(self, path, matcher):
+        try:
+            self._connect()
+        except (sqlite3.Error, ValueError) as e:
+            logging.warning(f"Could not read the scan index for the duplicate search: {e}")
+            return False
+        return super().covers(path, matcher)
+
+    @staticmethod
+    def _below(path):
+        # Everything below `path` sorts between path + sep and path + the next character
+        prefix = path.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    def is_listed(self, path):
+        return self.conn.execute("SELECT 1 FROM dir_sizes WHERE path = ?", (path,)).fetchone() is not None
+
+    def files(self, path, min_size=0):
+        yield from self.conn.execute(
+            "SELECT path, size FROM items WHERE path > ? AND path < ? AND type = 'file' AND size > ?",
+            (*self._below(path), min_size))
+
+    def unlisted_dirs(self, path):
+        rows = self.conn.execute(
+            "SELECT path FROM items WHERE path > ? AND path < ? AND type = 'dir' "
+            "AND path NOT IN (SELECT path FROM dir_sizes)", self._below(path))
+        return [row[0] for row in rows]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
 
 class DuplicateFinderWorker(QObject):
     """Scans for duplicate files in a separate thread."""
     progress_update = pyqtSignal(str)
     duplicates_found = pyqtSignal(list)
     scan_finished = pyqtSignal()
+    hash_rate = pyqtSignal(float)  # bytes read per second while hashing
 
-    def __init__(self, start_path, exclusions=None):
+    def __init__(self, start_path, exclusions=None, throttle=None, coverage=None, hash_cache=None,
+                 hash_workers=DEFAULT_HASH_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH, sample_count=DEFAULT_SAMPLE_COUNT):
         super().__init__()
         self.start_path = start_path
         self._is_running = True
-        self.exclusions = [path.lower() for path in exclusions] if exclusions else []
+        self.exclusions = ExclusionMatcher(exclusions)
+        self.throttle = throttle
+        # A ScanCoverage to take file sizes from instead of walking, if it covers start_path
+        self.coverage = coverage
+        # A HashCache consulted before reading a file, and updated with what is read
+        self.hash_cache = hash_cache
+        self.hash_workers = max(1, hash_workers)
+        self.queue_depth = max(self.hash_workers, queue_depth)
+        # Middle samples in the sampled stage; a negative count skips the stage
+        self.sample_count = sample_count
+        self.file_count = 0
+        self.bytes_hashed = 0
+        if throttle is not None:
+            throttle.should_stop = lambda: not self._is_running
 
     def hash_file(self, path, quick_hash=False):
         """
         Calculates the SHA256 hash of a file.
         If quick_hash is True, only hashes the first 8KB.
         """
+        kind = 'quick' if quick_hash else 'full'
+        cache_key, cached = self._cached_hash(path, kind)
+        if cached:
+            return cached
+        digest, nbytes = self._read_hash(path, kind)
+        return self._store_hash(cache_key, kind, digest, nbytes)
+
+    def _cached_hash(self, path, kind):
+        """Returns (cache key, cached digest or None) for `path`."""
+        if self.hash_cache is None:
+            return None, None
+        try:
+            cache_key = self.hash_cache.key(path)
+        except OSError:
+            return None, None
+        return cache_key, self.hash_cache.get(cache_key, kind)
+
+    def _store_hash(self, cache_key, kind, digest, nbytes):
+        """Accounts for a hash that was read from disk and caches it. Returns the digest."""
+        self.bytes_hashed += nbytes
+        if digest and cache_key is not None:
+            self.hash_cache.put(cache_key, kind, digest)
+        return digest
+
+    def _sample_layout(self):
+        return f"{self.sample_count}x{SAMPLE_SIZE}:"
+
+    def _sample_offsets(self, size):
+        """Returns where the samples of a `size` byte file start: evenly spaced through the middle, then the end."""
+        last = max(size - SAMPLE_SIZE, 0)
+        return [last * i // (self.sample_count + 1) for i in range(1, self.sample_count + 1)] + [last]
+
+    def _read_hash(self, path, kind):
+        """
+        Reads and hashes a file: its first 8KB ('quick'), its samples
+        ('sample') or all of it ('full'). Returns (hex digest, bytes read);
+        the digest is None if the file can't be read or the search was
+        stopped. Safe to call from the hashing threads.
+        """
         hasher = hashlib.sha256()
+        nbytes = 0
         try:
             with open(path, 'rb') as f:
-                if quick_hash:
-                    chunk = f.read(8192)
-                    if not self._is_running: return None
+                if kind == 'quick':
+                    chunk = f.read(QUICK_HASH_SIZE)
+                    if not self._is_running: return None, nbytes
                     hasher.update(chunk)
+                    nbytes += len(chunk)
+                    if self.throttle: self.throttle.pace(0, len(chunk))
+                elif kind == 'sample':
+                    # BLAKE2 is faster than SHA-256, and the full hash still confirms every match. The
+                    # layout is part of the digest so cached samples taken with other settings don't match.
+                    hasher = hashlib.blake2b(digest_size=16)
+                    for offset in self._sample_offsets(os.fstat(f.fileno()).st_size):
+                        if not self._is_running: return None, nbytes
+                        f.seek(offset)
+                        chunk = f.read(SAMPLE_SIZE)
+                        hasher.update(chunk)
+                        nbytes += len(chunk)
+                        if self.throttle: self.throttle.pace(0, len(chunk))
+                    return self._sample_layout() + hasher.hexdigest(), nbytes
                 else:
-                    while chunk := f.read(8192):
+                    while chunk := f.read(HASH_BUFFER_SIZE):
                         if not self._is_running:
-                            return None
+                            return None, nbytes
                         hasher.update(chunk)
-            return hasher.hexdigest()
-        except (PermissionError, FileNotFoundError) as e:
+                        nbytes += len(chunk)
+                        if self.throttle: self.throttle.pace(0, len(chunk))
+            return hasher.hexdigest(), nbytes
+        except OSError as e:
             self.progress_update.emit(f"Could not access {os.path.basename(path)}: {e}")
-            return None
+            return None, nbytes
 
-    def run(self):
-        """Scans for duplicates and emits a list of them."""
+    def _hash_files(self, paths, kind, label):
+        """
+        Yields (path, digest) for `paths` as they are hashed, cached hashes
+        first and the rest in the order they are read. The files to read are
+        grouped by device and the devices are read in parallel: a spinning
+        disk gets one reader going through its files in on-disk order, so
+        it reads sequentially instead of seeking between them, and other
+        devices get hash_workers readers in inode order. Cache lookups and
+        writes happen here, on the calling thread. Stops early if the search
+        is stopped.
+        """
+        by_device = {}
+        for path in paths:
+            if not self._is_running: return
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                self.progress_update.emit(f"Could not access {os.path.basename(path)}: {e}")
+                yield path, None
+                continue
+            cache_key = None
+            if self.hash_cache is not None:
+                cache_key = HashCache.stat_key(st)
+                cached = self.hash_cache.get(cache_key, kind)
+                if cached and kind == 'sample' and not cached.startswith(self._sample_layout()):
+                    cached = None  # Sampled with other settings
+                if cached:
+                    self._report_progress(label, path)
+                    yield path, cached
+                    continue
+            by_device.setdefault(st.st_dev, []).append((st.st_ino, path, cache_key))
+
+        results = queue.Queue(maxsize=self.queue_depth)
+        stopped = threading.Event()
+        readers = []
+        for device, files in by_device.items():
+            rotational = is_rotational(device)
+            files = self._disk_order(files) if rotational else sorted(files)
+            reader_count = 1 if rotational else min(self.hash_workers, len(files))
+            pending = iter(files)
+            lock = threading.Lock()
+            for _ in range(reader_count):
+                readers.append(threading.Thread(target=self._read_files, args=(pending, lock, kind, results, stopped),
+                                                name=f"DuplicateHash-{device}", daemon=True))
+        for reader in readers:
+            reader.start()
+
+        finished = 0
         try:
-            self.progress_update.emit("Grouping files by size...")
-            files_by_size = {}
-            file_count = 0
+            while finished < len(readers):
+                result = results.get()
+                if result is None:
+                    finished += 1
+                    continue
+                path, cache_key, digest, nbytes = result
+                self._report_progress(label, path)
+                yield path, self._store_hash(cache_key, kind, digest, nbytes)
+        finally:
+            # Let readers still running finish their current file and exit
+            stopped.set()
+            while finished < len(readers):
+                if results.get() is None:
+                    finished += 1
+
+    @staticmethod
+    def _disk_order(files):
+        """
+        Sorts (inode, path, cache key) tuples by where the files start on
+        disk. Files whose offset isn't known (empty, inline or unreadable
+        ones) follow in inode order, as do all files of a filesystem without
+        FIEMAP support.
+        """
+        placed = []
+        unplaced = []
+        for index, file in enumerate(files):
+            try:
+                offset = physical_offset(file[1])
+            except FiemapUnsupported:
+                if index == 0:  # The first probe tells for the whole filesystem; inode order is the next best guess
+                    return sorted(files)
+                offset = None
+            if offset is None:
+                unplaced.append(file)
+            else:
+                placed.append((offset, file))
+        placed.sort(key=lambda entry: (entry[0], entry[1][0]))
+        return [file for _, file in placed] + sorted(unplaced)
+
+    def _read_files(self, pending, lock, kind, results, stopped):
+        """Reader thread: hashes files from the shared `pending` iterator and queues the results, then None."""
+        try:
+            if self.throttle:
+                self.throttle.apply_priority()
+            while self._is_running and not stopped.is_set():
+                with lock:
+                    file = next(pending, None)
+                if file is None:
+                    break
+                _, path, cache_key = file
+                digest, nbytes = self._read_hash(path, kind)
+                results.put((path, cache_key, digest, nbytes))
+        finally:
+            results.put(None)
+
+    def _report_progress(self, label, path):
+        self.progress_update.emit(f"{label}: {os.path.basename(path)}")
+        now = time.monotonic()
+        if now - self._last_rate_report >= RATE_INTERVAL:
+            self._last_rate_report = now
+            self.hash_rate.emit(self.bytes_hashed / max(now - self._hash_started, 1e-6))
+
+    def _walk_sizes(self, top, files_by_size):
+        """Walks `top` and adds its files larger than MIN_DUPLICATE_SIZE to `files_by_size`."""
+        for root, dirs, files in os.walk(top):
+            if not self._is_running: break
             
-            for root, _, files in os.walk(self.start_path):
+            if self.exclusions:
+                state = self.exclusions.state_for(root)
+                if state is EXCLUDED:
+                    dirs[:] = []
+                    continue
+                # Prune excluded subtrees instead of walking into them
+                dirs[:] = [d for d in dirs if self.exclusions.child(state, d, os.path.join(root, d)) is not EXCLUDED]
+                files = [f for f in files if self.exclusions.child(state, f, os.path.join(root, f)) is not EXCLUDED]
+
+            for filename in files:
                 if not self._is_running: break
+                self.file_count += 1
+                if self.throttle: self.throttle.pace(1)
+                
+                # Update progress every 100 files
+                if self.file_count % 100 == 0:
+                    self.progress_update.emit(f"Scanned {self.file_count} files...")
                 
-                lower_root = root.lower()
-                if any(lower_root.startswith(ex) for ex in self.exclusions):
+                path = os.path.normpath(os.path.join(root, filename))
+                try:
+                    size = os.path.getsize(path)
+                    if size > MIN_DUPLICATE_SIZE: # Ignore small files for efficiency
+                        if size in files_by_size:
+                            files_by_size[size].append(path)
+                        else:
+                            files_by_size[size] = [path]
+                except (PermissionError, FileNotFoundError, OSError):
+                    continue
+                except Exception as e:
+                    self.progress_update.emit(f"Error scanning {filename}: {str(e)}")
                     continue
 
-                for filename in files:
-                    if not self._is_running: break
-                    file_count += 1
-                    
-                    # Update progress every 100 files
-                    if file_count % 100 == 0:
-                        self.progress_update.emit(f"Scanned {file_count} files...")
-                    
-                    path = os.path.normpath(os.path.join(root, filename))
-                    try:
-                        size = os.path.getsize(path)
-                        if size > 1024: # Ignore small files for efficiency
-                            if size in files_by_size:
-                                files_by_size[size].append(path)
-                            else:
-                                files_by_size[size] = [path]
-                    except (PermissionError, FileNotFoundError, OSError):
-                        continue
-                    except Exception as e:
-                        self.progress_update.emit(f"Error scanning {filename}: {str(e)}")
-                        continue
-            
-            self.progress_update.emit("Identifying duplicates by content...")
-            duplicates = []
-            potential_dupes = {size: paths for size, paths in files_by_size.items() if len(paths) > 1}
+    def _seed_sizes(self, files_by_size):
+        """
+        Fills `files_by_size` from the scan coverage and returns the folders
+        that still have to be walked: the ones the scan did not list, apart
+        from symlinks (os.walk doesn't follow them either) and pseudo
+        filesystems.
+        """
+        start_path = os.path.normpath(self.start_path)
+        mounts = mounts_below(start_path) or {}
+        unlisted = sorted(path for path in self.coverage.unlisted_dirs(start_path)
+                          if not os.path.islink(path) and mounts.get(path) not in PSEUDO_FS_TYPES)
+        # Only the top of nested unlisted folders is walked, and the scan's rows below it are ignored
+        walk_roots = []
+        for path in unlisted:
+            if not walk_roots or not path.startswith(walk_roots[-1].rstrip(os.sep) + os.sep):
+                walk_roots.append(path)
+        skipped_prefixes = tuple(path.rstrip(os.sep) + os.sep for path in walk_roots)
+
+        states = {}
+        for path, size in self.coverage.files(start_path, MIN_DUPLICATE_SIZE):
+            if not self._is_running: break
+            if skipped_prefixes and path.startswith(skipped_prefixes):
+                continue
+            if self.exclusions:
+                # The scan may predate exclusions added since
+                parent = os.path.dirname(path)
+                state = states.get(parent)
+                if state is None:
+                    state = states[parent] = self.exclusions.state_for(parent)
+                if self.exclusions.child(state, os.path.basename(path), path) is EXCLUDED:
+                    continue
+            self.file_count += 1
+            files_by_size.setdefault(size, []).append(path)
+        return walk_roots
+
+    def iter_duplicates(self):
+        """
+        Yields each set of duplicate paths as soon as it is confirmed.
+        Used directly by the headless CLI; run() collects the sets for the GUI.
+        """
+        if self.throttle:
+            self.throttle.apply_priority()
+        self.progress_update.emit("Grouping files by size...")
+        files_by_size = {}
+        self.file_count = 0
 
+        walk_roots = [self.start_path]
+        try:
+            if self.coverage is not None and self.coverage.covers(self.start_path, self.exclusions):
+                self.progress_update.emit("Grouping files by size from the Smart Cleaner scan...")
+                walk_roots = self._seed_sizes(files_by_size)
+                logging.info(f"Duplicate search took {self.file_count} file sizes from the last scan; "
+                             f"walking {len(walk_roots)} folders it did not list.")
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Could not use the last scan for the duplicate search, walking instead: {e}")
+            files_by_size.clear()
+            walk_roots = [self.start_path]
+        finally:
+            if self.coverage is not None:
+                self.coverage.close()
+        for walk_root in walk_roots:
+            self._walk_sizes(walk_root, files_by_size)
+        
+        try:
+            yield from self._iter_hashed_duplicates(files_by_size)
+        finally:
+            if self.hash_cache is not None:
+                self.hash_cache.close()
+
+    def _iter_hashed_duplicates(self, files_by_size):
+        """Yields the sets of paths within each size group whose contents are identical."""
+        self.progress_update.emit("Identifying duplicates by content...")
+        potential_dupes = {size: paths for size, paths in files_by_size.items() if len(paths) > 1}
+
+        self.bytes_hashed = 0
+        self._hash_started = self._last_rate_report = time.monotonic()
+        try:
+            # 1. Quick Hash (first 8KB) of every file that shares its size with another
+            quick_paths = [path for paths in potential_dupes.values() for path in paths]
+            quick_hashes = dict(self._hash_files(quick_paths, 'quick', "Analyzing"))
+            if not self._is_running: return
+
+            candidate_sets = []
             for size, paths in potential_dupes.items():
-                if not self._is_running: break
-                
-                # 1. Quick Hash (first 8KB)
                 files_by_quick_hash = {}
                 for path in paths:
-                    if not self._is_running: break
-                    self.progress_update.emit(f"Analyzing: {os.path.basename(path)}")
-                    q_hash = self.hash_file(path, quick_hash=True)
+                    q_hash = quick_hashes.get(path)
                     if q_hash:
-                        if q_hash in files_by_quick_hash:
-                            files_by_quick_hash[q_hash].append(path)
-                        else:
-                            files_by_quick_hash[q_hash] = [path]
-                
-                # 2. Full Hash (only for matching quick hashes)
-                for q_hash, q_paths in files_by_quick_hash.items():
-                    if len(q_paths) < 2: continue
-                    if not self._is_running: break
-                    
+                        files_by_quick_hash.setdefault(q_hash, []).append(path)
+                candidate_sets.extend((size, q_paths) for q_paths in files_by_quick_hash.values() if len(q_paths) > 1)
+
+            # 2. Sampled Hash of large files, so that files with identical headers but different
+            # content are told apart without reading them in full
+            if self.sample_count >= 0:
+                sample_paths = [path for size, q_paths in candidate_sets if size >= SAMPLE_MIN_SIZE for path in q_paths]
+                if sample_paths:
+                    sample_hashes = dict(self._hash_files(sample_paths, 'sample', "Sampling"))
+                    if not self._is_running: return
+                    candidate_sets = [(size, self._matching_samples(q_paths, sample_hashes))
+                                      if size >= SAMPLE_MIN_SIZE else (size, q_paths)
+                                      for size, q_paths in candidate_sets]
+                    candidate_sets = [(size, q_paths) for size, q_paths in candidate_sets if len(q_paths) > 1]
+
+            # 3. Full Hash (only for files that matched every stage above)
+            # Files are read in disk order, but sets are yielded in the order above, each once all its files are hashed
+            full_hashes = {}
+            next_set = 0
+            for path, full_hash in self._hash_files([path for _, q_paths in candidate_sets for path in q_paths],
+                                                    'full', "Verifying"):
+                full_hashes[path] = full_hash
+                while next_set < len(candidate_sets) and all(p in full_hashes for p in candidate_sets[next_set][1]):
                     files_by_full_hash = {}
-                    for path in q_paths:
-                        if not self._is_running: break
-                        self.progress_update.emit(f"Verifying: {os.path.basename(path)}")
-                        full_hash = self.hash_file(path, quick_hash=False)
-                        if full_hash:
-                            if full_hash in files_by_full_hash:
-                                files_by_full_hash[full_hash].append(path)
-                            else:
-                                files_by_full_hash[full_hash] = [path]
-                    
+                    for q_path in candidate_sets[next_set][1]:
+                        if full_hashes[q_path]:
+                            files_by_full_hash.setdefault(full_hashes[q_path], []).append(q_path)
+                    next_set += 1
+
                     for f_hash_paths in files_by_full_hash.values():
                         if len(f_hash_paths) > 1:
-                            duplicates.append(f_hash_paths)
+                            yield f_hash_paths
+        finally:
+            elapsed = time.monotonic() - self._hash_started
+            if self.bytes_hashed:
+                rate = self.bytes_hashed / max(elapsed, 1e-6)
+                self.hash_rate.emit(rate)
+                logging.info(f"Duplicate search read {self.bytes_hashed} bytes for hashing in {elapsed:.1f}s "
+                             f"({rate / (1024 * 1024):.1f} MB/s).")
+
+    @staticmethod
+    def _matching_samples(paths, sample_hashes):
+        """
+        Returns the `paths` whose sampled hash matches another one's, in
+        their order. The set is not split up by sample, so the full hash
+        groups it into the same duplicate sets, in the same order, as
+        without the sampled stage.
+        """
+        counts = {}
+        for path in paths:
+            if sample_hashes.get(path):
+                counts[sample_hashes[path]] = counts.get(sample_hashes[path], 0) + 1
+        return [path for path in paths if counts.get(sample_hashes.get(path), 0) > 1]
+
+    def run(self):
+        """Scans for duplicates and emits a list of them."""
+        try:
+            duplicates = list(self.iter_duplicates())
 
             if not self._is_running:
                 self.progress_update.emit("Scan cancelled by user")
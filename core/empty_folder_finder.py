@@ -1,5 +1,6 @@
 import os
 from PyQt6.QtCore import QObject, pyqtSignal
+from .exclusions import ExclusionMatcher, EXCLUDED
 
 class EmptyFolderFinderWorker(QObject):
     """Scans for empty folders in a separate thread."""
@@ -7,27 +8,45 @@ class EmptyFolderFinderWorker(QObject):
     empty_folder_found = pyqtSignal(str)
     scan_finished = pyqtSignal(int) # Returns count of folders found
 
-    def __init__(self, start_path, exclusions=None):
+    def __init__(self, start_path, exclusions=None, throttle=None):
         super().__init__()
         self.start_path = start_path
         self._is_running = True
         self.folder_count = 0
-        self.exclusions = [path.lower() for path in exclusions] if exclusions else []
+        self.exclusions = ExclusionMatcher(exclusions)
+        self.throttle = throttle
+        if throttle is not None:
+            throttle.should_stop = lambda: not self._is_running
 
-    def run(self):
-        """Scans for empty folders and emits them."""
-        for root, dirs, files in os.walk(self.start_path, topdown=False):
+    def iter_empty_folders(self):
+        """Yields the path of each empty folder; used directly by the headless CLI."""
+        # Top-down so excluded subtrees can be pruned. Emptiness only depends on a
+        # folder's own listing, so the walk order doesn't change the results.
+        if self.throttle:
+            self.throttle.apply_priority()
+        for root, dirs, files in os.walk(self.start_path, topdown=True):
             if not self._is_running:
                 break
+            if self.throttle:
+                self.throttle.pace(len(dirs) + len(files))
             
-            lower_root = root.lower()
-            if any(lower_root.startswith(ex) for ex in self.exclusions):
-                continue
+            is_empty = not dirs and not files
+            if self.exclusions:
+                state = self.exclusions.state_for(root)
+                if state is EXCLUDED:
+                    dirs[:] = []
+                    continue
+                dirs[:] = [d for d in dirs if self.exclusions.child(state, d, os.path.join(root, d)) is not EXCLUDED]
 
-            if not dirs and not files:
-                self.progress_update.emit(f"Found empty folder: {root}")
-                self.empty_folder_found.emit(root)
+            if is_empty:
                 self.folder_count += 1
+                yield root
+
+    def run(self):
+        """Scans for empty folders and emits them."""
+        for root in self.iter_empty_folders():
+            self.progress_update.emit(f"Found empty folder: {root}")
+            self.empty_folder_found.emit(root)
         
         self.scan_finished.emit(self.folder_count)
 
@@ -0,0 +1,141 @@
+import os
+import re
+import fnmatch
+
+# Returned by ExclusionMatcher when a path is excluded
+EXCLUDED = object()
+
+# Marks the end of an excluded path in the trie
+_TERMINAL = None
+
+_GLOB_CHARS = ('*', '?', '[')
+
+
+def _translate_path_glob(pattern):
+    """
+    Translates an absolute glob to a regex like fnmatch.translate() does,
+    except that '*', '?' and '[...]' never match os.sep, so each matches
+    within one path component.
+    """
+    sep = re.escape(os.sep)
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char == '*':
+            parts.append(f'[^{sep}]*')
+        elif char == '?':
+            parts.append(f'[^{sep}]')
+        elif char == '[':
+            end = i + 1 if i < n and pattern[i] == '!' else i
+            end = pattern.find(']', end + 1 if end < n and pattern[end] == ']' else end)
+            if end == -1 or os.sep in pattern[i:end]:
+                parts.append(re.escape(char))
+                continue
+            chars = pattern[i:end]
+            i = end + 1
+            negated = chars.startswith('!')
+            if negated:
+                chars = chars[1:]
+            chars = re.sub(r'([\\\[\]&~|^])', r'\\\1', chars)
+            parts.append(f'[^{sep}{chars}]' if negated else f'(?!{sep})[{chars}]')
+        else:
+            parts.append(re.escape(char))
+    return f"(?s:{''.join(parts)})\\Z"
+
+
+class ExclusionMatcher:
+    """
+    Compiled exclusion rules shared by all scanning workers.
+
+    Patterns are matched case-insensitively and come in three forms:
+      - absolute paths ("C:\\Users\\me\\Videos"), matched by whole path
+        components, so "C:\\foo" excludes "C:\\foo\\bar" but not "C:\\foobar";
+      - absolute globs ("/home/*/.cache"), matched against the full path;
+        "*", "?" and "[...]" stay within one path component, so
+        "/home/*/.cache" doesn't match "/home/me/projects/.cache";
+      - bare names or name globs ("node_modules", "*.tmp"), matched against
+        the name of every entry.
+
+    Plain paths are stored in a trie of path components and all globs are
+    compiled into one regex each, so the cost of a check doesn't grow with the
+    number of rules. Walkers get a state for each directory with state_for()
+    and test its entries with child(), which only looks at one component.
+    """
+
+    def __init__(self, patterns=None):
+        self.patterns = []
+        self._trie = {}
+        name_globs = []
+        path_globs = []
+
+        for pattern in patterns or []:
+            if not pattern:
+                continue
+            pattern = os.path.normpath(pattern.strip()).lower()
+            self.patterns.append(pattern)
+            if os.sep not in pattern and '/' not in pattern:
+                name_globs.append(fnmatch.translate(pattern))
+                continue
+            # Drive and filesystem roots ("c:\\", "/") end in a separator
+            pattern = pattern.rstrip(os.sep) if pattern != os.sep else ''
+            if any(char in pattern for char in _GLOB_CHARS):
+                path_globs.append(_translate_path_glob(pattern))
+            else:
+                node = self._trie
+                for part in pattern.split(os.sep):
+                    node = node.setdefault(part, {})
+                node[_TERMINAL] = True
+
+        self._name_re = re.compile('|'.join(name_globs)) if name_globs else None
+        self._path_re = re.compile('|'.join(path_globs)) if path_globs else None
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def state_for(self, path):
+        """
+        Returns EXCLUDED if `path` or one of its parents is excluded, otherwise
+        an opaque state to pass to child() for the entries of `path`.
+        """
+        if not self.patterns:
+            return None
+        lower_path = os.path.normpath(path).lower()
+        parts = lower_path.rstrip(os.sep).split(os.sep) if lower_path != os.sep else ['']
+        node = self._trie or None
+        for i, part in enumerate(parts):
+            if self._name_re is not None and part and self._name_re.match(part):
+                return EXCLUDED
+            if self._path_re is not None and self._path_re.match(os.sep.join(parts[:i + 1])):
+                return EXCLUDED
+            if node is not None:
+                node = node.get(part)
+                if node is not None and _TERMINAL in node:
+                    return EXCLUDED
+        return node
+
+    def child(self, state, name, path):
+        """
+        Checks the entry `name` (full path `path`) of a directory whose state
+        is `state`. Returns EXCLUDED or the state for the entry itself.
+        """
+        if state is EXCLUDED:
+            return EXCLUDED
+        if not self.patterns:
+            return None
+        lower_name = name.lower()
+        if self._name_re is not None and self._name_re.match(lower_name):
+            return EXCLUDED
+        if self._path_re is not None and self._path_re.match(path.lower()):
+            return EXCLUDED
+        if state is not None:
+            node = state.get(lower_name)
+            if node is not None and _TERMINAL in node:
+                return EXCLUDED
+            return node
+        return None
+
+    def matches(self, path):
+        """Returns True if `path` is excluded."""
+        return self.state_for(path) is EXCLUDED
@@ -0,0 +1,170 @@
+import os
+import time
+import sqlite3
+import logging
+from PyQt6.QtCore import QStandardPaths
+
+APP_NAME = "MasterDeleter"
+HASH_CACHE_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME, "hash_cache.db")
+
+# About 150 bytes each on disk, so the default keeps the cache around 30 MB
+DEFAULT_MAX_ENTRIES = 200000
+# Pending writes are committed in batches of this many
+COMMIT_EVERY = 1000
+# Digests an entry can hold: the first block, samples spread over the file, and the whole content
+HASH_KINDS = ('quick', 'sample', 'full')
+
+
+class HashCache:
+    """
+    Persistent cache of the duplicate finder's content hashes.
+
+    Entries are keyed by (st_dev, st_ino, size, mtime_ns): the same file
+    reached through another path or hard link hits, and a file whose size
+    or modification time changed misses and is hashed again. Each entry
+    holds whichever of the HASH_KINDS digests are known.
+    When the cache grows past `max_entries`, the least recently used
+    entries are dropped on close().
+
+    The connection is opened on first use, so the cache can be created on
+    the GUI thread and used on the worker's. A cache that can't be opened
+    just misses.
+    """
+
+    def __init__(self, db_path=HASH_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.conn = None
+        self.hits = 0
+        self.misses = 0
+        self._failed = False
+        self._pending = 0
+        self._touched = {}
+
+    def _connect(self):
+        if self.conn is None and not self._failed:
+            try:
+                db_dir = os.path.dirname(self.db_path)
+                if db_dir and not os.path.exists(db_dir):
+                    os.makedirs(db_dir)
+                self.conn = sqlite3.connect(self.db_path)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+                self.conn.executescript('''
+                    CREATE TABLE IF NOT EXISTS hashes (
+                        dev INTEGER NOT NULL,
+                        ino INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        quick TEXT,
+                        full TEXT,
+                        used REAL NOT NULL,
+                        PRIMARY KEY (dev, ino)
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_hashes_used ON hashes(used);
+                ''')
+                # Caches written before sampled hashes were added lack their column
+                if 'sample' not in {row[1] for row in self.conn.execute("PRAGMA table_info(hashes)")}:
+                    self.conn.execute("ALTER TABLE hashes ADD COLUMN sample TEXT")
+                    self.conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logging.error(f"Could not open the hash cache {self.db_path}: {e}")
+                self._failed = True
+                self.conn = None
+        return self.conn
+
+    @staticmethod
+    def key(path):
+        """Returns the cache key for `path`, or None if the filesystem has no stable inode numbers."""
+        return HashCache.stat_key(os.stat(path))
+
+    @staticmethod
+    def stat_key(st):
+        """Returns the cache key for a file's os.stat() result."""
+        if not st.st_ino:
+            return None
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def get(self, key, kind):
+        """Returns the cached digest of `kind` (one of HASH_KINDS) for `key`, or None if it isn't known."""
+        conn = self._connect()
+        if conn is None or key is None:
+            return None
+        if kind not in HASH_KINDS:
+            raise ValueError(f"Unknown hash kind: {kind}")
+        try:
+            row = conn.execute(f"SELECT {kind} FROM hashes WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                               key).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Hash cache lookup failed: {e}")
+            return None
+        if row is None or row[0] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key[:2]] = time.time()
+        return row[0]
+
+    def put(self, key, kind, digest):
+        """
+        Records the digest of `kind` for `key`, keeping the entry's other
+        digests. An entry for the same inode with another size or mtime is
+        replaced.
+        """
+        conn = self._connect()
+        if conn is None or key is None:
+            return
+        if kind not in HASH_KINDS:
+            raise ValueError(f"Unknown hash kind: {kind}")
+        same_file = "size = excluded.size AND mtime_ns = excluded.mtime_ns"
+        kept = ", ".join(f"{other} = CASE WHEN {same_file} THEN {other} ELSE NULL END"
+                         for other in HASH_KINDS if other != kind)
+        try:
+            conn.execute(f'''
+                INSERT INTO hashes (dev, ino, size, mtime_ns, {kind}, used) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (dev, ino) DO UPDATE SET
+                    {kind} = excluded.{kind}, {kept},
+                    size = excluded.size, mtime_ns = excluded.mtime_ns, used = excluded.used
+            ''', (*key, digest, time.time()))
+        except sqlite3.Error as e:
+            logging.warning(f"Hash cache update failed: {e}")
+            return
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Commits pending entries and the last-used times of the entries read since the last flush."""
+        if self.conn is None:
+            return
+        touched, self._touched = self._touched, {}
+        try:
+            self.conn.executemany("UPDATE hashes SET used = ? WHERE dev = ? AND ino = ?",
+                                  [(used, dev, ino) for (dev, ino), used in touched.items()])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not write the hash cache: {e}")
+        self._pending = 0
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute("DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes ORDER BY used LIMIT ?)",
+                              (excess,))
+            self.conn.commit()
+            logging.info(f"Dropped the {excess} least recently used hash cache entries.")
+
+    def close(self):
+        """Commits, trims the cache to `max_entries` and closes the connection."""
+        if self.conn is None:
+            return
+        self.flush()
+        try:
+            self._evict()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not trim the hash cache: {e}")
+        self.conn.close()
+        self.conn = None
+        if self.hits or self.misses:
+            logging.info(f"Hash cache: {self.hits} hits, {self.misses} misses.")
@@ -0,0 +1,68 @@
+import os
+import re
+import logging
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROC_MOUNTS = '/proc/mounts'
+
+# Kernel and virtual filesystems: their files don't take up disk space, and
+# walking them is slow (/proc) or can block (autofs, fusectl)
+PSEUDO_FS_TYPES = frozenset({
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'cgroup', 'cgroup2', 'debugfs', 'tracefs', 'securityfs',
+    'pstore', 'bpf', 'configfs', 'fusectl', 'mqueue', 'hugetlbfs', 'autofs', 'binfmt_misc',
+    'efivarfs', 'rpc_pipefs', 'nsfs', 'selinuxfs', 'ramfs', 'devfs',
+})
+
+# /proc/mounts escapes spaces, tabs, newlines and backslashes as octal
+_OCTAL_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+
+def _unescape(field):
+    return _OCTAL_ESCAPE.sub(lambda match: chr(int(match.group(1), 8)), field)
+
+
+def read_mounts():
+    """
+    Returns {mount point: filesystem type} for the mounted filesystems, from
+    /proc/mounts on Linux or psutil elsewhere. Returns None if neither is
+    available.
+    """
+    try:
+        with open(PROC_MOUNTS, encoding='utf-8', errors='surrogateescape') as f:
+            mounts = {}
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3:
+                    mounts[_unescape(fields[1])] = fields[2]
+            return mounts
+    except OSError:
+        pass
+    if psutil is not None:
+        try:
+            return {partition.mountpoint: partition.fstype for partition in psutil.disk_partitions(all=True)}
+        except Exception as e:
+            logging.debug(f"Could not list mounted filesystems: {e}")
+    return None
+
+
+def mounts_below(start_path, mounts=None):
+    """
+    Returns {path: filesystem type} for the mount points strictly below
+    `start_path`, spelled with `start_path` as prefix even when it is reached
+    through a symlink. Returns None if the mount table can't be read.
+    """
+    if mounts is None:
+        mounts = read_mounts()
+        if mounts is None:
+            return None
+    real_start = os.path.realpath(start_path)
+    prefix = real_start.rstrip(os.sep) + os.sep
+    below = {}
+    for mount_point, fstype in mounts.items():
+        if mount_point.startswith(prefix):
+            below[os.path.join(start_path, mount_point[len(prefix):])] = fstype
+    return below
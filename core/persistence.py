@@ -1,4 +1,3 @@
-import joblib
 import os
 import logging
 
@@ -11,6 +10,7 @@ def save_suggester(suggester, directory="."):
     
     filepath = os.path.join(directory, MODEL_FILENAME)
     try:
+        import joblib  # Imported on first use; it is only needed once there is a model
         joblib.dump(suggester, filepath)
         logging.info(f"Suggester model saved to {filepath}")
     except Exception as e:
@@ -21,6 +21,7 @@ def load_suggester(directory="."):
     filepath = os.path.join(directory, MODEL_FILENAME)
     if os.path.exists(filepath):
         try:
+            import joblib
             suggester = joblib.load(filepath)
             logging.info(f"Suggester model loaded from {filepath}")
             return suggester
@@ -0,0 +1,484 @@
+import os
+import heapq
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python fallbacks are used below
+    np = None
+
+TYPE_FILE = 0
+TYPE_DIR = 1
+_TYPE_NAMES = ('file', 'dir')
+
+_ROW_FIELDS = ('type', 'path', 'size', 'disk_size', 'category', 'mtime')
+_ENCODING_ERRORS = 'surrogatepass'
+
+
+class ResultRow:
+    """
+    Dict-like view of one row of a ScanResults store.
+
+    Supports the read access the UI, Deleter and SuggesterWorker use on scan
+    items (item['path'], item.get('size'), 'mtime' in item, ...). Keys that
+    are not scan columns, such as 'suggestion_confidence', can be set and are
+    kept on the view itself.
+    """
+    __slots__ = ('store', 'index', '_extra')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self._extra = None
+
+    def _field(self, key):
+        store, index = self.store, self.index
+        if key == 'path':
+            return store.path(index)
+        if key == 'size':
+            return store.size(index)
+        if key == 'disk_size':
+            return store.disk_size(index)
+        if key == 'category':
+            return store.category(index)
+        if key == 'type':
+            return _TYPE_NAMES[store._type[index]]
+        if key == 'mtime':
+            mtime = store._mtime[index]
+            if mtime != mtime:  # NaN: directories have no mtime
+                raise KeyError(key)
+            return mtime
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        return self._field(key)
+
+    def __setitem__(self, key, value):
+        if key in _ROW_FIELDS:
+            raise TypeError(f"'{key}' is a scan column and can't be changed through a row view")
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self):
+        keys = [key for key in _ROW_FIELDS if key in self]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        return isinstance(other, ResultRow) and other.store is self.store and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    def __repr__(self):
+        return f"ResultRow({self.to_dict()!r})"
+
+
+class RowList:
+    """A read-only sequence of ResultRow views for a list of row indices."""
+    __slots__ = ('store', 'indices')
+
+    def __init__(self, store, indices):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __bool__(self):
+        return len(self.indices) > 0
+
+    def __iter__(self):
+        store = self.store
+        for index in self.indices:
+            yield ResultRow(store, index)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return RowList(self.store, self.indices[position])
+        return ResultRow(self.store, self.indices[position])
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return f"RowList({len(self)} rows)"
+
+
+def concat_rows(row_lists):
+    """
+    Joins row lists into one sequence. Lists of rows of a single store become
+    one RowList of their indices, so no row views are built; anything else
+    is chained into a plain list.
+    """
+    row_lists = [rows for rows in row_lists if rows]
+    if row_lists and all(isinstance(rows, RowList) and rows.store is row_lists[0].store for rows in row_lists):
+        indices = array('I')
+        for rows in row_lists:
+            indices.extend(rows.indices)
+        return RowList(row_lists[0].store, indices)
+    return [row for rows in row_lists for row in rows]
+
+
+class CategoryRows(RowList):
+    """Live RowList of one category; it follows appends and removals in the store."""
+    __slots__ = ('code',)
+
+    def __init__(self, store, code):
+        self.store = store
+        self.code = code
+
+    @property
+    def indices(self):
+        return self.store._category_rows[self.code]
+
+
+class ScanResults:
+    """
+    Columnar store for scan items.
+
+    Each column is a flat array: a type code, an index into the table of
+    interned parent directories, the offset of the entry's name in one UTF-8
+    blob, apparent and allocated size, mtime (NaN for directories) and a
+    small integer category code. A row costs roughly 40 bytes plus its
+    name, where an item dict with its path, float and int objects costs
+    several hundred. Paths and dicts are only built when a row is looked at,
+    through ResultRow views.
+
+    Removed rows are only marked dead so indices held by views stay valid;
+    the space is reclaimed when the store is replaced by the next scan.
+    """
+
+    def __init__(self):
+        self._dir_prefixes = []     # interned parent directories, each ending in a separator
+        self._dir_ids = {}          # prefix -> index in _dir_prefixes
+        self._categories = []       # category code -> name
+        self._category_codes = {}   # name -> category code
+        self._category_rows = []    # category code -> array of row indices
+        self._category_sizes = []   # category code -> total size of its live rows
+        self._category_disk_sizes = []  # category code -> total allocated size of its live rows
+
+        self._type = bytearray()
+        self._category = bytearray()
+        self._alive = bytearray()
+        self._parent = array('I')
+        self._name_ends = array('Q')
+        self._names = bytearray()
+        self._size = array('q')
+        self._disk_size = array('q')
+        self._mtime = array('d')
+        self._live_count = 0
+
+    # --- Building ---
+
+    def category_code(self, category):
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self._categories)
+            if code > 255:
+                raise ValueError("ScanResults supports at most 256 categories")
+            self._categories.append(category)
+            self._category_codes[category] = code
+            self._category_rows.append(array('I'))
+            self._category_sizes.append(0)
+            self._category_disk_sizes.append(0)
+        return code
+
+    def _dir_id(self, prefix):
+        dir_id = self._dir_ids.get(prefix)
+        if dir_id is None:
+            dir_id = len(self._dir_prefixes)
+            self._dir_prefixes.append(prefix)
+            self._dir_ids[prefix] = dir_id
+        return dir_id
+
+    def append(self, item):
+        """Adds a scan item dict and returns its row index."""
+        head, sep, name = item['path'].rpartition(os.sep)
+        code = self.category_code(item['category'])
+        is_dir = item['type'] == 'dir'
+        size = 0 if is_dir else item.get('size', 0)
+        # Items from indexes written before allocated sizes were recorded only have 'size'
+        disk_size = 0 if is_dir else item.get('disk_size', size)
+        mtime = item.get('mtime')
+
+        index = len(self._type)
+        self._type.append(TYPE_DIR if is_dir else TYPE_FILE)
+        self._category.append(code)
+        self._alive.append(1)
+        self._parent.append(self._dir_id(head + sep))
+        self._names += name.encode('utf-8', _ENCODING_ERRORS)
+        self._name_ends.append(len(self._names))
+        self._size.append(size)
+        self._disk_size.append(disk_size)
+        self._mtime.append(float('nan') if is_dir or mtime is None else mtime)
+
+        self._category_rows[code].append(index)
+        self._category_sizes[code] += size
+        self._category_disk_sizes[code] += disk_size
+        self._live_count += 1
+        return index
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    # --- Column access ---
+
+    def __len__(self):
+        return self._live_count
+
+    def name(self, index):
+        start = self._name_ends[index - 1] if index else 0
+        return self._names[start:self._name_ends[index]].decode('utf-8', _ENCODING_ERRORS)
+
+    def path(self, index):
+        return self._dir_prefixes[self._parent[index]] + self.name(index)
+
+    def size(self, index):
+        return self._size[index]
+
+    def disk_size(self, index):
+        return self._disk_size[index]
+
+    def category(self, index):
+        return self._categories[self._category[index]]
+
+    def is_dir(self, index):
+        return self._type[index] == TYPE_DIR
+
+    def row(self, index):
+        return ResultRow(self, index)
+
+    def rows(self):
+        """Returns a RowList of all live rows in insertion order."""
+        alive = self._alive
+        return RowList(self, [i for i in range(len(alive)) if alive[i]])
+
+    def feature_columns(self, indices):
+        """
+        Returns the size, mtime (NaN for directories), category code and path
+        depth of the rows in `indices` as NumPy arrays, read straight from the
+        columns. Category codes index self.categories(). Requires NumPy.
+        Call it on the thread that adds to the store: appending fails while
+        the NumPy views it takes of the columns exist.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        sizes = np.frombuffer(self._size, dtype=np.int64)[indices]
+        mtimes = np.frombuffer(self._mtime, dtype=np.float64)[indices]
+        categories = np.frombuffer(self._category, dtype=np.uint8)[indices]
+        # An entry is one level below its parent, so depth is a per-directory lookup
+        dir_depths = np.fromiter((prefix.count(os.sep) for prefix in self._dir_prefixes), dtype=np.int64,
+                                 count=len(self._dir_prefixes))
+        depths = dir_depths[np.frombuffer(self._parent, dtype=np.uint32)[indices]]
+        return sizes, mtimes, categories, depths
+
+    def extension_codes(self, indices, codes):
+        """
+        Returns an int32 array with the code of each row's lower-cased extension,
+        looked up in and added to `codes` (extension -> code). Requires NumPy.
+        """
+        splitext = os.path.splitext
+        result = np.empty(len(indices), dtype=np.int32)
+        for position, index in enumerate(indices):
+            extension = splitext(self.name(index))[1].lower()
+            code = codes.get(extension)
+            if code is None:
+                code = codes[extension] = len(codes)
+            result[position] = code
+        return result
+
+    def categories(self):
+        """Returns the category names, indexed by category code."""
+        return list(self._categories)
+
+    def category_rows(self, category):
+        return CategoryRows(self, self.category_code(category))
+
+    def category_size(self, category, column='size'):
+        """Returns the total 'size' or 'disk_size' of a category's live rows."""
+        code = self._category_codes.get(category)
+        if code is None:
+            return 0
+        return (self._category_disk_sizes if column == 'disk_size' else self._category_sizes)[code]
+
+    def memory_usage(self):
+        """Approximate bytes used by the columns and the interned directory table."""
+        columns = (len(self._type) + len(self._category) + len(self._alive) + len(self._names) +
+                   self._parent.itemsize * len(self._parent) + self._name_ends.itemsize * len(self._name_ends) +
+                   self._size.itemsize * len(self._size) + self._disk_size.itemsize * len(self._disk_size) +
+                   self._mtime.itemsize * len(self._mtime) +
+                   sum(rows.itemsize * len(rows) for rows in self._category_rows))
+        directories = sum(len(prefix) + 49 for prefix in self._dir_prefixes)
+        return columns + directories
+
+    # --- Queries ---
+
+    def _live_files_mask(self):
+        types = np.frombuffer(self._type, dtype=np.uint8)
+        alive = np.frombuffer(self._alive, dtype=np.uint8)
+        return (types == TYPE_FILE) & (alive == 1)
+
+    def largest_files(self, limit=100, column='size'):
+        """Returns a RowList of the `limit` largest live files by 'size' or 'disk_size', largest first."""
+        if not self._type:
+            return RowList(self, [])
+        values = self._disk_size if column == 'disk_size' else self._size
+        if np is not None:
+            sizes = np.frombuffer(values, dtype=np.int64)
+            candidates = np.flatnonzero(self._live_files_mask())
+            if len(candidates) > limit:
+                top = np.argpartition(sizes[candidates], len(candidates) - limit)[-limit:]
+                candidates = candidates[top]
+            order = np.argsort(-sizes[candidates], kind='stable')
+            indices = candidates[order].tolist()
+            del sizes
+            return RowList(self, indices)
+        files = (i for i in range(len(self._type)) if self._alive[i] and self._type[i] == TYPE_FILE)
+        return RowList(self, heapq.nlargest(limit, files, key=values.__getitem__))
+
+    def files_older_than(self, timestamp):
+        """Returns a RowList of live files last modified before `timestamp`."""
+        if not self._type:
+            return RowList(self, [])
+        if np is not None:
+            mtimes = np.frombuffer(self._mtime, dtype=np.float64)
+            indices = np.flatnonzero(self._live_files_mask() & (mtimes < timestamp)).tolist()
+            del mtimes
+            return RowList(self, indices)
+        mtime, alive, types = self._mtime, self._alive, self._type
+        return RowList(self, [i for i in range(len(types))
+                              if alive[i] and types[i] == TYPE_FILE and mtime[i] < timestamp])
+
+    def _rows_in_dirs(self, dir_ids):
+        """Returns the live row indices whose parent directory is one of `dir_ids`."""
+        if not dir_ids:
+            return []
+        if np is not None:
+            parents = np.frombuffer(self._parent, dtype=np.uint32)
+            alive = np.frombuffer(self._alive, dtype=np.uint8)
+            mask = np.isin(parents, np.fromiter(dir_ids, dtype=np.uint32, count=len(dir_ids))) & (alive == 1)
+            indices = np.flatnonzero(mask).tolist()
+            del parents, alive
+            return indices
+        parent, alive = self._parent, self._alive
+        return [i for i in range(len(parent)) if alive[i] and parent[i] in dir_ids]
+
+    def subtree_rows(self, root):
+        """Returns the live row indices below the directory `root` (not including `root` itself)."""
+        prefix = root.rstrip(os.sep) + os.sep
+        return self._rows_in_dirs({dir_id for dir_prefix, dir_id in self._dir_ids.items()
+                                   if dir_prefix.startswith(prefix)})
+
+    def find(self, paths):
+        """Returns {path: row index} for the live rows among `paths`."""
+        wanted = {}
+        for path in paths:
+            head, sep, name = path.rpartition(os.sep)
+            dir_id = self._dir_ids.get(head + sep)
+            if dir_id is not None:
+                wanted.setdefault(dir_id, set()).add(name)
+
+        found = {}
+        for index in self._rows_in_dirs(set(wanted)):
+            if self.name(index) in wanted[self._parent[index]]:
+                found[self.path(index)] = index
+        return found
+
+    def recategorize(self, categorizer):
+        """
+        Re-runs `categorizer` (a core.categorizer.Categorizer) over the live rows
+        from the stored names, sizes and mtimes, one directory at a time and
+        parents before children, so nothing is rescanned. Returns the set of
+        category names that gained or lost rows.
+        """
+        rows_by_dir = {}
+        alive = self._alive
+        for index in range(len(alive)):
+            if alive[index]:
+                rows_by_dir.setdefault(self._parent[index], []).append(index)
+
+        affected = set()
+        dir_prefixes = self._dir_prefixes
+        for dir_id in sorted(rows_by_dir, key=lambda dir_id: len(dir_prefixes[dir_id])):
+            indices = rows_by_dir[dir_id]
+            names = [self.name(index) for index in indices]
+            rule = categorizer.rule_for(os.path.dirname(dir_prefixes[dir_id]), names)
+            for index, name in zip(indices, names):
+                is_dir = self._type[index] == TYPE_DIR
+                mtime = self._mtime[index]
+                category = rule.categorize(name, is_dir, self._size[index], None if mtime != mtime else mtime)
+                old_code = self._category[index]
+                code = self.category_code(category)
+                if code == old_code:
+                    continue
+                self._category[index] = code
+                self._category_sizes[old_code] -= self._size[index]
+                self._category_disk_sizes[old_code] -= self._disk_size[index]
+                self._category_sizes[code] += self._size[index]
+                self._category_disk_sizes[code] += self._disk_size[index]
+                affected.update((old_code, code))
+
+        if affected:
+            # Rebuilt in row order, like appends leave them
+            rebuilt = {code: array('I') for code in affected}
+            category = self._category
+            for index in range(len(alive)):
+                rows = rebuilt.get(category[index])
+                if rows is not None and alive[index]:
+                    rows.append(index)
+            for code, rows in rebuilt.items():
+                self._category_rows[code] = rows
+        return {self._categories[code] for code in affected}
+
+    def remove_paths(self, paths, subtrees=()):
+        """
+        Removes the rows for `paths` and every row below the directories in
+        `subtrees`. Returns ({path: row index} of the removed `paths`, set of
+        affected category names). Removed rows can still be read by index.
+        """
+        found = self.find(paths)
+        removed = list(found.values())
+        if subtrees:
+            prefixes = tuple(root.rstrip(os.sep) + os.sep for root in subtrees)
+            dir_ids = {dir_id for prefix, dir_id in self._dir_ids.items() if prefix.startswith(prefixes)}
+            removed.extend(self._rows_in_dirs(dir_ids))
+
+        affected = set()
+        for index in removed:
+            if not self._alive[index]:
+                continue
+            self._alive[index] = 0
+            self._live_count -= 1
+            code = self._category[index]
+            self._category_sizes[code] -= self._size[index]
+            self._category_disk_sizes[code] -= self._disk_size[index]
+            affected.add(code)
+
+        alive = self._alive
+        for code in affected:
+            self._category_rows[code] = array('I', (i for i in self._category_rows[code] if alive[i]))
+        return found, {self._categories[code] for code in affected}
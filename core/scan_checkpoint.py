@@ -0,0 +1,85 @@
+import os
+import time
+import pickle
+import logging
+import threading
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_INTERVAL = 60.0  # seconds between checkpoints of a running scan
+
+
+class CheckpointWriter:
+    """
+    Writes scan checkpoints on a background thread, so pickling a large
+    frontier never stalls the walk. A checkpoint requested while the previous
+    one is still being written is skipped.
+
+    A checkpoint holds the walker's frontier (directories still to list and
+    the partial totals of unfinished ones), the totals of finished subtrees,
+    and the number of items already stored in the scan index. Together with
+    the index it is enough to resume the scan where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread = None
+
+    def busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def write(self, state):
+        if self.busy():
+            return False
+        state = dict(state, version=CHECKPOINT_VERSION, created=time.time())
+        self._thread = threading.Thread(target=self._write, args=(state,), daemon=True)
+        self._thread.start()
+        return True
+
+    def _write(self, state):
+        directory = os.path.dirname(self.path)
+        temp_path = self.path + ".tmp"
+        try:
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(temp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+            logging.debug(f"Scan checkpoint written: {state['items_written']} items, "
+                          f"{len(state['walker']['pending'])} folders still to scan")
+        except Exception as e:
+            logging.error(f"Failed to write scan checkpoint: {e}")
+
+    def discard(self):
+        """Waits for a pending write and removes the checkpoint; called when a scan ends normally."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        remove_checkpoint(self.path)
+
+
+def load_checkpoint(path):
+    """Returns the checkpoint at `path`, or None if there is none or it can't be resumed."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except Exception as e:
+        logging.warning(f"Could not load scan checkpoint {path}: {e}")
+        return None
+    if not isinstance(state, dict) or state.get('version') != CHECKPOINT_VERSION:
+        return None
+    if not os.path.isdir(state.get('start_path', '')):
+        logging.info(f"Scan checkpoint is for a folder that no longer exists: {state.get('start_path')}")
+        return None
+    return state
+
+
+def remove_checkpoint(path):
+    for filepath in (path, path + ".tmp"):
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"Could not remove scan checkpoint {filepath}: {e}")
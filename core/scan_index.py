@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import sqlite3
+import itertools
+import logging
+
+# Columns a size query can rank or sum by: apparent size or allocated size on disk
+SIZE_COLUMNS = ('size', 'disk_size')
+
+
+def _size_column(column):
+    if column not in SIZE_COLUMNS:
+        raise ValueError(f"Unknown size column: {column}")
+    return column
+
+class ScanIndex:
+    """
+    On-disk SQLite index of the most recent Smart Cleaner scan.
+
+    The scanner streams item batches into it while scanning, so the results
+    survive restarts and crashes. The app reads category summaries on startup
+    and only loads a category's items when it is first shown.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        self._create_indexes()
+
+    def _create_tables(self):
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS items (
+                path TEXT NOT NULL,
+                parent TEXT NOT NULL,
+                type TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                mtime REAL,
+                disk_size INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS dir_sizes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                entry_count INTEGER NOT NULL DEFAULT 0,
+                disk_size INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS scan_info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+        # Indexes written before subtree counts were recorded lack these columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(dir_sizes)")}
+        for column in ('file_count', 'entry_count', 'disk_size'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE dir_sizes ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        if 'disk_size' not in columns:
+            self.conn.execute("UPDATE dir_sizes SET disk_size = size")
+        # Before allocated sizes were recorded, the apparent size is the best estimate
+        if 'disk_size' not in {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}:
+            self.conn.execute("ALTER TABLE items ADD COLUMN disk_size INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE items SET disk_size = size")
+        self.conn.commit()
+
+    def _create_indexes(self):
+        self.conn.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_items_path ON items(path);
+            CREATE INDEX IF NOT EXISTS idx_items_category ON items(category, size);
+            CREATE INDEX IF NOT EXISTS idx_items_size ON items(size);
+            CREATE INDEX IF NOT EXISTS idx_items_disk_size ON items(disk_size);
+            CREATE INDEX IF NOT EXISTS idx_items_mtime ON items(mtime);
+            CREATE INDEX IF NOT EXISTS idx_items_parent ON items(parent);
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+    # --- Writing (scanner thread) ---
+
+    def begin_scan(self, start_path, exclusions=()):
+        """Clears the previous results. Indexes are dropped during the bulk load and rebuilt in finish_scan."""
+        self.conn.executescript('''
+            DROP INDEX IF EXISTS idx_items_path;
+            DROP INDEX IF EXISTS idx_items_category;
+            DROP INDEX IF EXISTS idx_items_size;
+            DROP INDEX IF EXISTS idx_items_disk_size;
+            DROP INDEX IF EXISTS idx_items_mtime;
+            DROP INDEX IF EXISTS idx_items_parent;
+            DELETE FROM items;
+            DELETE FROM dir_sizes;
+            DELETE FROM scan_info;
+        ''')
+        self._set_info({'start_path': start_path, 'started': str(time.time()), 'complete': '0',
+                        'exclusions': json.dumps(list(exclusions))})
+        self.conn.commit()
+
+    def resume_scan(self, start_path, item_count):
+        """
+        Continues an interrupted scan: keeps the first `item_count` items, which
+        a checkpoint covers, and drops the ones written after it.
+        """
+        info = self.scan_info()
+        if info.get('start_path') != start_path:
+            raise ValueError(f"Scan index holds a scan of {info.get('start_path')!r}, not {start_path!r}")
+        # Rows are only appended during a scan, so rowids follow the order items were written in
+        self.conn.execute("DELETE FROM items WHERE rowid > ?", (item_count,))
+        self.conn.execute("DELETE FROM dir_sizes")
+        self._set_info({'complete': '0', 'resumed': str(time.time())})
+        self.conn.commit()
+
+    def iter_items(self, batch_size=2000):
+        """Yields the stored items as lists of item dicts, in the order they were written."""
+        cursor = self.conn.execute("SELECT path, type, size, category, mtime, disk_size FROM items ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield self._rows_to_items(rows)
+
+    def add_items(self, items):
+        dirname = os.path.dirname
+        self.conn.executemany(
+            "INSERT INTO items (path, parent, type, size, category, mtime, disk_size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(item['path'], dirname(item['path']), item['type'], item.get('size', 0), item['category'], item.get('mtime'),
+              item.get('disk_size', item.get('size', 0)))
+             for item in items])
+        self.conn.commit()
+
+    def recategorize(self, categorizer, batch_size=5000):
+        """
+        Re-runs `categorizer` (a core.categorizer.Categorizer) over the stored
+        items without touching the filesystem. Items are read grouped by
+        parent directory; parents sort before their children, so a folder's
+        project status is known before its subfolders are looked at.
+        Returns the number of items whose category changed.
+        """
+        cursor = self.conn.execute("SELECT rowid, parent, path, type, size, mtime, category FROM items ORDER BY parent")
+        changes = []
+        for parent, group in itertools.groupby(cursor, key=lambda row: row[1]):
+            rows = list(group)
+            names = [os.path.basename(row[2]) for row in rows]
+            rule = categorizer.rule_for(parent, names)
+            for (rowid, _, _, item_type, size, mtime, category), name in zip(rows, names):
+                new_category = rule.categorize(name, item_type == 'dir', size, mtime)
+                if new_category != category:
+                    changes.append((new_category, rowid))
+        for start in range(0, len(changes), batch_size):
+            self.conn.executemany("UPDATE items SET category = ? WHERE rowid = ?", changes[start:start + batch_size])
+        self.conn.commit()
+        return len(changes)
+
+    def finish_scan(self, dir_totals, complete=True):
+        """Stores the per-directory DirTotals and marks the scan as finished."""
+        self._store_dir_totals(dir_totals)
+        self._set_info({'finished': str(time.time()), 'complete': '1' if complete else '0'})
+        self.conn.commit()
+        self._create_indexes()
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+
+    def remove_paths(self, paths):
+        """Removes deleted paths so the index keeps matching the in-memory results."""
+        self.conn.executemany("DELETE FROM items WHERE path = ?", [(path,) for path in paths])
+        self.conn.commit()
+
+    def apply_changes(self, removed_paths, items, dir_totals):
+        """
+        Applies live changes from watch mode: removes `removed_paths` together
+        with everything below them, then stores `items` and the updated DirTotals.
+        """
+        # Everything below `path` sorts between path + sep and path + the next character
+        ranges = [(path, path + os.sep, path + chr(ord(os.sep) + 1)) for path in removed_paths]
+        self.conn.executemany("DELETE FROM items WHERE path = ? OR (path > ? AND path < ?)", ranges)
+        self.conn.executemany("DELETE FROM dir_sizes WHERE path = ? OR (path > ? AND path < ?)", ranges)
+        self.add_items(items)
+        self._store_dir_totals(dir_totals)
+        self.conn.commit()
+
+    def _store_dir_totals(self, dir_totals):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO dir_sizes (path, size, file_count, entry_count, disk_size) VALUES (?, ?, ?, ?, ?)",
+            ((path, totals.size, totals.files, totals.entries, totals.disk_size) for path, totals in dir_totals.items()))
+
+    def _set_info(self, values):
+        self.conn.executemany("INSERT OR REPLACE INTO scan_info (key, value) VALUES (?, ?)", values.items())
+
+    # --- Reading (UI thread) ---
+
+    def scan_info(self):
+        """Returns the metadata of the indexed scan, or an empty dict if there is none."""
+        return dict(self.conn.execute("SELECT key, value FROM scan_info").fetchall())
+
+    def category_summary(self, column='size'):
+        """Returns {category: (item_count, total_size)}, summing 'size' or 'disk_size'."""
+        rows = self.conn.execute(
+            f"SELECT category, COUNT(*), COALESCE(SUM({_size_column(column)}), 0) FROM items GROUP BY category")
+        return {category: (count, size) for category, count, size in rows}
+
+    def largest_files_summary(self, limit=100, column='size'):
+        column = _size_column(column)
+        row = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({column}), 0) FROM "
+            f"(SELECT {column} FROM items WHERE type = 'file' ORDER BY {column} DESC LIMIT ?)",
+            (limit,)).fetchone()
+        return row[0], row[1]
+
+    def old_files_summary(self, older_than, column='size'):
+        row = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({_size_column(column)}), 0) FROM items WHERE type = 'file' AND mtime < ?",
+            (older_than,)).fetchone()
+        return row[0], row[1]
+
+    def _rows_to_items(self, rows):
+        items = []
+        for path, item_type, size, category, mtime, disk_size in rows:
+            if item_type == 'dir':
+                items.append({'type': 'dir', 'path': path, 'size': size, 'category': category})
+            else:
+                items.append({'type': 'file', 'path': path, 'size': size, 'disk_size': disk_size,
+                              'category': category, 'mtime': mtime})
+        return items
+
+    def category_items(self, category):
+        rows = self.conn.execute(
+            "SELECT path, type, size, category, mtime, disk_size FROM items WHERE category = ?", (category,))
+        return self._rows_to_items(rows)
+
+    def largest_files(self, limit=100, column='size'):
+        rows = self.conn.execute(
+            "SELECT path, type, size, category, mtime, disk_size FROM items WHERE type = 'file' "
+            f"ORDER BY {_size_column(column)} DESC LIMIT ?", (limit,))
+        return self._rows_to_items(rows)
+
+    def files_older_than(self, older_than):
+        rows = self.conn.execute(
+            "SELECT path, type, size, category, mtime, disk_size FROM items WHERE type = 'file' AND mtime < ?",
+            (older_than,))
+        return self._rows_to_items(rows)
+
+    def dir_sizes_for_category(self, category, column='size'):
+        rows = self.conn.execute(
+            f"SELECT d.path, d.{_size_column(column)} FROM dir_sizes d JOIN items i ON i.path = d.path "
+            "WHERE i.category = ? AND i.type = 'dir'", (category,))
+        return dict(rows.fetchall())
+
+    def all_dir_sizes(self, column='size'):
+        return dict(self.conn.execute(f"SELECT path, {_size_column(column)} FROM dir_sizes").fetchall())
+
+
+def open_scan_index(db_path):
+    """Opens the scan index, logging and returning None if it can't be used."""
+    try:
+        return ScanIndex(db_path)
+    except sqlite3.Error as e:
+        logging.error(f"Could not open scan index {db_path}: {e}")
+        return None
@@ -0,0 +1,91 @@
+import os
+import time
+import pickle
+import hashlib
+import logging
+
+SNAPSHOT_VERSION = 3
+
+# Directories modified this close to the start of a scan may change again
+# within the same mtime tick, so their listings are never reused.
+MTIME_SAFETY_WINDOW_NS = 2 * 1_000_000_000
+
+def snapshot_filename(start_path):
+    """Returns a stable file name for the snapshot of a scan root."""
+    digest = hashlib.sha1(os.path.normcase(os.path.normpath(start_path)).encode('utf-8', 'surrogatepass')).hexdigest()
+    return f"scan_{digest[:16]}.pickle"
+
+class ScanSnapshot:
+    """
+    Per-directory listings recorded by a scan, used to skip re-listing
+    directories whose mtime has not changed since the previous scan.
+
+    Each directory maps to (mtime_ns, entries, subdirs, own_size), where
+    entries are (type, name, size, category, mtime, inode, disk_size) tuples,
+    disk_size being the allocated size from st_blocks. The inode
+    is recorded for directories and for files with more than one hard link,
+    so reused listings are de-duplicated like fresh ones; subdirs lists the
+    directories that are not symlinks.
+    """
+
+    def __init__(self, start_path, exclusions=(), directories=None):
+        self.start_path = os.path.normpath(start_path)
+        self.exclusions = tuple(exclusions)
+        self.directories = directories if directories is not None else {}
+        self.created = time.time_ns()
+
+    def lookup(self, root, mtime_ns):
+        """Returns the cached listing for `root` if its mtime is unchanged."""
+        cached = self.directories.get(root)
+        if cached is None or cached[0] is None or cached[0] != mtime_ns:
+            return None
+        return cached
+
+    def record(self, root, mtime_ns, entries, subdirs, own_size):
+        if mtime_ns is not None and mtime_ns >= self.created - MTIME_SAFETY_WINDOW_NS:
+            mtime_ns = None
+        self.directories[root] = (mtime_ns, entries, subdirs, own_size)
+
+    @classmethod
+    def load(cls, directory, start_path, exclusions=()):
+        """Loads the snapshot for `start_path`, or None if missing or not reusable."""
+        filepath = os.path.join(directory, snapshot_filename(start_path))
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Could not load scan snapshot {filepath}: {e}")
+            return None
+
+        if data.get('version') != SNAPSHOT_VERSION:
+            return None
+        if data.get('start_path') != os.path.normpath(start_path) or tuple(data.get('exclusions', ())) != tuple(exclusions):
+            # Different exclusions change which entries were recorded; rescan fully
+            logging.info("Scan snapshot exclusions differ from current exclusions, ignoring it.")
+            return None
+
+        snapshot = cls(start_path, exclusions, data.get('directories', {}))
+        logging.info(f"Loaded scan snapshot with {len(snapshot.directories)} directories from {filepath}")
+        return snapshot
+
+    def save(self, directory):
+        """Atomically writes the snapshot to `directory`."""
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        filepath = os.path.join(directory, snapshot_filename(self.start_path))
+        temp_path = filepath + ".tmp"
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'start_path': self.start_path,
+            'exclusions': self.exclusions,
+            'directories': self.directories,
+        }
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, filepath)
+            logging.info(f"Saved scan snapshot with {len(self.directories)} directories to {filepath}")
+        except Exception as e:
+            logging.error(f"Failed to save scan snapshot: {e}")
@@ -1,87 +1,168 @@
 import os
-from PyQt6.QtCore import QObject, pyqtSignal
-from .categorizer import categorize_path
+import time
+import logging
+from PyQt6.QtCore import QObject, pyqtSignal, QStandardPaths
+from .traversal import create_walker
+from .scan_snapshot import ScanSnapshot
+from .scan_index import open_scan_index
+from .scan_checkpoint import CheckpointWriter, CHECKPOINT_INTERVAL
+
+APP_NAME = "MasterDeleter"
+SNAPSHOT_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME, "snapshots")
+SCAN_INDEX_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME, "scan_index.db")
+SCAN_CHECKPOINT_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME, "scan_checkpoint.pickle")
+CATEGORY_RULES_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME, "category_rules.json")
+
+# Items are delivered to the UI thread in batches, flushed when either limit is reached
+BATCH_MAX_ITEMS = 2000
+BATCH_MAX_INTERVAL = 0.1  # seconds
 
 class Scanner(QObject):
-    item_found = pyqtSignal(dict)
-    dir_size_updated = pyqtSignal(str, int)
+    items_found = pyqtSignal(list)
     progress_update = pyqtSignal(str)
     scan_finished = pyqtSignal(dict)
 
-    def __init__(self, start_path='C:\\', exclusions=None):
+    def __init__(self, start_path='C:\\', exclusions=None, workers=1, incremental=True, index_path=None,
+                 batch_size=BATCH_MAX_ITEMS, batch_interval=BATCH_MAX_INTERVAL, throttle=None, one_filesystem=False,
+                 checkpoint_path=None, resume_state=None, rules=None):
         super().__init__()
         self.start_path = os.path.normpath(start_path)
         self._is_running = True
-        self.dir_sizes = {}
-        self.exclusions = [os.path.normpath(path.lower()) for path in exclusions] if exclusions else []
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.incremental = incremental
+        self.index_path = index_path
+        self.index = None
+        self.walker = create_walker(self.start_path, exclusions, workers=workers, record_snapshot=incremental,
+                                    throttle=throttle, one_filesystem=one_filesystem, rules=rules)
+        self.dir_totals = self.walker.dir_totals
+        self.exclusions = list(self.walker.exclusions)
+        self.one_filesystem = one_filesystem
+        self._current_dir = self.start_path
+        self._batch = []
+        self._last_flush = time.monotonic()
+
+        # Checkpoints need the scan index: they refer to the items already stored in it
+        self.checkpoints = CheckpointWriter(checkpoint_path) if checkpoint_path and index_path else None
+        self.walker.checkpointing = self.checkpoints is not None
+        self.resume_state = resume_state
+        self.items_written = 0
+        self._last_checkpoint = time.monotonic()
+
+    def _set_current_dir(self, root):
+        self._current_dir = root
+        if self.checkpoints and self.index and time.monotonic() - self._last_checkpoint >= CHECKPOINT_INTERVAL:
+            self._write_checkpoint()
+
+    def _write_checkpoint(self):
+        """Saves the frontier; called between directories, so every item yielded so far is complete."""
+        if self.checkpoints.busy():
+            return
+        # The checkpoint may only count items that are already in the index
+        if self._batch:
+            self._flush_batch()
+            if not self.index:
+                return
+        self.checkpoints.write({
+            'start_path': self.start_path,
+            'exclusions': self.exclusions,
+            'one_filesystem': self.one_filesystem,
+            'items_written': self.items_written,
+            'walker': self.walker.checkpoint(),
+        })
+        self._last_checkpoint = time.monotonic()
+
+    def _resume(self):
+        """Restores the walker and the UI from the checkpoint; returns False to fall back to a full scan."""
+        state = self.resume_state
+        try:
+            self.index.resume_scan(self.start_path, state['items_written'])
+            self.walker.restore(state['walker'])
+        except Exception as e:
+            logging.error(f"Could not resume scan from checkpoint, starting over: {e}")
+            return False
+
+        self.progress_update.emit(f"Restoring {state['items_written']:,} items from the interrupted scan...")
+        for batch in self.index.iter_items(self.batch_size):
+            if not self._is_running:
+                break
+            self.items_found.emit(batch)
+        self.items_written = state['items_written']
+        logging.info(f"Resuming scan of {self.start_path}: {self.items_written} items restored, "
+                     f"{len(state['walker']['pending'])} folders left to scan.")
+        return True
+
+    def _emit_batch(self, batch):
+        self.items_found.emit(batch)
+        if self.index:
+            try:
+                self.index.add_items(batch)
+                self.items_written += len(batch)
+            except Exception as e:
+                logging.error(f"Scan index write failed, disabling index for this scan: {e}")
+                self.index.close()
+                self.index = None
+
+    def _flush_batch(self):
+        batch, self._batch = self._batch, []
+        self._emit_batch(batch)
+        self.progress_update.emit(f"Scanning: {self._current_dir}")
+        self._last_flush = time.monotonic()
 
     def run(self):
         """Starts the file system scan."""
-        print(f"Starting scan of {self.start_path}")
-        
-        for root, dirs, files in os.walk(self.start_path, topdown=True):
+        print(f"Starting scan of {self.start_path} with {self.workers} worker(s)")
+
+        # The index connection must be created on the scanner thread
+        resumed = False
+        if self.index_path:
+            self.index = open_scan_index(self.index_path)
+            if self.index:
+                resumed = self.resume_state is not None and self._resume()
+                if not resumed:
+                    self.index.begin_scan(self.start_path, self.exclusions)
+
+        if self.incremental:
+            self.progress_update.emit("Loading previous scan snapshot...")
+            self.walker.previous_snapshot = ScanSnapshot.load(SNAPSHOT_DIR, self.start_path, self.walker.exclusions)
+            if resumed and self.walker.previous_snapshot and self.walker.snapshot is not None:
+                # Listings from before the interruption weren't recorded again; stale ones fail the mtime check
+                self.walker.snapshot.directories.update(self.walker.previous_snapshot.directories)
+
+        self._last_checkpoint = time.monotonic()
+        for item in self.walker.walk(on_enter=self._set_current_dir):
             if not self._is_running:
                 break
-            
-            root = os.path.normpath(root)
-            lower_root = root.lower()
-
-            # More robust exclusion check at the top
-            if lower_root.startswith(tuple(self.exclusions)):
-                dirs[:] = [] # Don't traverse any further down this path
-                continue # Skip processing this directory
-            
-            # Prune the directories to avoid traversing into excluded folders
-            dirs[:] = [d for d in dirs if not os.path.normpath(os.path.join(lower_root, d)).startswith(tuple(self.exclusions))]
-            
-            self.progress_update.emit(f"Scanning: {root}")
-
-            # Emit directories first
-            for name in dirs:
-                if not self._is_running:
-                    break
-                path = os.path.normpath(os.path.join(root, name))
-                category = categorize_path(path)
-                self.item_found.emit({'type': 'dir', 'path': path, 'size': 0, 'category': category})
-
-            # Process files and update directory sizes
-            current_dir_size = 0
-            for name in files:
-                if not self._is_running:
-                    break
-                try:
-                    path = os.path.normpath(os.path.join(root, name))
-                    
-                    # Double-check exclusion for the file itself
-                    if os.path.normpath(path.lower()).startswith(tuple(self.exclusions)):
-                        continue
-
-                    # Normalize the path for consistency
-                    path = os.path.normpath(path)
-
-                    stat_result = os.stat(path)
-                    size = stat_result.st_size
-                    mtime = stat_result.st_mtime
-                    current_dir_size += size
-                    category = categorize_path(path)
-                    self.item_found.emit({'type': 'file', 'path': path, 'size': size, 'category': category, 'mtime': mtime})
-                except (FileNotFoundError, PermissionError, OSError) as e:
-                    print(f"Could not access file {path}: {e}")
-
-            # Update size of current directory and all its parents
-            if current_dir_size > 0:
-                path = root
-                while path.startswith(self.start_path):
-                    path = os.path.normpath(path)
-                    self.dir_sizes[path] = self.dir_sizes.get(path, 0) + current_dir_size
-                    self.dir_size_updated.emit(path, self.dir_sizes[path])
-                    parent = os.path.dirname(path)
-                    if parent == path:
-                        break
-                    path = parent
-        
-        if self._is_running:
-            self.scan_finished.emit(self.dir_sizes)
+            self._batch.append(item)
+            if len(self._batch) >= self.batch_size or time.monotonic() - self._last_flush >= self.batch_interval:
+                self._flush_batch()
+
+        if self._batch and self._is_running:
+            self._flush_batch()
+
+        complete = self._is_running
+        if complete:
+            logging.info(f"Scan listed {self.walker.listed_dirs} directories, reused {self.walker.reused_dirs} unchanged ones from the snapshot.")
+            if self.walker.skipped_links or self.walker.skipped_dirs:
+                logging.info(f"Counted hard-linked files and bind-mounted folders once: skipped {self.walker.skipped_links} "
+                             f"extra links and {self.walker.skipped_dirs} repeated folders.")
+            self.scan_finished.emit(self.dir_totals)
+
+        # Persisted after emitting so the UI isn't kept waiting on the writes
+        if self.index:
+            try:
+                self.index.finish_scan(self.dir_totals, complete=complete)
+            except Exception as e:
+                logging.error(f"Failed to finalize scan index: {e}")
+            self.index.close()
+            self.index = None
+        if complete and self.walker.snapshot is not None:
+            self.walker.snapshot.save(SNAPSHOT_DIR)
+        # Finished or cancelled scans are not resumed; only a crash leaves the checkpoint behind
+        if self.checkpoints:
+            self.checkpoints.discard()
 
     def stop(self):
-        self._is_running = False 
\ No newline at end of file
+        self._is_running = False
+        self.walker.stop()
@@ -1,24 +1,75 @@
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction import DictVectorizer
 import os
 import time
+import zlib
+import queue
+import logging
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal
-import pandas as pd
+from .result_store import ResultRow, RowList, concat_rows
+
+# Features every item has, followed by HASH_BUCKETS columns for the hashed 'category=...' and 'extension=...' values
+NUMERIC_FEATURES = ('log_size', 'log_age_days', 'age_unknown', 'path_depth')
+HASH_BUCKETS = 512
+N_FEATURES = len(NUMERIC_FEATURES) + HASH_BUCKETS
+# Feature matrices are built this many cells at a time, which bounds training and prediction memory
+MAX_MATRIX_CELLS = 4 * 1024 * 1024
+# Passes over the heuristic examples the first model is trained on
+BOOTSTRAP_EPOCHS = 5
+# Passes over each batch of real decisions, and how many stored decisions are replayed with it
+UPDATE_EPOCHS = 5
+REPLAY_SIZE = 2000
+# Bumped whenever the features change, so a saved model from an older version is not reused
+MODEL_VERSION = 2
+# Threads the suggestion process predicts with; each builds one bounded feature matrix at a time
+DEFAULT_PREDICT_JOBS = min(4, os.cpu_count() or 1)
+# Raw feature columns copied into the shared memory block, with their dtypes
+SHARED_FIELDS = (('size', np.float64), ('age', np.float64), ('depth', np.float64),
+                 ('category', np.int32), ('extension', np.int32))
+_DAY = 24 * 60 * 60
 
 class SuggesterWorker(QObject):
-    """Worker to handle ML training/prediction in a separate thread."""
-    suggestion_finished = pyqtSignal(list)
+    """
+    Runs the suggester in a separate process and streams its suggestions back.
+
+    The feature columns of the training examples and of the items to
+    predict are copied once into a shared memory block, which the
+    suggestion process reads without pickling them. The process trains
+    (partial_fit) and then predicts a chunk at a time, sending back the
+    updated model first and then the suggested row numbers of every chunk,
+    so the GUI process only does the light bookkeeping and stop() really
+    ends the computation, even in the middle of training.
+    """
+    suggestions_found = pyqtSignal(list)  # Suggestions of one prediction chunk
+    progress = pyqtSignal(int, str)  # percent, text
+    suggestion_finished = pyqtSignal(list)  # All suggestions; not emitted if stopped or failed
+    suggestion_failed = pyqtSignal()  # The suggestions could not be computed; not emitted if stopped
+    finished = pyqtSignal()
     
-    def __init__(self, suggester, categorized_data):
+    def __init__(self, suggester, categorized_data, training_store=None, n_jobs=DEFAULT_PREDICT_JOBS):
         super().__init__()
         self.suggester = suggester
         self.categorized_data = categorized_data
+        self.training_store = training_store
+        self.n_jobs = n_jobs
+        self._is_running = True
+        self._process = None
+        self._pending = ([], [])
+        self.suggestion_pool = []
+        self.snapshots = None
+        try:
+            self._prepare()
+        except Exception as e:
+            logging.error(f"Could not collect the suggestion features: {e}", exc_info=True)
 
-    def run(self):
-        """Trains the model and predicts suggestions."""
+    def _heuristic_examples(self):
+        """Labels scan items by category, for a first model before there are real decisions to learn from."""
         from .categorizer import (
             CAT_SAFE_DELETE, CAT_USER_DOWNLOADS, CAT_SYSTEM, CAT_APP, 
-            CAT_DEV_PROJECT, CAT_USER_DOCUMENTS, CAT_USER, CAT_UNKNOWN
+            CAT_DEV_PROJECT, CAT_USER_DOCUMENTS
         )
 
         training_items = []
@@ -41,89 +92,421 @@ class SuggesterWorker(QObject):
                 if item['type'] == 'file':
                     training_items.append(item)
                     labels.append(0)
+        return training_items, labels
 
-        self.suggester.train(training_items, labels)
+    def _training_batches(self):
+        """Returns the (items, labels, epochs) to train on: heuristics for a new model, then the pending decisions."""
+        batches = []
+        if not self.suggester.is_trained:
+            batches.append((*self._heuristic_examples(), BOOTSTRAP_EPOCHS))
+        self._pending = ([], [])
+        if self.training_store is not None:
+            self._pending = self.training_store.take_pending()
+            if self._pending[0]:
+                replayed, replayed_labels = self.training_store.replay(REPLAY_SIZE)
+                batches.append((self._pending[0] + replayed, self._pending[1] + replayed_labels, UPDATE_EPOCHS))
+        return [(items, labels, epochs) for items, labels, epochs in batches if items]
 
-        # Prediction pool
-        suggestion_pool = (
-            self.categorized_data.get(CAT_USER, {}).get('items', []) + 
-            self.categorized_data.get(CAT_UNKNOWN, {}).get('items', []) +
+    def _prepare(self):
+        """
+        Picks the items to predict and train on and takes their numeric
+        features from the result store. Runs in the constructor, on the GUI
+        thread: watch mode adds to the store there, and the store can't grow
+        while another thread holds NumPy views of its columns.
+        """
+        from .categorizer import CAT_USER, CAT_UNKNOWN, CAT_USER_DOCUMENTS
+
+        # Prediction pool: one RowList over the scan result store, so no row views are built up front
+        self.suggestion_pool = concat_rows([
+            self.categorized_data.get(CAT_USER, {}).get('items', []),
+            self.categorized_data.get(CAT_UNKNOWN, {}).get('items', []),
             self.categorized_data.get(CAT_USER_DOCUMENTS, {}).get('items', [])
-        )
-        suggested_files = self.suggester.predict(suggestion_pool)
-        self.suggestion_finished.emit(suggested_files)
+        ])
+        batches = self._training_batches()
+        self.snapshots = [self.suggester.snapshot_columns(self.suggestion_pool)]
+        self.snapshots.extend(self.suggester.snapshot_columns(items) for items, _, _ in batches)
+        self.training = [(labels, epochs) for _, labels, epochs in batches]
+
+    def run(self):
+        """Updates the model with the decisions made since the last scan and predicts suggestions."""
+        suggestion_pool = self.suggestion_pool
+        model_received = False
+        completed = False
+        block = None
+        try:
+            if self.snapshots is None:
+                return
+            column_sets = [self.suggester.complete_columns(snapshot) for snapshot in self.snapshots]
+            self.snapshots = None
+            block, layout = share_columns(column_sets)
+            training = self.training
+
+            # 'spawn' starts a fresh interpreter, so nothing of the GUI process (Qt, its threads) is inherited
+            context = multiprocessing.get_context('spawn')
+            messages = context.Queue()
+            cancel = context.Event()
+            self._process = context.Process(
+                target=_suggestion_process, name="suggester", daemon=True,
+                args=(self.suggester, block.name, layout, training, self.n_jobs, messages, cancel))
+            self._process.start()
+            if not self._is_running:
+                self._process.terminate()
+            self.progress.emit(0, "Updating the suggestion model...")
+
+            suggested_files = []
+            total = len(suggestion_pool)
+            while self._is_running:
+                try:
+                    message = messages.get(timeout=0.2)
+                except queue.Empty:
+                    if self._process.is_alive():
+                        continue
+                    try:
+                        # The process may have queued its last messages just before exiting
+                        message = messages.get(timeout=1)
+                    except queue.Empty:
+                        logging.error(f"Suggestion process exited unexpectedly (exit code {self._process.exitcode}).")
+                        break
+                kind, payload = message
+                if kind == 'model':
+                    self.suggester.__dict__.update(payload.__dict__)
+                    model_received = True
+                elif kind == 'chunk':
+                    rows, confidences, done = payload
+                    found = []
+                    for row, confidence in zip(rows.tolist(), confidences.tolist()):
+                        item = suggestion_pool[row]
+                        item['suggestion_confidence'] = confidence
+                        found.append(item)
+                    suggested_files.extend(found)
+                    if found:
+                        self.suggestions_found.emit(found)
+                    self.progress.emit(int(done * 100 / total) if total else 100,
+                                       f"Finding suggestions: {len(suggested_files)} so far ({done}/{total} files)")
+                elif kind == 'error':
+                    logging.error(f"Suggestion process failed:\n{payload}")
+                    break
+                elif kind == 'done':
+                    self.suggestion_finished.emit(suggested_files)
+                    completed = True
+                    break
+        except Exception as e:
+            logging.error(f"Could not compute suggestions: {e}", exc_info=True)
+        finally:
+            if self._process is not None:
+                cancel.set()
+                self._process.join(2)
+                if self._process.is_alive():
+                    self._process.terminate()
+                    self._process.join()
+            if block is not None:
+                block.close()
+                block.unlink()
+            if not model_received and self._pending[0]:
+                # The model never learned from them, so they stay pending for the next scan
+                self.training_store.return_pending(*self._pending)
+            if not completed and self._is_running:
+                self.suggestion_failed.emit()
+            self.finished.emit()
+
+    def stop(self):
+        """Stops the suggestion process at once; may be called from any thread."""
+        self._is_running = False
+        process = self._process
+        if process is not None and process.is_alive():
+            process.terminate()
+
+
+def share_columns(column_sets):
+    """
+    Copies the raw features of a list of FeatureColumns into one new shared
+    memory block. Returns the block, which the caller closes and unlinks,
+    and the layout attach_columns() needs to read them back.
+    """
+    layout = []
+    offset = 0
+    for columns in column_sets:
+        fields = {}
+        for name, dtype in SHARED_FIELDS:
+            count = len(getattr(columns, name))
+            fields[name] = (offset, count)
+            offset += count * np.dtype(dtype).itemsize
+        layout.append((fields, columns.categories, columns.extensions))
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for columns, (fields, _, _) in zip(column_sets, layout):
+        for name, dtype in SHARED_FIELDS:
+            offset, count = fields[name]
+            np.ndarray(count, dtype=dtype, buffer=block.buf, offset=offset)[:] = getattr(columns, name)
+    return block, layout
+
+
+def attach_columns(buffer, layout):
+    """Returns the FeatureColumns described by `layout` as NumPy views of a shared memory buffer."""
+    column_sets = []
+    for fields, categories, extensions in layout:
+        columns = FeatureColumns()
+        for name, dtype in SHARED_FIELDS:
+            offset, count = fields[name]
+            setattr(columns, name, np.ndarray(count, dtype=dtype, buffer=buffer, offset=offset))
+        columns.categories = categories
+        columns.extensions = extensions
+        column_sets.append(columns)
+    return column_sets
+
+
+def _suggestion_process(suggester, block_name, layout, training, n_jobs, messages, cancel):
+    """Entry point of the suggestion process: trains, sends the model back, then streams predictions."""
+    block = shared_memory.SharedMemory(name=block_name)
+    column_sets = attach_columns(block.buf, layout)
+    pool = column_sets[0]
+    try:
+        for columns, (labels, epochs) in zip(column_sets[1:], training):
+            suggester.train_columns(columns, labels, epochs)
+        messages.put(('model', suggester))
+        for rows, confidences, done in suggester.predict_chunks(pool, n_jobs, cancel.is_set):
+            messages.put(('chunk', (rows, confidences, done)))
+        messages.put(('done', None))
+    except Exception:
+        messages.put(('error', traceback.format_exc()))
+    finally:
+        # The views must be gone before the block can be closed
+        del column_sets, pool
+        block.close()
+
+class FeatureColumns:
+    """
+    Raw features of a list of items, one NumPy array per feature. Categories
+    and extensions are integer codes into the `categories` and `extensions`
+    vocabularies; they are hashed into columns only when a matrix is built.
+    """
+    __slots__ = ('size', 'age', 'depth', 'category', 'categories', 'extension', 'extensions')
+
+    def __len__(self):
+        return len(self.size)
+
 
 class DeletionSuggester:
+    """
+    Logistic regression over size, age, path depth, category and extension,
+    learned incrementally.
+
+    The model is an SGDClassifier updated with partial_fit, so it keeps what
+    it learned across scans and sessions: it starts from heuristic labels
+    once, and after that every scan only updates it with the files the user
+    deleted or restored since (see TrainingStore), replaying a sample of
+    older decisions so it does not drift towards the newest ones.
+
+    Features come from the scan metadata (size, mtime, path) and never touch
+    the filesystem. Categories and extensions are hashed into a fixed number
+    of one-hot columns, so values first seen after training still fit the
+    model's input.
+    """
+
     def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=10, random_state=42)
-        self.vectorizer = DictVectorizer(sparse=False)
+        # scikit-learn takes longer to import than the rest of the app to start, so only a suggester needs it
+        from sklearn.linear_model import SGDClassifier
+        self.model = SGDClassifier(loss='log_loss', random_state=42)
+        self.version = MODEL_VERSION
         self.is_trained = False
-        self.feature_names = []
+        self.class_counts = [0, 0]
+        self._random = np.random.default_rng(42)
 
-    def _extract_features(self, item):
-        """Extracts features from a file item for the model."""
+    def _extract_features(self, item, now=None):
+        """Returns the features of a single item as a dict; used to explain a suggestion."""
         path = item['path']
-        try:
-            stat = os.stat(path)
-            age = time.time() - stat.st_mtime
-            extension = os.path.splitext(path)[1].lower()
-        except (FileNotFoundError, PermissionError):
-            age = -1
-            extension = 'unknown'
-
+        mtime = item.get('mtime')
+        now = time.time() if now is None else now
         return {
             'size': item.get('size', 0),
             'category': item.get('category', 'Unknown'),
-            'age_seconds': age,
-            'extension': extension,
+            'age_seconds': now - mtime if mtime is not None else -1,
+            'extension': os.path.splitext(path)[1].lower(),
             'path_depth': path.count(os.sep)
         }
 
-    def train(self, items, labels):
-        """Trains the model based on items and their labels (1 for delete, 0 for keep)."""
+    @staticmethod
+    def _row_source(items):
+        """Returns (store, indices) if all items are rows of one ScanResults store, otherwise None."""
+        if isinstance(items, RowList):
+            return items.store, np.asarray(items.indices, dtype=np.int64)
+        store = None
+        indices = []
+        for item in items:
+            if not isinstance(item, ResultRow) or (store is not None and item.store is not store):
+                return None
+            store = item.store
+            indices.append(item.index)
+        return (store, np.asarray(indices, dtype=np.int64)) if store is not None else None
+
+    def _feature_columns(self, items):
+        """Collects the raw features of `items`, read from the result store's columns when possible."""
+        return self.complete_columns(self.snapshot_columns(items))
+
+    def snapshot_columns(self, items):
+        """
+        First half of _feature_columns(): copies the numeric features of
+        `items` out of the result store, or collects all features of items
+        that aren't store rows. Call it on the thread that adds to the store.
+        Returns (columns, rows still missing their extension codes) for
+        complete_columns(), which may run on any thread.
+        """
+        now = time.time()
+        columns = FeatureColumns()
+        source = self._row_source(items)
+        if source is not None:
+            store, indices = source
+            sizes, mtimes, columns.category, depths = store.feature_columns(indices)
+            columns.categories = store.categories()
+        else:
+            category_codes = {}
+            extension_codes = {}
+            count = len(items)
+            sizes = np.empty(count, dtype=np.float64)
+            mtimes = np.empty(count, dtype=np.float64)
+            depths = np.empty(count, dtype=np.float64)
+            columns.category = np.empty(count, dtype=np.int32)
+            columns.extension = np.empty(count, dtype=np.int32)
+            for position, item in enumerate(items):
+                features = self._extract_features(item)
+                sizes[position] = features['size']
+                mtime = item.get('mtime')
+                mtimes[position] = np.nan if mtime is None else mtime
+                depths[position] = features['path_depth']
+                columns.category[position] = category_codes.setdefault(features['category'], len(category_codes))
+                columns.extension[position] = extension_codes.setdefault(features['extension'], len(extension_codes))
+            columns.categories = list(category_codes)
+            columns.extensions = list(extension_codes)
+        columns.size = sizes.astype(np.float64)
+        # Items without a modification time get an age of -1, like files that could not be read
+        columns.age = np.where(np.isnan(mtimes), -1.0, now - mtimes)
+        columns.depth = depths.astype(np.float64)
+        return columns, source
+
+    @staticmethod
+    def complete_columns(snapshot):
+        """Second half of _feature_columns(): adds the extension codes of store rows, which only read the names."""
+        columns, source = snapshot
+        if source is not None:
+            extension_codes = {}
+            store, indices = source
+            columns.extension = store.extension_codes(indices, extension_codes)
+            columns.extensions = list(extension_codes)
+        return columns
+
+    @staticmethod
+    def _column_map(prefix, vocabulary):
+        """Maps each code of a vocabulary to its hashed one-hot column."""
+        return np.array([len(NUMERIC_FEATURES) + zlib.crc32(f"{prefix}={value}".encode('utf-8')) % HASH_BUCKETS
+                         for value in vocabulary] or [0], dtype=np.int64)
+
+    def _matrix(self, columns, rows, category_map, extension_map):
+        """Builds the feature matrix for `rows` (a slice or index array) of `columns`."""
+        count = len(columns.size[rows])
+        X = np.zeros((count, N_FEATURES), dtype=np.float64)
+        age = columns.age[rows]
+        unknown = age < 0
+        # Log scales divided by 10 keep the numeric columns near the range of the one-hot ones
+        X[:, 0] = np.log1p(columns.size[rows]) / 10
+        X[:, 1] = np.where(unknown, 0.0, np.log1p(np.maximum(age, 0) / _DAY)) / 10
+        X[:, 2] = unknown
+        X[:, 3] = columns.depth[rows] / 10
+        positions = np.arange(count)
+        X[positions, category_map[columns.category[rows]]] = 1.0
+        X[positions, extension_map[columns.extension[rows]]] = 1.0
+        return X
+
+    def train(self, items, labels, epochs=1):
+        """Updates the model with items and their labels (1 for delete, 0 for keep), `epochs` passes over them."""
         if not items or not labels:
             return
+        self.train_columns(self._feature_columns(items), labels, epochs)
 
-        features = [self._extract_features(item) for item in items]
-        X = self.vectorizer.fit_transform(features)
-        self.feature_names = self.vectorizer.get_feature_names_out()
-        y = labels
-        
-        self.model.fit(X, y)
-        self.is_trained = True
-        print("Deletion Suggester model has been trained.")
+    def train_columns(self, columns, labels, epochs=1):
+        """Updates the model with the items whose raw features are `columns`."""
+        category_map = self._column_map('category', columns.categories)
+        extension_map = self._column_map('extension', columns.extensions)
+        y = np.asarray(labels, dtype=np.int64)
+        chunk_size = max(1, MAX_MATRIX_CELLS // N_FEATURES)
 
-    def predict(self, items):
-        """Predicts which items are likely safe to delete."""
-        if not self.is_trained or not items:
-            return []
+        for _ in range(epochs):
+            order = self._random.permutation(len(columns))
+            for start in range(0, len(order), chunk_size):
+                rows = order[start:start + chunk_size]
+                self.model.partial_fit(self._matrix(columns, rows, category_map, extension_map), y[rows],
+                                       classes=[0, 1])
 
-        features = [self._extract_features(item) for item in items]
-        X = self.vectorizer.transform(features)
+        self.class_counts[0] += int(np.count_nonzero(y == 0))
+        self.class_counts[1] += int(np.count_nonzero(y == 1))
+        # Until it has seen both a file to keep and one to delete the model cannot tell them apart
+        self.is_trained = all(self.class_counts)
+        print("Deletion Suggester model has been updated.")
 
-        # Check if the model can predict multiple classes
-        if len(self.model.classes_) < 2:
-            # Model has only been trained on one class, so it cannot make meaningful suggestions.
-            return []
-        
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
+    def update(self, training_store):
+        """Learns from the decisions recorded since the last update. Returns how many there were."""
+        examples, labels = training_store.take_pending()
+        if not examples:
+            return 0
+        replayed, replayed_labels = training_store.replay(REPLAY_SIZE)
+        self.train(examples + replayed, labels + replayed_labels, epochs=UPDATE_EPOCHS)
+        return len(examples)
 
-        # Ensure we have probabilities for the "deletable" class (1)
-        try:
-            deletable_class_index = list(self.model.classes_).index(1)
-        except ValueError:
-            # The model has never seen a "deletable" example (class '1').
-            return []
+    def predict_chunks(self, columns, n_jobs=1, cancelled=None):
+        """
+        Yields (rows, confidences, done) for each chunk of `columns` in order:
+        the row numbers predicted deletable, their probabilities and how many
+        rows have been predicted so far. With n_jobs > 1 chunks are predicted
+        on that many threads; NumPy and scikit-learn release the GIL for the
+        heavy parts. Stops early once cancelled() returns True.
+        """
+        if not self.is_trained or not len(columns):
+            return
+
+        category_map = self._column_map('category', columns.categories)
+        extension_map = self._column_map('extension', columns.extensions)
+        chunk_size = max(1, MAX_MATRIX_CELLS // N_FEATURES)
+        deletable_class_index = list(self.model.classes_).index(1)
+
+        def predict_chunk(start):
+            stop = min(start + chunk_size, len(columns))
+            probabilities = self.model.predict_proba(self._matrix(columns, slice(start, stop), category_map, extension_map))
+            # The same decision SGDClassifier.predict makes, a positive decision function
+            offsets = np.flatnonzero(probabilities[:, deletable_class_index] > 0.5)
+            return start + offsets, probabilities[offsets, deletable_class_index], stop
 
-        deletable_probs = probabilities[:, deletable_class_index]
+        starts = range(0, len(columns), chunk_size)
+        if n_jobs <= 1:
+            for start in starts:
+                if cancelled is not None and cancelled():
+                    return
+                yield predict_chunk(start)
+            return
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            # Only a bounded window of chunks is in flight, which bounds the matrices held at once
+            window = []
+            for start in starts:
+                if cancelled is not None and cancelled():
+                    break
+                window.append(executor.submit(predict_chunk, start))
+                if len(window) >= 2 * n_jobs:
+                    yield window.pop(0).result()
+            else:
+                for future in window:
+                    yield future.result()
+                return
+            for future in window:
+                future.cancel()
+
+    def predict(self, items):
+        """Predicts which items are likely safe to delete, a bounded chunk of the feature matrix at a time."""
+        if not self.is_trained or not items:
+            return []
 
         suggested_items = []
-        for i, (item, pred) in enumerate(zip(items, predictions)):
-            if pred == 1:
-                item['suggestion_confidence'] = deletable_probs[i]
+        for rows, confidences, _ in self.predict_chunks(self._feature_columns(items)):
+            for row, confidence in zip(rows.tolist(), confidences.tolist()):
+                item = items[row]
+                item['suggestion_confidence'] = confidence
                 suggested_items.append(item)
-
         return suggested_items
 
     def explain(self, item):
@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import logging
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BACKGROUND_NICE = 19
+SAMPLE_INTERVAL = 1.0      # seconds between load samples
+LOAD_TARGET = 0.7          # 1-minute load average per CPU above which workers slow down
+DISK_BUSY_TARGET = 0.5     # fraction of time the busiest disk may be busy
+MAX_SLOWDOWN = 64.0
+MAX_BURST = 0.5            # seconds of unused budget a worker may catch up on
+MAX_SLEEP = 0.25           # longest single sleep, so stop() is noticed quickly
+
+# Windows: background mode lowers both the CPU and the I/O priority of a thread
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+THROTTLE_OFF = "Off"
+THROTTLE_SCHEDULED = "Scheduled scans only"
+THROTTLE_ALL = "All background scans"
+THROTTLE_MODES = [THROTTLE_OFF, THROTTLE_SCHEDULED, THROTTLE_ALL]
+
+
+def lower_thread_priority():
+    """
+    Gives the calling thread the lowest CPU priority and the idle I/O class,
+    so other workloads on the machine are served first. Only the calling
+    thread is affected; the GUI thread keeps its priority.
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            # On Linux every thread has its own nice value and I/O priority
+            tid = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, tid, BACKGROUND_NICE)
+            if psutil is not None:
+                psutil.Process(tid).ionice(psutil.IOPRIO_CLASS_IDLE)
+        elif sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        else:
+            logging.debug("Per-thread priority is not supported on this platform.")
+    except Exception as e:
+        logging.warning(f"Could not lower background thread priority: {e}")
+
+
+class Throttle:
+    """
+    Paces a background worker so it doesn't hurt other workloads.
+
+    Workers call apply_priority() once per thread and pace() after each unit
+    of work (a directory listing, a file, a chunk read for hashing). pace()
+    sleeps as needed to stay under the files/sec and MB/sec caps (0 means no
+    cap). With adaptive pacing, a feedback loop samples the load average and
+    disk busy time: while either is above target the worker slows down
+    multiplicatively, and speeds back up gradually once the system is idle.
+    Without caps the slowdown is applied as a duty cycle, so a worker at
+    slowdown 4 works about a quarter of the time.
+
+    One Throttle can be shared by several threads of the same worker. The
+    worker sets should_stop so long sleeps end as soon as it is stopped.
+    """
+
+    def __init__(self, max_files_per_sec=0, max_mb_per_sec=0, adaptive=True, should_stop=None):
+        self.max_files_per_sec = max_files_per_sec or 0
+        self.max_bytes_per_sec = (max_mb_per_sec or 0) * 1024 * 1024
+        self.adaptive = adaptive and psutil is not None
+        self.should_stop = should_stop
+        self.slowdown = 1.0
+        self._lock = threading.Lock()
+        self._ready_at = time.monotonic()
+        self._last_sample = 0.0
+        self._last_disk_busy = None
+        self._local = threading.local()
+
+    def apply_priority(self):
+        lower_thread_priority()
+
+    def _disk_busy_ms(self):
+        try:
+            counters = psutil.disk_io_counters(perdisk=True)
+        except Exception:
+            return None
+        busy = {disk: getattr(c, 'busy_time', None) for disk, c in (counters or {}).items()}
+        return {disk: value for disk, value in busy.items() if value is not None} or None
+
+    def _sample_load(self, now):
+        """Adjusts the slowdown factor from the current system load (called with the lock held)."""
+        elapsed = now - self._last_sample
+        if elapsed < SAMPLE_INTERVAL:
+            return
+        self._last_sample = now
+
+        overloaded = False
+        try:
+            load = psutil.getloadavg()[0] / (psutil.cpu_count() or 1)
+            overloaded = load > LOAD_TARGET
+        except Exception:
+            load = None
+
+        busy = self._disk_busy_ms()
+        if busy is not None and self._last_disk_busy is not None:
+            busiest = max((busy[disk] - self._last_disk_busy.get(disk, busy[disk])) for disk in busy)
+            overloaded = overloaded or busiest / (elapsed * 1000.0) > DISK_BUSY_TARGET
+        self._last_disk_busy = busy
+
+        previous = self.slowdown
+        if overloaded:
+            self.slowdown = min(self.slowdown * 2.0, MAX_SLOWDOWN)
+        else:
+            self.slowdown = max(self.slowdown * 0.75, 1.0)
+        if self.slowdown != previous:
+            logging.debug(f"Throttle: load {load}, slowdown {previous:.1f} -> {self.slowdown:.1f}")
+
+    def pace(self, files=1, nbytes=0):
+        """Accounts for a unit of work and sleeps if the worker is ahead of its budget."""
+        now = time.monotonic()
+        last_call = getattr(self._local, 'last_call', None)
+        with self._lock:
+            if self.adaptive:
+                self._sample_load(now)
+            cost = 0.0
+            if self.max_files_per_sec:
+                cost = files / self.max_files_per_sec
+            if self.max_bytes_per_sec:
+                cost = max(cost, nbytes / self.max_bytes_per_sec)
+            cost *= self.slowdown
+            # Time spent working counts towards the budget, but at most MAX_BURST of
+            # idle time builds up credit for a later burst
+            self._ready_at = max(self._ready_at, now - MAX_BURST) + cost
+            delay = self._ready_at - now
+        if last_call is not None and self.slowdown > 1.0:
+            delay = max(delay, (now - last_call) * (self.slowdown - 1.0))
+
+        if delay > 0.001:
+            self._sleep(delay)
+        self._local.last_call = time.monotonic()
+
+    def _sleep(self, delay):
+        end = time.monotonic() + delay
+        while True:
+            if self.should_stop is not None and self.should_stop():
+                return
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, MAX_SLEEP))
+
+
+def create_throttle(settings, scheduled=False):
+    """
+    Builds a Throttle from the Scheduler tab settings, or returns None if
+    throttling is off for this kind of run.
+    """
+    mode = (settings or {}).get('throttle_mode', THROTTLE_OFF)
+    if mode == THROTTLE_OFF or (mode == THROTTLE_SCHEDULED and not scheduled):
+        return None
+    return Throttle(max_files_per_sec=int(settings.get('max_files_per_sec', 0) or 0),
+                    max_mb_per_sec=int(settings.get('max_mb_per_sec', 0) or 0))
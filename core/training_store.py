@@ -0,0 +1,145 @@
+import os
+import json
+import random
+import logging
+import threading
+from PyQt6.QtCore import QStandardPaths
+
+APP_NAME = "MasterDeleter"
+SUGGESTER_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation), APP_NAME)
+TRAINING_STORE_PATH = os.path.join(SUGGESTER_DIR, "suggester_training.json")
+
+# Examples kept per class; beyond this each class is a uniform sample of every decision seen
+DEFAULT_CAPACITY = 5000
+# Deletions from these tabs say something about the copy or the folder being empty, not about the file
+IGNORED_CATEGORIES = ('Duplicates', 'Empty Folders')
+
+LABEL_KEEP = 0
+LABEL_DELETE = 1
+
+
+def training_example(item):
+    """
+    Returns the scan metadata the suggester learns from for a deleted or
+    restored item, as a plain dict, or None if the item says nothing about
+    the file itself. Accepts the Deleter's items ({'path', 'size', 'data'})
+    and the QuarantineTab's restored items.
+    """
+    data = item.get('data') or item
+    path = item.get('original_path') or item.get('path') or data.get('path')
+    category = item.get('scan_category') or data.get('category') or item.get('category')
+    if not path or not category or category in IGNORED_CATEGORIES:
+        return None
+    mtime = data.get('mtime', item.get('mtime'))
+    return {
+        'path': os.path.normpath(path),
+        'size': int(data.get('size', item.get('size')) or 0),
+        'mtime': float(mtime) if mtime is not None else None,
+        'category': category,
+        'type': data.get('type', item.get('type', 'file')),
+    }
+
+
+class TrainingStore:
+    """
+    The suggester's record of what the user actually deleted (label 1) and
+    restored from quarantine (label 0).
+
+    Every class keeps a bounded reservoir sample (algorithm R) of all the
+    examples it has seen, so old decisions stay represented at a fixed
+    memory cost and can be replayed when the model is updated. Examples the
+    model has not learned from yet are pending until take_pending(). A
+    restore also drops the deletion of the same path, since it undoes it.
+    Methods may be called from the GUI and the suggester thread at once.
+    """
+
+    def __init__(self, path=TRAINING_STORE_PATH, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.reservoirs = {LABEL_KEEP: [], LABEL_DELETE: []}
+        self.seen = {LABEL_KEEP: 0, LABEL_DELETE: 0}
+        self.pending = []
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(reservoir) for reservoir in self.reservoirs.values())
+
+    def add(self, items, label):
+        """Records deleted (label 1) or restored (label 0) items. Returns the number of examples added."""
+        examples = [example for example in map(training_example, items) if example is not None]
+        if not examples:
+            return 0
+        with self._lock:
+            if label == LABEL_KEEP:
+                undone = {example['path'] for example in examples}
+                self.reservoirs[LABEL_DELETE] = [e for e in self.reservoirs[LABEL_DELETE] if e['path'] not in undone]
+                self.pending = [(e, l) for e, l in self.pending if l == LABEL_KEEP or e['path'] not in undone]
+            reservoir = self.reservoirs[label]
+            for example in examples:
+                self.pending.append((example, label))
+                self.seen[label] += 1
+                if len(reservoir) < self.capacity:
+                    reservoir.append(example)
+                else:
+                    slot = self._random.randrange(self.seen[label])
+                    if slot < self.capacity:
+                        reservoir[slot] = example
+        return len(examples)
+
+    def take_pending(self):
+        """Returns the (examples, labels) not learned from yet and clears them."""
+        with self._lock:
+            pending, self.pending = self.pending, []
+        return [example for example, _ in pending], [label for _, label in pending]
+
+    def return_pending(self, examples, labels):
+        """Puts examples back that take_pending() handed out but the model did not learn from."""
+        with self._lock:
+            self.pending[:0] = zip(examples, labels)
+
+    def replay(self, count):
+        """Returns (examples, labels): up to `count` examples sampled from the reservoirs, half from each class."""
+        examples, labels = [], []
+        with self._lock:
+            for label, reservoir in self.reservoirs.items():
+                sample = self._random.sample(reservoir, min(len(reservoir), count // 2))
+                examples.extend(sample)
+                labels.extend([label] * len(sample))
+        return examples, labels
+
+    def load(self):
+        """Reads the store from disk; a missing or unreadable file leaves it empty."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            reservoirs = {label: data['reservoirs'][str(label)][-self.capacity:] for label in self.reservoirs}
+            seen = {label: max(int(data['seen'][str(label)]), len(reservoirs[label])) for label in self.seen}
+            pending = [(example, int(label)) for example, label in data.get('pending', [])]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.error(f"Could not load the suggester training data from {self.path}: {e}")
+            return
+        with self._lock:
+            self.reservoirs, self.seen, self.pending = reservoirs, seen, pending
+        logging.info(f"Loaded {len(self)} suggester training examples from {self.path}.")
+
+    def save(self):
+        """Writes the store to disk, replacing the previous file only once the new one is complete."""
+        with self._lock:
+            data = {
+                'reservoirs': {str(label): list(reservoir) for label, reservoir in self.reservoirs.items()},
+                'seen': {str(label): count for label, count in self.seen.items()},
+                'pending': [[example, label] for example, label in self.pending],
+            }
+        directory = os.path.dirname(self.path)
+        temp_path = self.path + '.tmp'
+        try:
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.error(f"Failed to save the suggester training data: {e}")
@@ -0,0 +1,585 @@
+import os
+import logging
+import threading
+from collections import deque, namedtuple
+from .categorizer import Categorizer
+from .exclusions import ExclusionMatcher, EXCLUDED
+from .scan_snapshot import ScanSnapshot
+from .mounts import mounts_below, PSEUDO_FS_TYPES
+
+# DirEntry.stat() reports no st_dev, st_ino or st_nlink on Windows
+TRACK_INODES = os.name != 'nt'
+
+# Listings the parallel walker's workers may have waiting for the replay before they hold back
+MAX_BUFFERED_LISTINGS = 2048
+
+# Totals for a directory's whole subtree: bytes, files, files + directories below it,
+# and bytes allocated on disk
+DirTotals = namedtuple('DirTotals', ['size', 'files', 'entries', 'disk_size'])
+
+
+def allocated_size(stat_result):
+    """
+    Returns the bytes a file occupies on disk, from st_blocks (512-byte units
+    on every platform that reports it). Sparse and compressed files use less
+    than their apparent size, small files a whole block. Falls back to
+    st_size where st_blocks is missing (Windows).
+    """
+    blocks = getattr(stat_result, 'st_blocks', None)
+    return stat_result.st_size if blocks is None else blocks * 512
+
+
+class TreeWalker:
+    """
+    Walks a directory tree with os.scandir and yields scan item dicts.
+    Reuses the DirEntry type and stat data so each entry costs at most one
+    stat call, and builds every path exactly once.
+
+    Every directory and every file with more than one hard link is walked
+    and counted once per (st_dev, st_ino), so hard links, bind mounts and
+    mount loops don't inflate sizes. Symlinks are counted by their own size
+    and never followed. Mount points of pseudo filesystems (/proc, /sys, ...)
+    are skipped, and with one_filesystem so is every other filesystem.
+    """
+
+    def __init__(self, start_path, exclusions=None, previous_snapshot=None, record_snapshot=False, throttle=None,
+                 one_filesystem=False, skip_pseudo_filesystems=True, rules=None):
+        self.start_path = os.path.normpath(start_path)
+        self.matcher = ExclusionMatcher(exclusions)
+        self.exclusions = tuple(self.matcher.patterns)
+        # One categorization decision per directory, shared by its entries;
+        # rules are the user's core.category_rules.CategoryRules, if any
+        self.categorizer = Categorizer(rules)
+        self.dir_totals = {}
+        # Directories whose subtree is still being walked:
+        # path -> [size, files, entries, disk size, pending children, parent]
+        self._open_totals = {}
+        self._is_running = True
+        # Incremental scanning: listings of directories whose mtime is unchanged
+        # are taken from previous_snapshot, and every listing is recorded in snapshot.
+        self.previous_snapshot = previous_snapshot
+        self.snapshot = ScanSnapshot(self.start_path, self.exclusions) if record_snapshot else None
+        self.reused_dirs = 0
+        self.listed_dirs = 0
+        # Optional core.throttle.Throttle that paces the walk after every directory
+        self.throttle = throttle
+        if throttle is not None:
+            throttle.should_stop = lambda: not self._is_running
+        self.one_filesystem = one_filesystem
+        self.skip_pseudo_filesystems = skip_pseudo_filesystems
+        self.track_inodes = TRACK_INODES
+        self._mounts = None         # mount points below start_path -> filesystem type
+        self._root_dev = None
+        self._devices = {}          # directory waiting to be listed -> its st_dev
+        self._visited = set()       # (st_dev, st_ino) already walked or counted
+        self._visited_lock = threading.Lock()
+        self.skipped_links = 0
+        self.skipped_dirs = 0
+        # Directories still to be listed as (path, parent), and the one being listed;
+        # checkpoint() saves them and restore() refills them to resume a walk
+        self._stack = []
+        self._current = None
+        self._resumed = False
+        self.checkpointing = False
+
+    def is_excluded(self, path):
+        return bool(self.matcher) and self.matcher.matches(path)
+
+    def _start_tracking(self):
+        """Reads the mount table and marks the start directory as visited."""
+        if not self.track_inodes:
+            return
+        self._mounts = mounts_below(self.start_path)
+        try:
+            stat_result = os.stat(self.start_path)
+        except OSError:
+            return
+        self._root_dev = stat_result.st_dev
+        if not self._resumed:
+            self._devices[self.start_path] = stat_result.st_dev
+            self._visited.add((stat_result.st_dev, stat_result.st_ino))
+            return
+        # Devices of directories a parallel walk had listed ahead of the checkpoint are gone
+        for path, _ in self._stack:
+            if path not in self._devices:
+                try:
+                    self._devices[path] = os.stat(path).st_dev
+                except OSError:
+                    pass
+
+    def _visited_at_checkpoint(self):
+        return set(self._visited)
+
+    def checkpoint(self):
+        """
+        Returns the walk's progress as a picklable dict. Only valid when called
+        from on_enter: every directory before the one being entered has been
+        yielded in full, and that one and everything on the stack are still to do.
+        """
+        return {
+            'pending': list(self._stack) + [self._current],
+            'open_totals': {path: list(acc) for path, acc in self._open_totals.items()},
+            'dir_totals': dict(self.dir_totals),
+            'visited': self._visited_at_checkpoint(),
+            'devices': dict(self._devices),
+            'counters': (self.listed_dirs, self.reused_dirs, self.skipped_links, self.skipped_dirs),
+        }
+
+    def restore(self, state):
+        """Continues a walk from a checkpoint() taken by an earlier walker of the same tree."""
+        pending = [tuple(entry) for entry in state['pending']]
+        open_totals = {path: list(acc) for path, acc in state['open_totals'].items()}
+        dir_totals = {path: DirTotals(*totals) for path, totals in state['dir_totals'].items()}
+        self._stack = pending
+        self._open_totals = open_totals
+        self.dir_totals.clear()
+        self.dir_totals.update(dir_totals)
+        self._visited = set(state['visited'])
+        self._devices = dict(state['devices'])
+        self.listed_dirs, self.reused_dirs, self.skipped_links, self.skipped_dirs = state['counters']
+        self._resumed = True
+
+    def _claim(self, key):
+        """Marks an inode as visited; returns False if it already was."""
+        with self._visited_lock:
+            if key in self._visited:
+                return False
+            self._visited.add(key)
+            return True
+
+    def _dir_key(self, path, inode, dev):
+        """
+        Returns (st_dev, st_ino) of a subdirectory. Its device is the parent's
+        unless it is a mount point, so only mount points need a stat call when
+        the mount table is known.
+        """
+        if not self.track_inodes:
+            return None
+        if inode is not None and self._mounts is not None and path not in self._mounts:
+            return dev, inode
+        try:
+            stat_result = os.lstat(path)
+        except OSError:
+            return None
+        return stat_result.st_dev, stat_result.st_ino
+
+    def _should_descend(self, path, key):
+        if self.skip_pseudo_filesystems and self._mounts and self._mounts.get(path) in PSEUDO_FS_TYPES:
+            logging.info(f"Skipping {self._mounts[path]} filesystem at {path}")
+            return False
+        if key is None:
+            return True
+        if self.one_filesystem and key[0] != self._root_dev:
+            logging.info(f"Not crossing into the filesystem mounted at {path}")
+            return False
+        if not self._claim(key):
+            logging.info(f"Skipping {path}: already walked through another path (bind mount or loop)")
+            self._count('skipped_dirs')
+            return False
+        self._devices[path] = key[0]
+        return True
+
+    def _count(self, counter):
+        """Adds one to a statistics counter: listed_dirs, reused_dirs, skipped_links or skipped_dirs."""
+        setattr(self, counter, getattr(self, counter) + 1)
+
+    def _dir_mtime(self, root):
+        if self.previous_snapshot is None and self.snapshot is None:
+            return None
+        try:
+            return os.stat(root).st_mtime_ns
+        except OSError:
+            return None
+
+    def _cached_listing(self, root, mtime_ns):
+        """
+        Rebuilds (items, subdirs, own_totals) for `root` from the previous snapshot
+        if the directory's mtime is unchanged, otherwise returns None.
+        """
+        if self.previous_snapshot is None or mtime_ns is None:
+            return None
+        cached = self.previous_snapshot.lookup(root, mtime_ns)
+        if cached is None:
+            return None
+        _, entries, subdirs, recorded_size = cached
+        if self.snapshot is not None:
+            self.snapshot.record(root, mtime_ns, entries, subdirs, recorded_size)
+
+        # Hard links and subdirectories go through the same checks as in a fresh listing
+        dev = self._devices.pop(root, None)
+        join = os.path.join
+        items = []
+        inodes = {}
+        own_size = own_files = own_disk_size = 0
+        # Categories are re-derived: a project marker may have appeared further up the tree
+        rule = self.categorizer.rule_for(root, [entry[1] for entry in entries])
+        for kind, name, size, _, mtime, inode, disk_size in entries:
+            path = join(root, name)
+            category = rule.categorize(name, kind == 'dir', size, mtime)
+            if kind == 'dir':
+                inodes[path] = inode
+                items.append({'type': 'dir', 'path': path, 'size': 0, 'category': category})
+                continue
+            if inode is not None and self.track_inodes and not self._claim((dev, inode)):
+                self._count('skipped_links')
+                continue
+            items.append({'type': 'file', 'path': path, 'size': size, 'disk_size': disk_size,
+                          'category': category, 'mtime': mtime})
+            own_size += size
+            own_disk_size += disk_size
+            own_files += 1
+        descend = [path for path in subdirs if self._should_descend(path, self._dir_key(path, inodes.get(path), dev))]
+        self._count('reused_dirs')
+        return items, descend, (own_size, own_files, len(items), own_disk_size)
+
+    def _scan_directory(self, root, subdirs, mtime_ns=None):
+        """
+        Yields the items of a single directory (subdirectories first, then files)
+        and appends the subdirectories to descend into to `subdirs`.
+        Returns (size, files, entries) for the directory's own contents.
+        """
+        self._count('listed_dirs')
+        dev = self._devices.pop(root, None)
+        track_inodes = self.track_inodes
+        entries = [] if self.snapshot is not None else None
+        candidates = [] if self.snapshot is not None else None
+        files = []
+        dir_count = 0
+        matcher = self.matcher if self.matcher else None
+        state = matcher.state_for(root) if matcher else None
+        try:
+            with os.scandir(root) as it:
+                listing = [entry for entry in it
+                           if not (matcher and matcher.child(state, entry.name, entry.path) is EXCLUDED)]
+            # The whole listing is needed up front to spot development project markers
+            rule = self.categorizer.rule_for(root, [entry.name for entry in listing])
+            for entry in listing:
+                if not self._is_running:
+                    break
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                path = entry.path
+                if is_dir:
+                    dir_count += 1
+                    category = rule.categorize(entry.name, True)
+                    # Like os.walk(followlinks=False), list symlinked dirs but don't descend
+                    try:
+                        is_link = entry.is_symlink()
+                    except OSError:
+                        is_link = True
+                    inode = entry.inode() if track_inodes and not is_link else None
+                    if entries is not None:
+                        entries.append(('dir', entry.name, 0, category, None, inode, 0))
+                        if not is_link:
+                            candidates.append(path)
+                    yield {'type': 'dir', 'path': path, 'size': 0, 'category': category}
+                    if not is_link and self._should_descend(path, self._dir_key(path, inode, dev)):
+                        subdirs.append(path)
+                else:
+                    files.append(entry)
+        except OSError as e:
+            logging.warning(f"Could not access directory {root}: {e}")
+            return 0, 0, 0, 0
+
+        current_dir_size = 0
+        current_disk_size = 0
+        file_count = 0
+        for entry in files:
+            if not self._is_running:
+                break
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+            except OSError as e:
+                logging.warning(f"Could not access file {entry.path}: {e}")
+                continue
+            size = stat_result.st_size
+            disk_size = allocated_size(stat_result)
+            category = rule.categorize(entry.name, False, size, stat_result.st_mtime)
+            inode = stat_result.st_ino if track_inodes and stat_result.st_nlink > 1 else None
+            if entries is not None:
+                entries.append(('file', entry.name, size, category, stat_result.st_mtime, inode, disk_size))
+            if inode is not None and not self._claim((stat_result.st_dev, inode)):
+                self._count('skipped_links')
+                continue
+            current_dir_size += size
+            current_disk_size += disk_size
+            file_count += 1
+            yield {'type': 'file', 'path': entry.path, 'size': size, 'disk_size': disk_size,
+                   'category': category, 'mtime': stat_result.st_mtime}
+
+        # A listing cut short by stop() is incomplete and must not be reused
+        if entries is not None and self._is_running:
+            self.snapshot.record(root, mtime_ns, entries, candidates, current_dir_size)
+        return current_dir_size, file_count, dir_count + file_count, current_disk_size
+
+    def _complete_listing(self, root, parent, own_totals, subdir_count):
+        """
+        Records a listed directory and, once all of its subdirectories are done,
+        finalizes its subtree totals and folds them into its parent. Each
+        directory is added to its parent exactly once, so aggregation is
+        linear in the number of directories regardless of depth.
+        """
+        acc = [own_totals[0], own_totals[1], own_totals[2], own_totals[3], subdir_count, parent]
+        path = root
+        while acc[4] == 0:
+            self._open_totals.pop(path, None)
+            self.dir_totals[path] = DirTotals(acc[0], acc[1], acc[2], acc[3])
+            parent = acc[5]
+            if parent is None:
+                break
+            parent_acc = self._open_totals[parent]
+            parent_acc[0] += acc[0]
+            parent_acc[1] += acc[1]
+            parent_acc[2] += acc[2]
+            parent_acc[3] += acc[3]
+            parent_acc[4] -= 1
+            path, acc = parent, parent_acc
+        else:
+            self._open_totals[path] = acc
+
+    def walk(self, on_enter=None):
+        """
+        Yields item dicts in the same order as a top-down os.walk:
+        a directory's subdirectories first, then its files, then each
+        subdirectory in turn.
+        """
+        if self.is_excluded(self.start_path):
+            return
+        if self.throttle:
+            self.throttle.apply_priority()
+        self._start_tracking()
+
+        if not self._resumed:
+            self._stack = [(self.start_path, None)]
+        stack = self._stack
+        while stack and self._is_running:
+            root, parent = stack.pop()
+            self._current = (root, parent)
+            if on_enter:
+                on_enter(root)
+
+            mtime_ns = self._dir_mtime(root)
+            cached = self._cached_listing(root, mtime_ns)
+            if cached is not None:
+                items, subdirs, own_totals = cached
+                yield from items
+            else:
+                subdirs = []
+                own_totals = yield from self._scan_directory(root, subdirs, mtime_ns)
+
+            if self._is_running:
+                self._complete_listing(root, parent, own_totals, len(subdirs))
+                stack.extend((subdir, root) for subdir in reversed(subdirs))
+            if self.throttle:
+                self.throttle.pace(own_totals[2])
+
+    def stop(self):
+        self._is_running = False
+
+
+class ParallelTreeWalker(TreeWalker):
+    """
+    A TreeWalker that lists directories on a pool of worker threads.
+
+    Each worker owns a deque of directories: it pops its own newest work
+    (depth-first) and steals the oldest, shallowest work from other workers
+    when it runs dry. The calling thread replays the results in the same
+    order as TreeWalker.walk, so items and dir_totals are identical to a
+    single-threaded scan regardless of thread timing. The one exception is
+    an inode reachable through several paths (hard links, bind mounts):
+    which of them is reported depends on which worker lists it first.
+    """
+
+    def __init__(self, start_path, exclusions=None, workers=4, previous_snapshot=None, record_snapshot=False,
+                 throttle=None, one_filesystem=False, skip_pseudo_filesystems=True, rules=None):
+        super().__init__(start_path, exclusions, previous_snapshot, record_snapshot, throttle,
+                         one_filesystem, skip_pseudo_filesystems, rules)
+        self.workers = max(1, int(workers))
+        self._queues = [deque() for _ in range(self.workers)]
+        self._cond = threading.Condition()
+        self._results = {}
+        # The directory the replay is waiting for; past MAX_BUFFERED_LISTINGS it is the only one listed
+        self._wanted = None
+        self._pending = 0
+        self._shutdown = False
+        self._threads = []
+        # Workers list ahead of the replay, so a checkpoint only includes the
+        # inodes claimed by listings that have been replayed
+        self._local = threading.local()
+        self._replayed_visited = set()
+
+    def _claim(self, key):
+        if not super()._claim(key):
+            return False
+        claims = getattr(self._local, 'claims', None)
+        if claims is not None:
+            claims.append(key)
+        return True
+
+    def _count(self, counter):
+        # Workers count per listing and add the counts up under the lock when they publish it
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            super()._count(counter)
+        else:
+            counts[counter] = counts.get(counter, 0) + 1
+
+    def _visited_at_checkpoint(self):
+        return set(self._replayed_visited)
+
+    def restore(self, state):
+        super().restore(state)
+        self._replayed_visited = set(self._visited)
+
+    def _list_directory(self, root):
+        """Returns (items, subdirs, own_totals, claimed inodes) for `root`."""
+        self._local.claims = [] if self.checkpointing else None
+        self._local.counts = {}
+        mtime_ns = self._dir_mtime(root)
+        cached = self._cached_listing(root, mtime_ns)
+        if cached is not None:
+            return cached + (self._local.claims,)
+
+        subdirs = []
+        gen = self._scan_directory(root, subdirs, mtime_ns)
+        items = []
+        try:
+            while True:
+                items.append(next(gen))
+        except StopIteration as done:
+            own_totals = done.value
+        return items, subdirs, own_totals, self._local.claims
+
+    def _next_task(self, index):
+        try:
+            return self._queues[index].pop()
+        except IndexError:
+            pass
+        for offset in range(1, self.workers):
+            try:
+                return self._queues[(index + offset) % self.workers].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _take_wanted(self):
+        """Takes the directory the replay is waiting for off its queue, if it is still queued. Call under _cond."""
+        wanted = self._wanted
+        if wanted is None or wanted in self._results:
+            return None
+        for tasks in self._queues:
+            try:
+                tasks.remove(wanted)
+                return wanted
+            except ValueError:
+                continue
+        return None
+
+    def _worker(self, index):
+        own = self._queues[index]
+        if self.throttle:
+            self.throttle.apply_priority()
+        while self._is_running and not self._shutdown:
+            root = None
+            with self._cond:
+                # Don't run too far ahead of the replay; once enough listings are waiting for it,
+                # only the directory it is waiting for is listed, so it can always make progress
+                while len(self._results) >= MAX_BUFFERED_LISTINGS and self._is_running and not self._shutdown:
+                    root = self._take_wanted()
+                    if root is not None:
+                        break
+                    self._cond.wait(0.05)
+            if not self._is_running or self._shutdown:
+                break
+            if root is None:
+                root = self._next_task(index)
+            if root is None:
+                with self._cond:
+                    if self._pending == 0 or self._shutdown:
+                        return
+                    self._cond.wait(0.05)
+                continue
+
+            listing = self._list_directory(root)
+            subdirs = listing[1]
+            if self.throttle:
+                self.throttle.pace(listing[2][2])
+            with self._cond:
+                for counter, count in self._local.counts.items():
+                    setattr(self, counter, getattr(self, counter) + count)
+                # Count children before publishing them so _pending never hits 0 early
+                self._pending += len(subdirs) - 1
+                own.extend(reversed(subdirs))
+                self._results[root] = listing
+                self._cond.notify_all()
+
+    def _wait_for(self, root):
+        with self._cond:
+            self._wanted = root
+            self._cond.notify_all()
+            while root not in self._results:
+                if not self._is_running:
+                    return None
+                self._cond.wait(0.1)
+            self._wanted = None
+            listing = self._results.pop(root)
+            # Wakes workers holding back for the replay to catch up
+            self._cond.notify_all()
+            return listing
+
+    def walk(self, on_enter=None):
+        if self.is_excluded(self.start_path):
+            return
+        if self.throttle:
+            self.throttle.apply_priority()
+        self._start_tracking()
+
+        if not self._resumed:
+            self._stack = [(self.start_path, None)]
+            self._replayed_visited.update(self._visited)
+        stack = self._stack
+        self._pending = len(stack)
+        self._queues[0].extend(path for path, _ in stack)
+        self._threads = [threading.Thread(target=self._worker, args=(i,), daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+        try:
+            while stack and self._is_running:
+                root, parent = stack.pop()
+                listing = self._wait_for(root)
+                if listing is None:
+                    break
+                self._current = (root, parent)
+                if on_enter:
+                    on_enter(root)
+
+                items, subdirs, own_totals, claims = listing
+                if claims:
+                    self._replayed_visited.update(claims)
+                yield from items
+                if self._is_running:
+                    self._complete_listing(root, parent, own_totals, len(subdirs))
+                    stack.extend((subdir, root) for subdir in reversed(subdirs))
+        finally:
+            with self._cond:
+                self._shutdown = True
+                self._cond.notify_all()
+            for thread in self._threads:
+                thread.join()
+            self._results.clear()
+
+
+def create_walker(start_path, exclusions=None, workers=1, previous_snapshot=None, record_snapshot=False, throttle=None,
+                  one_filesystem=False, rules=None):
+    """Returns a sequential walker for one worker, a parallel one otherwise."""
+    if workers and workers > 1:
+        return ParallelTreeWalker(start_path, exclusions, workers=workers, previous_snapshot=previous_snapshot,
+                                  record_snapshot=record_snapshot, throttle=throttle, one_filesystem=one_filesystem,
+                                  rules=rules)
+    return TreeWalker(start_path, exclusions, previous_snapshot, record_snapshot, throttle,
+                      one_filesystem=one_filesystem, rules=rules)
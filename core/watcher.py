@@ -0,0 +1,203 @@
+import os
+import stat
+import time
+import logging
+from PyQt6.QtCore import QObject, pyqtSignal
+from .categorizer import Categorizer, DEV_PROJECT_INDICATORS
+from .exclusions import ExclusionMatcher
+from .traversal import TreeWalker, allocated_size
+from .inotify import (Inotify, InotifyError, WatchLimitReached, IN_CREATE, IN_DELETE, IN_CLOSE_WRITE,
+                      IN_ATTRIB, IN_MOVED_FROM, IN_MOVED_TO, IN_DELETE_SELF, IN_MOVE_SELF, IN_ONLYDIR,
+                      IN_DONT_FOLLOW, IN_ISDIR, IN_IGNORED, IN_Q_OVERFLOW)
+
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+DEFAULT_MAX_WATCHES = 8192
+FLUSH_INTERVAL = 1.0  # seconds between change batches sent to the UI
+
+_DELETED = 'deleted'
+
+class TreeWatcher(QObject):
+    """
+    Keeps scan results current by watching every scanned directory with inotify.
+
+    Events are coalesced per path and flushed about once a second as a list of
+    ('upsert', item) and ('deleted', path) changes. A deleted directory stands
+    for its whole subtree. If the watch limit is hit the watcher stops and
+    emits watch_limit_reached so the app can fall back to periodic rescans.
+    """
+    changes_ready = pyqtSignal(list)
+    watch_limit_reached = pyqtSignal(int)
+    rescan_needed = pyqtSignal(str)
+    progress_update = pyqtSignal(str)
+    watching_stopped = pyqtSignal()
+
+    def __init__(self, start_path, directories, exclusions=None, max_watches=DEFAULT_MAX_WATCHES, rules=None):
+        super().__init__()
+        self.start_path = os.path.normpath(start_path)
+        self.directories = directories
+        self.exclusions = exclusions
+        self.matcher = ExclusionMatcher(exclusions)
+        self.max_watches = max_watches
+        self._is_running = True
+        self.inotify = None
+        self.rules = rules
+        self.categorizer = Categorizer(rules)
+        self._wd_to_path = {}
+        self._path_to_wd = {}
+        # path -> item dict, None (stat at flush time) or _DELETED, in event order
+        self._pending = {}
+
+    def _watch(self, path):
+        if path in self._path_to_wd:
+            return
+        if len(self._wd_to_path) >= self.max_watches:
+            raise WatchLimitReached(0, f"configured watch limit of {self.max_watches} reached")
+        try:
+            wd = self.inotify.add_watch(path, WATCH_MASK)
+        except WatchLimitReached:
+            raise
+        except InotifyError as e:
+            logging.debug(f"Could not watch {path}: {e}")
+            return
+        # Re-adding a moved directory returns its existing descriptor
+        old_path = self._wd_to_path.get(wd)
+        if old_path is not None:
+            self._path_to_wd.pop(old_path, None)
+        self._wd_to_path[wd] = path
+        self._path_to_wd[path] = wd
+
+    def _unwatch_subtree(self, path):
+        prefix = path + os.sep
+        for watched, wd in list(self._path_to_wd.items()):
+            if watched == path or watched.startswith(prefix):
+                self.inotify.rm_watch(wd)
+                self._path_to_wd.pop(watched, None)
+                self._wd_to_path.pop(wd, None)
+
+    def _queue(self, path, value):
+        # Moving the key to the end keeps the pending changes in event order
+        self._pending.pop(path, None)
+        self._pending[path] = value
+
+    def _queue_deleted(self, path, is_dir):
+        if is_dir:
+            prefix = path + os.sep
+            for pending_path in [p for p in self._pending if p.startswith(prefix)]:
+                del self._pending[pending_path]
+        self._queue(path, _DELETED)
+
+    def _add_subtree(self, path):
+        """Watches a new directory tree and queues everything already inside it."""
+        self._queue(path, None)
+        walker = TreeWalker(path, self.exclusions, rules=self.rules)
+        for item in walker.walk(on_enter=self._watch):
+            if not self._is_running:
+                break
+            self._queue(item['path'], item)
+
+    def _handle_events(self, events):
+        for wd, mask, cookie, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self.rescan_needed.emit("inotify event queue overflowed")
+                continue
+            if mask & IN_IGNORED:
+                path = self._wd_to_path.pop(wd, None)
+                if path is not None:
+                    self._path_to_wd.pop(path, None)
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                continue  # Reported by the parent directory's watch
+
+            parent = self._wd_to_path.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, name)
+            if self.matcher and self.matcher.matches(path):
+                continue
+
+            is_dir = bool(mask & IN_ISDIR)
+            if name.lower() in DEV_PROJECT_INDICATORS:
+                # Project status is inherited, so the change can affect any cached folder
+                self.categorizer.clear()
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self._queue_deleted(path, is_dir)
+                if is_dir:
+                    self._unwatch_subtree(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                if is_dir:
+                    self._add_subtree(path)
+                else:
+                    self._queue(path, None)
+            elif mask & (IN_CLOSE_WRITE | IN_ATTRIB) and not is_dir:
+                self._queue(path, None)
+
+    def set_rules(self, rules):
+        """Switches to new categorization rules for changes seen from now on."""
+        self.rules = rules
+        self.categorizer = Categorizer(rules)
+
+    def _stat_item(self, path):
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        if stat.S_ISDIR(stat_result.st_mode):
+            return {'type': 'dir', 'path': path, 'size': 0, 'category': self.categorizer.categorize(path, True)}
+        return {'type': 'file', 'path': path, 'size': stat_result.st_size, 'disk_size': allocated_size(stat_result),
+                'category': self.categorizer.categorize(path, False, stat_result.st_size, stat_result.st_mtime),
+                'mtime': stat_result.st_mtime}
+
+    def _flush(self):
+        changes = []
+        for path, value in self._pending.items():
+            if value == _DELETED:
+                changes.append(('deleted', path))
+                continue
+            item = value if value is not None else self._stat_item(path)
+            if item is None:
+                changes.append(('deleted', path))
+            else:
+                changes.append(('upsert', item))
+        self._pending = {}
+        if changes:
+            self.changes_ready.emit(changes)
+
+    def run(self):
+        """Adds the watches and processes events until stopped."""
+        try:
+            self.inotify = Inotify()
+        except (InotifyError, OSError) as e:
+            logging.error(f"Watch mode unavailable: {e}")
+            self.watching_stopped.emit()
+            return
+
+        try:
+            self.progress_update.emit(f"Adding watches for {len(self.directories)} folders...")
+            for path in self.directories:
+                if not self._is_running:
+                    break
+                self._watch(path)
+            logging.info(f"Watching {len(self._wd_to_path)} folders under {self.start_path} for changes.")
+            self.progress_update.emit(f"Watching {len(self._wd_to_path)} folders for changes.")
+
+            last_flush = time.monotonic()
+            while self._is_running:
+                self._handle_events(self.inotify.read_events(timeout=0.5))
+                now = time.monotonic()
+                if now - last_flush >= FLUSH_INTERVAL:
+                    self._flush()
+                    last_flush = now
+        except WatchLimitReached as e:
+            logging.warning(f"Watch mode stopped: {e}")
+            self.watch_limit_reached.emit(len(self._wd_to_path))
+        except Exception as e:
+            logging.error(f"Watch mode failed: {e}", exc_info=True)
+        finally:
+            self.inotify.close()
+            self._wd_to_path.clear()
+            self._path_to_wd.clear()
+            self.watching_stopped.emit()
+
+    def stop(self):
+        self._is_running = False
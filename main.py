@@ -3,6 +3,9 @@ import os
 import math
 import datetime
 import time
+
+# Startup timing reference; see FileDeleterApp.log_startup_timing
+STARTUP_TIME = time.perf_counter()
 import configparser
 import logging
 import json
@@ -15,14 +18,24 @@ from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QL
 from PyQt6.QtCore import (Qt, QThread, QTimer, QDateTime, QUrl, QStringListModel, QByteArray, QStandardPaths, QModelIndex, QSettings, QItemSelectionModel)
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QColor, QDesktopServices, QFontMetrics
 
-from core.scanner import Scanner
+from core.scanner import Scanner, SCAN_INDEX_PATH, SCAN_CHECKPOINT_PATH, CATEGORY_RULES_PATH
+from core.scan_checkpoint import load_checkpoint, remove_checkpoint
+from core.scan_index import open_scan_index
+from core.duplicate_finder import ResultsCoverage, IndexCoverage, DEFAULT_HASH_WORKERS
+from core.traversal import DirTotals
+from core.result_store import ScanResults
+from core.watcher import TreeWatcher, DEFAULT_MAX_WATCHES, FLUSH_INTERVAL
+from core.inotify import is_supported as watch_mode_supported
+from core.throttle import create_throttle
+from core.category_rules import CategoryRulesFile
 from core.categorizer import (
+    Categorizer,
     CAT_SYSTEM, CAT_APP, CAT_SAFE_DELETE, CAT_USER, CAT_UNKNOWN,
     CAT_DEV_PROJECT, CAT_USER_DOWNLOADS, CAT_USER_DOCUMENTS
 )
 from core.deleter import Deleter
-from core.suggester import DeletionSuggester, SuggesterWorker
-from core.persistence import save_suggester, load_suggester
+# core.suggester and core.persistence pull in NumPy, scikit-learn and joblib; they are imported when first needed
+from core.training_store import TrainingStore, SUGGESTER_DIR, LABEL_DELETE, LABEL_KEEP
 from core.empty_folder_finder import EmptyFolderFinderWorker
 from core.log_setup import setup_logging
 from ui.preview_panel import PreviewPanel
@@ -35,12 +48,21 @@ from ui.exclusions_tab import ExclusionsTab
 from ui.settings_tab import SettingsTab
 from ui.logging_tab import LoggingTab
 from ui.deletion_history_tab import DeletionHistoryTab
+from ui.lazy_tab import LazyTab
 from core.database_logger import log_event
 from core.deletion_logger import setup_deletion_logger
 
+IMPORTS_DONE_TIME = time.perf_counter()
+
 CAT_SUGGESTED = "Smart Suggestions"
 CAT_LARGEST_FILES = "Largest Files (Top 100)"
 CAT_OLD_FILES = "Old & Unused Files (1 Year+)"
+SUMMARY_CATEGORIES = (CAT_LARGEST_FILES, CAT_OLD_FILES, CAT_SUGGESTED)
+
+# Periodic incremental rescan used instead of watch mode when the watch limit is hit
+WATCH_FALLBACK_INTERVAL_MS = 10 * 60 * 1000
+# How often the categorization rules file is checked for edits
+RULES_POLL_INTERVAL_MS = 2000
 
 class FileDeleterApp(QWidget):
     def __init__(self):
@@ -67,13 +89,33 @@ class FileDeleterApp(QWidget):
         self.deleter = None
         self.suggester_thread = None
         self.suggester_worker = None
-        self.suggester = DeletionSuggester()
+        self.suggester = None  # Loaded when the first suggestions are computed
+        self.training_store = TrainingStore()
         
         self.scheduler_timer = QTimer(self)
         self.scheduler_timer.timeout.connect(self.run_scheduled_scan)
         self.last_run_date = None
         self.exclusions = []
         self.schedule_settings = {}
+        self.scan_workers = 1
+        self.hash_workers = DEFAULT_HASH_WORKERS
+        self.incremental_scans = True
+        self.one_filesystem = False
+        self.watch_changes = False
+        self.max_watches = DEFAULT_MAX_WATCHES
+        self.last_scan_path = None
+
+        # Watch mode: keeps the scan results live after a scan finishes
+        self.watcher_thread = None
+        self.watcher = None
+        self.watch_fallback_timer = QTimer(self)
+        self.watch_fallback_timer.timeout.connect(self.run_watch_fallback_rescan)
+
+        # User categorization rules; the file is polled so edits apply without a restart
+        self.category_rules = CategoryRulesFile(CATEGORY_RULES_PATH)
+        self.rules_reload_pending = False
+        self.rules_timer = QTimer(self)
+        self.rules_timer.timeout.connect(self.check_category_rules)
         
         self.saved_theme = "Futuristic Dark"
         self.saved_header_states = {}
@@ -84,7 +126,13 @@ class FileDeleterApp(QWidget):
         self.ui_update_timer.timeout.connect(self.update_category_tree_ui)
 
         self.categorized_data = {}
+        self.scan_results = ScanResults()
         self.dir_sizes = {}
+        self.dir_totals = {}
+        self.scan_exclusions = []
+        self.scan_index = None
+        # Which size categories, folders and Largest Files are measured by: 'size' or 'disk_size'
+        self.size_column = 'size'
         
         # Track recent restorations to trigger UI refreshes
         self.recent_restorations = False
@@ -105,6 +153,13 @@ class FileDeleterApp(QWidget):
         self.init_ui()
         self.load_settings()
         self.restore_ui_state()
+
+        # Disk reads that are not needed to draw the window run once it has been painted
+        self.first_paint_time = None
+        self.startup_finished = False
+        self.recovered_scan = None  # (scan_path, item count) of the session crash recovery found, reported in finish_startup
+        # In case the window is never painted, e.g. when it starts minimized
+        QTimer.singleShot(1000, self.finish_startup)
         
         # Setup automatic state saving timer
         self.state_timer = QTimer(self)
@@ -114,8 +169,41 @@ class FileDeleterApp(QWidget):
         # Attempt to recover from previous crash
         self.attempt_crash_recovery()
         
+        self.constructed_time = time.perf_counter()
         logging.info("Application initialized successfully.")
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_time is None:
+            self.first_paint_time = time.perf_counter()
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Loads what the window does not need for its first paint: categorization rules, training data and the last scan."""
+        if self.startup_finished:
+            return
+        self.startup_finished = True
+        started = time.perf_counter()
+        self.category_rules.reload_if_changed()
+        self.update_rules_status()
+        self.rules_timer.start(RULES_POLL_INTERVAL_MS)
+        self.training_store.load()
+        # Show the results of the last scan straight away
+        self.load_last_scan_from_index()
+        if self.recovered_scan:
+            self.show_recovered_scan_status(*self.recovered_scan)
+        self.log_startup_timing(time.perf_counter() - started)
+        # Asked once the window is up; an interrupted scan is worth resuming however old the state file is
+        QTimer.singleShot(0, self.offer_scan_resume)
+
+    def log_startup_timing(self, deferred_seconds):
+        """Logs how long the imports, the window and its first paint took, counted from the start of main.py."""
+        paint = f"{self.first_paint_time - STARTUP_TIME:.2f} s" if self.first_paint_time else "not painted yet"
+        self.startup_report = (f"Startup timing: imports {IMPORTS_DONE_TIME - STARTUP_TIME:.2f} s, "
+                               f"window built {self.constructed_time - STARTUP_TIME:.2f} s, first paint {paint}, "
+                               f"deferred loading {deferred_seconds:.2f} s")
+        logging.info(self.startup_report)
+
     def connect_empty_folder_deletion_finished(self, callback):
         """Connect empty folder tab to deletion completion events"""
         self.empty_folder_deletion_callback = callback
@@ -144,7 +232,7 @@ class FileDeleterApp(QWidget):
                 "current_tab": self.tabs.currentIndex(),
                 "scan_path": self.cleaner_tab.get_scan_path() if hasattr(self.cleaner_tab, 'get_scan_path') else "",
                 "has_categorized_data": bool(self.categorized_data),
-                "category_count": sum(len(data.get('items', [])) for data in self.categorized_data.values()),
+                "category_count": sum(self._category_count(data) for data in self.categorized_data.values()),
                 "exclusions": self.exclusions.copy(),
                 "schedule_settings": safe_schedule_settings,
                 "ui_state": {
@@ -219,13 +307,14 @@ class FileDeleterApp(QWidget):
             if "current_tab" in state:
                 self.tabs.setCurrentIndex(state["current_tab"])
                 
-            # If there was scan data, suggest rescanning
+            # If there was scan data, it is reloaded from the scan index when available, otherwise suggest rescanning
             if state.get("has_categorized_data") and state.get("scan_path"):
                 scan_path = state["scan_path"]
                 category_count = state.get("category_count", 0)
                 
                 logging.info(f"Previous session had {category_count} items scanned in '{scan_path}'")
-                self.status_label.setText(f"Recovered from crash - previous scan: {category_count} items in '{scan_path}'")
+                # Reported once finish_startup has tried to load the scan from the index
+                self.recovered_scan = (scan_path, category_count)
                 
                 # Auto-populate the scan path
                 if hasattr(self.cleaner_tab, 'path_input'):
@@ -240,6 +329,39 @@ class FileDeleterApp(QWidget):
             logging.error(f"Error during crash recovery: {e}")
             logging.error(traceback.format_exc())
 
+    def show_recovered_scan_status(self, scan_path, category_count):
+        """Tells whether the scan of the crashed session could be restored from the scan index."""
+        if self.categorized_data:
+            self.status_label.setText(f"Recovered from crash - restored last scan results from the scan index")
+        else:
+            self.status_label.setText(f"Recovered from crash - previous scan: {category_count} items in '{scan_path}'")
+
+    def offer_scan_resume(self):
+        """Offers to resume a scan that was interrupted by a crash from its last checkpoint."""
+        checkpoint = load_checkpoint(SCAN_CHECKPOINT_PATH)
+        if checkpoint is None:
+            remove_checkpoint(SCAN_CHECKPOINT_PATH)
+            return
+        if self.scanner_thread and self.scanner_thread.isRunning():
+            return
+
+        path = checkpoint['start_path']
+        saved = datetime.datetime.fromtimestamp(checkpoint.get('created', 0)).strftime('%Y-%m-%d %H:%M')
+        remaining = len(checkpoint['walker']['pending'])
+        reply = QMessageBox.question(
+            self, "Resume Interrupted Scan",
+            f"The scan of '{path}' was interrupted after {checkpoint['items_written']:,} items "
+            f"(last checkpoint {saved}, {remaining:,} folders left to scan).\n\n"
+            f"Resume it from the checkpoint instead of starting over?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            logging.info(f"Resuming interrupted scan of '{path}' from checkpoint.")
+            self.cleaner_tab.path_input.setText(path)
+            self.start_scan(path, resume_state=checkpoint)
+        else:
+            logging.info("Discarded the checkpoint of the interrupted scan.")
+            remove_checkpoint(SCAN_CHECKPOINT_PATH)
+
     def init_ui(self):
         self.main_layout = QVBoxLayout(self)
         self.preview_splitter = QSplitter(Qt.Orientation.Vertical)
@@ -248,22 +370,25 @@ class FileDeleterApp(QWidget):
         self.cleaner_tab = CleanerTab(self)
         self.dupe_tab = DuplicateFinderTab(self)
         self.empty_tab = EmptyFolderFinderTab(self)
-        self.quarantine_tab = QuarantineTab(self)
+        # Quarantine and Deletion History read from disk; they are built when first opened
+        self.quarantine_tab = None
+        self.quarantine_page = LazyTab(self.build_quarantine_tab)
         self.scheduler_tab = SchedulerTab(self)
         self.exclusions_tab = ExclusionsTab(self)
         self.settings_tab = SettingsTab(self)
         self.logging_tab = LoggingTab(self)
-        self.deletion_history_tab = DeletionHistoryTab(self)
+        self.deletion_history_tab = None
+        self.deletion_history_page = LazyTab(self.build_deletion_history_tab)
         
         self.tabs.addTab(self.cleaner_tab, "Smart Cleaner")
         self.tabs.addTab(self.dupe_tab, "Duplicate Finder")
         self.tabs.addTab(self.empty_tab, "Empty Folder Finder")
-        self.tabs.addTab(self.quarantine_tab, "Quarantine")
+        self.tabs.addTab(self.quarantine_page, "Quarantine")
         self.tabs.addTab(self.scheduler_tab, "Scheduler")
         self.tabs.addTab(self.exclusions_tab, "Exclusions")
         self.tabs.addTab(self.settings_tab, "Settings")
         self.tabs.addTab(self.logging_tab, "Logging")
-        self.tabs.addTab(self.deletion_history_tab, "Deletion History")
+        self.tabs.addTab(self.deletion_history_page, "Deletion History")
 
         # --- Connect signals to slots ---
         self.tabs.currentChanged.connect(self.on_tab_changed)
@@ -275,17 +400,22 @@ class FileDeleterApp(QWidget):
         self.cleaner_tab.item_selected.connect(self.on_file_selected)
         self.cleaner_tab.add_to_exclusions_requested.connect(self.add_exclusion_and_update)
         self.cleaner_tab.refresh_requested.connect(self.refresh_current_view)
+        self.cleaner_tab.size_column_changed.connect(self.set_size_column)
         self.cleaner_tab.category_tree.selectionModel().selectionChanged.connect(self.on_category_selected)
         
         # Duplicate Tab
         self.dupe_tab.delete_requested.connect(self.delete_selected_files)
         
-        # Quarantine Tab
-        self.quarantine_tab.files_restored.connect(self.on_files_restored)
-        
         # Other Tabs
         self.settings_tab.theme_changed.connect(self.change_theme)
         self.settings_tab.recycle_bin_changed.connect(self.set_recycle_bin)
+        self.settings_tab.scan_workers_changed.connect(self.set_scan_workers)
+        self.settings_tab.hash_workers_changed.connect(self.set_hash_workers)
+        self.settings_tab.incremental_scans_changed.connect(self.set_incremental_scans)
+        self.settings_tab.one_filesystem_changed.connect(self.set_one_filesystem)
+        self.settings_tab.watch_changes_changed.connect(self.set_watch_changes)
+        self.settings_tab.max_watches_changed.connect(self.set_max_watches)
+        self.settings_tab.edit_rules_requested.connect(self.open_category_rules)
         self.exclusions_tab.exclusions_changed.connect(self.update_exclusions)
         self.scheduler_tab.schedule_settings_changed.connect(self.update_schedule_settings)
 
@@ -319,6 +449,15 @@ class FileDeleterApp(QWidget):
         status_bar_layout.addWidget(self.status_label, 1)
         self.main_layout.addLayout(status_bar_layout)
 
+    def build_quarantine_tab(self):
+        self.quarantine_tab = QuarantineTab(self)
+        self.quarantine_tab.files_restored.connect(self.on_files_restored)
+        return self.quarantine_tab
+
+    def build_deletion_history_tab(self):
+        self.deletion_history_tab = DeletionHistoryTab(self)
+        return self.deletion_history_tab
+
     def setup_logging(self):
         self.log_handler = setup_logging()
         setup_deletion_logger()
@@ -333,7 +472,7 @@ class FileDeleterApp(QWidget):
         for i in range(model.columnCount()):
             tree_view.resizeColumnToContents(i)
 
-    def start_scan(self, path):
+    def start_scan(self, path, workers=None, incremental=None, scheduled=False, resume_state=None):
         if self.scanner_thread and self.scanner_thread.isRunning():
             logging.warning("Scan is already in progress.")
             return
@@ -342,6 +481,12 @@ class FileDeleterApp(QWidget):
             logging.warning("Suggestion calculation is in progress. Cannot start scan.")
             return
 
+        # A new scan replaces whatever the watcher was keeping up to date
+        self.stop_watching()
+        if path != self.last_scan_path:
+            self.watch_fallback_timer.stop()
+        self.last_scan_path = path
+
         # CLEAR OLD DATA: Clear the file list view from previous scan
         logging.info("Clearing previous scan data")
         self.cleaner_tab.update_file_list([], [], False)
@@ -361,19 +506,37 @@ class FileDeleterApp(QWidget):
             self.recently_deleted_files.clear()
             logging.info("Visual tracking: Cleared highlighting for new scan")
 
+        if workers is None:
+            workers = self.scan_workers
+        if incremental is None:
+            incremental = self.incremental_scans
+
+        # A resumed scan keeps the exclusions and filesystem option it was started with
+        exclusions = resume_state['exclusions'] if resume_state else self.exclusions
+        one_filesystem = resume_state.get('one_filesystem', False) if resume_state else self.one_filesystem
+        self.scan_exclusions = list(exclusions)
+
         self.setup_category_data()
-        logging.info(f"Starting scan on path: {path}")
+        # The folder totals described the results just cleared; the new ones arrive with scan_finished
+        self.dir_totals = {}
+        logging.info(f"{'Resuming' if resume_state else 'Starting'} scan on path: {path} ({workers} worker thread(s))")
         self.status_label.setText('Scanning...')
         self.progress_bar.setVisible(True)
         self.scanner_thread = QThread()
-        self.scanner = Scanner(start_path=path, exclusions=self.exclusions)
+        throttle = self.create_throttle(scheduled)
+        if throttle:
+            logging.info("Scan runs throttled at background priority.")
+        self.scanner = Scanner(start_path=path, exclusions=exclusions, workers=workers, incremental=incremental,
+                               index_path=SCAN_INDEX_PATH, throttle=throttle, one_filesystem=one_filesystem,
+                               checkpoint_path=SCAN_CHECKPOINT_PATH, resume_state=resume_state,
+                               rules=self.category_rules.rules)
         self.scanner.moveToThread(self.scanner_thread)
 
         self.scanner_thread.started.connect(self.scanner.run)
         self.scanner.scan_finished.connect(self.scan_finished)
         self.scanner.scan_finished.connect(self.scanner_thread.quit)
         self.scanner.progress_update.connect(self.update_status)
-        self.scanner.item_found.connect(self.handle_item_found)
+        self.scanner.items_found.connect(self.handle_items_found)
         
         self.scanner_thread.finished.connect(self.scanner.deleteLater)
         self.scanner_thread.finished.connect(self.scanner_thread.deleteLater)
@@ -388,10 +551,11 @@ class FileDeleterApp(QWidget):
             logging.info("Cancelling scan...")
             self.status_label.setText("Cancelling scan...")
             self.scanner.stop()
-        if self.suggester_thread and self.suggester_thread.isRunning():
+        if self.suggester_worker and self.suggester_thread and self.suggester_thread.isRunning():
             logging.info("Cancelling suggestions calculation...")
             self.status_label.setText("Cancelling suggestions...")
-            self.suggester_thread.quit()
+            self.suggester_worker.stop()
+            self.progress_bar.setVisible(False)
         self.cleaner_tab.set_scan_mode(is_scanning=False)
 
     def format_size(self, size):
@@ -407,13 +571,19 @@ class FileDeleterApp(QWidget):
         elided_text = metrics.elidedText(message, Qt.TextElideMode.ElideLeft, self.status_label.width())
         self.status_label.setText(elided_text)
         
-    def handle_item_found(self, item):
-        category = item['category']
-        if category not in self.categorized_data: return
-        self.categorized_data[category]['items'].append(item)
-        if category not in self.pending_updates:
-            self.pending_updates[category] = {'size': 0}
-        self.pending_updates[category]['size'] += item.get('size', 0)
+    def handle_items_found(self, items):
+        """Adds a batch of scanned items to the result store, grouping the size updates per category."""
+        self.scan_results.extend(items)
+        batch_sizes = {}
+        for item in items:
+            category = item['category']
+            if category not in self.categorized_data: continue
+            batch_sizes[category] = batch_sizes.get(category, 0) + self._item_size(item)
+
+        for category, size in batch_sizes.items():
+            if category not in self.pending_updates:
+                self.pending_updates[category] = {'size': 0}
+            self.pending_updates[category]['size'] += size
 
     def update_category_tree_ui(self):
         if self.pending_updates:
@@ -425,19 +595,22 @@ class FileDeleterApp(QWidget):
         for cat_name, data in self.categorized_data.items():
             category_data_for_ui[cat_name] = {
                 "size_str": self.format_size(data['size']),
-                "count": len(data['items'])
+                "count": self._category_count(data)
             }
         self.cleaner_tab.update_category_tree(category_data_for_ui)
         self.resize_tree_columns(self.cleaner_tab.category_tree)
 
-    def scan_finished(self, dir_sizes):
+    def scan_finished(self, dir_totals):
         self.ui_update_timer.stop()
         self.update_category_tree_ui()
         self.status_label.setText('Scan finished. Analyzing files...')
         logging.info("Scan finished. Starting file analysis.")
-        self.dir_sizes = dir_sizes
+        self.dir_totals = dir_totals
+        self.dir_sizes = {path: getattr(totals, self.size_column) for path, totals in dir_totals.items()}
         
         self._rebuild_summary_categories()
+        logging.info(f"Scan results: {len(self.scan_results)} items in "
+                     f"{self.format_size(self.scan_results.memory_usage())} of columnar storage.")
 
         self.update_category_tree_ui()
 
@@ -460,6 +633,322 @@ class FileDeleterApp(QWidget):
         else:
             self.status_label.setText("Scan complete. Showing largest files by default.")
 
+        self.start_watching(self.last_scan_path)
+        self.start_suggestions()
+
+    def load_saved_suggester(self):
+        """Returns the suggester saved by a previous session, or a new one if there is none it can reuse."""
+        from core.suggester import DeletionSuggester, MODEL_VERSION
+        from core.persistence import load_suggester
+        suggester = load_suggester(SUGGESTER_DIR)
+        if isinstance(suggester, DeletionSuggester) and getattr(suggester, 'version', None) == MODEL_VERSION:
+            return suggester
+        if suggester is not None:
+            logging.info("Saved suggester model is from an older version; starting a new one.")
+        return DeletionSuggester()
+
+    def start_suggestions(self):
+        """Updates the suggester with the latest delete/restore decisions and predicts on the new scan."""
+        if self.suggester_thread and self.suggester_thread.isRunning():
+            return
+        from core.suggester import SuggesterWorker
+        if self.suggester is None:
+            self.suggester = self.load_saved_suggester()
+        self.suggester_thread = QThread()
+        self.suggester_worker = SuggesterWorker(self.suggester, self.categorized_data, self.training_store)
+        self.suggester_worker.moveToThread(self.suggester_thread)
+        self.suggester_thread.started.connect(self.suggester_worker.run)
+        self.suggester_worker.suggestions_found.connect(self.on_suggestions_found)
+        self.suggester_worker.progress.connect(self.on_suggestion_progress)
+        self.suggester_worker.suggestion_finished.connect(self.on_suggestion_finished)
+        self.suggester_worker.suggestion_failed.connect(self.on_suggestion_failed)
+        self.suggester_worker.finished.connect(self.suggester_thread.quit)
+        self.suggester_thread.finished.connect(self.on_suggester_thread_finished)
+        self.categorized_data[CAT_SUGGESTED]['items'] = []
+        self.categorized_data[CAT_SUGGESTED]['size'] = 0
+        self.suggester_thread.start()
+
+    def start_watching(self, path):
+        """Starts watch mode for the scanned tree if it is enabled and supported."""
+        if not self.watch_changes or not path or not self.dir_totals:
+            return
+        if not watch_mode_supported():
+            logging.info("Watch mode is only available on Linux.")
+            return
+        if self.watch_fallback_timer.isActive():
+            logging.debug("Watch limit was hit for this path - staying on periodic rescans.")
+            return
+        self.stop_watching()
+
+        logging.info(f"Starting watch mode for {path} ({len(self.dir_totals)} folders, limit {self.max_watches})")
+        self.watcher_thread = QThread()
+        self.watcher = TreeWatcher(path, list(self.dir_totals), exclusions=self.exclusions,
+                                   max_watches=self.max_watches, rules=self.category_rules.rules)
+        self.watcher.moveToThread(self.watcher_thread)
+
+        self.watcher_thread.started.connect(self.watcher.run)
+        self.watcher.changes_ready.connect(self.apply_watch_changes)
+        self.watcher.watch_limit_reached.connect(self.on_watch_limit_reached)
+        self.watcher.rescan_needed.connect(self.on_watch_rescan_needed)
+        self.watcher.progress_update.connect(self.update_status)
+        self.watcher.watching_stopped.connect(self.watcher_thread.quit)
+
+        self.watcher_thread.finished.connect(self.watcher.deleteLater)
+        self.watcher_thread.finished.connect(self.watcher_thread.deleteLater)
+        self.watcher_thread.finished.connect(self.on_watcher_thread_finished)
+        self.watcher_thread.start()
+
+    def stop_watching(self):
+        if self.watcher and self.watcher_thread and self.watcher_thread.isRunning():
+            logging.info("Stopping watch mode.")
+            self.watcher.stop()
+            self.watcher_thread.quit()
+            self.watcher_thread.wait(2000)
+
+    def is_watching(self, path=None):
+        """Returns True if watch mode is active (and covers `path`, if given)."""
+        if not (self.watcher and self.watcher_thread and self.watcher_thread.isRunning()):
+            return False
+        if path is None:
+            return True
+        root = self.watcher.start_path
+        path = os.path.normpath(path)
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+    def on_watcher_thread_finished(self):
+        logging.debug("Watcher thread finished, cleaning up references.")
+        # finished is emitted before the thread has fully exited; dropping the last reference earlier would
+        # destroy a running QThread
+        self.watcher_thread.wait()
+        self.watcher = None
+        self.watcher_thread = None
+
+    def on_watch_limit_reached(self, watch_count):
+        minutes = WATCH_FALLBACK_INTERVAL_MS // 60000
+        logging.warning(f"Watch limit reached after {watch_count} folders; "
+                        f"falling back to an incremental rescan every {minutes} minutes.")
+        self.status_label.setText(f"Too many folders to watch - rescanning every {minutes} minutes instead.")
+        self.watch_fallback_timer.start(WATCH_FALLBACK_INTERVAL_MS)
+
+    def on_watch_rescan_needed(self, reason):
+        logging.warning(f"Watch mode lost track of changes ({reason}); running an incremental rescan.")
+        self.run_watch_fallback_rescan()
+
+    def run_watch_fallback_rescan(self):
+        if not self.last_scan_path or not os.path.exists(self.last_scan_path):
+            self.watch_fallback_timer.stop()
+            return
+        if self.scanner_thread and self.scanner_thread.isRunning():
+            return
+        logging.info(f"Running incremental rescan of {self.last_scan_path} to pick up changes.")
+        self.start_scan(self.last_scan_path, incremental=True, scheduled=True)
+
+    def _adjust_dir_totals(self, path, size, files, entries, disk_size, changed_dirs):
+        """Adds the given deltas to every scanned ancestor directory of `path`."""
+        parent = os.path.dirname(path)
+        while parent != path and parent in self.dir_totals:
+            totals = self.dir_totals[parent]
+            new_totals = DirTotals(totals.size + size, totals.files + files, totals.entries + entries,
+                                   totals.disk_size + disk_size)
+            self.dir_totals[parent] = new_totals
+            self.dir_sizes[parent] = getattr(new_totals, self.size_column)
+            changed_dirs.add(parent)
+            path, parent = parent, os.path.dirname(parent)
+
+    def apply_watch_changes(self, changes):
+        """
+        Applies a batch of watch-mode changes to the scan results, dir_totals and
+        the scan index. A deleted path removes its whole subtree; an upserted
+        directory replaces its old subtree and its new contents follow it in
+        the same batch.
+        """
+        final = {}
+        cleared = []
+        for kind, payload in changes:
+            if kind == 'deleted':
+                final[payload] = None
+                cleared.append(payload)
+            else:
+                final[payload['path']] = payload
+                if payload['type'] == 'dir':
+                    cleared.append(payload['path'])
+        cleared_prefixes = tuple(path + os.sep for path in cleared)
+
+        # Drop the old versions of changed paths, remembering them for the totals below
+        removed, affected_categories = self.scan_results.remove_paths(final, subtrees=cleared)
+        old_items = {path: self.scan_results.row(index) for path, index in removed.items()}
+        suggested = self.categorized_data[CAT_SUGGESTED]
+        kept = [item for item in suggested['items'] if item['path'] not in final
+                and not (cleared_prefixes and item['path'].startswith(cleared_prefixes))]
+        if len(kept) != len(suggested['items']):
+            suggested['items'] = kept
+            affected_categories.add(CAT_SUGGESTED)
+
+        # Subtract what changed paths used to contribute. Paths inside a cleared
+        # directory are already covered by that directory's old totals.
+        changed_dirs = set()
+        for path in final:
+            if cleared_prefixes and path.startswith(cleared_prefixes):
+                continue
+            totals = self.dir_totals.get(path)
+            if totals is not None:
+                self._adjust_dir_totals(path, -totals.size, -totals.files, -(totals.entries + 1),
+                                        -totals.disk_size, changed_dirs)
+            elif path in old_items:
+                old = old_items[path]
+                if old['type'] == 'file':
+                    self._adjust_dir_totals(path, -old['size'], -1, -1, -old['disk_size'], changed_dirs)
+                else:
+                    self._adjust_dir_totals(path, 0, 0, -1, 0, changed_dirs)
+        if cleared:
+            cleared_set = set(cleared)
+            for path in [p for p in self.dir_totals if p in cleared_set or p.startswith(cleared_prefixes)]:
+                del self.dir_totals[path]
+                self.dir_sizes.pop(path, None)
+                changed_dirs.discard(path)
+
+        # Add the new versions in event order, so a new directory exists before its contents
+        new_items = []
+        for path, item in final.items():
+            if item is None:
+                continue
+            if item['type'] == 'dir':
+                self.dir_totals[path] = DirTotals(0, 0, 0, 0)
+                self.dir_sizes[path] = 0
+                changed_dirs.add(path)
+                self._adjust_dir_totals(path, 0, 0, 1, 0, changed_dirs)
+            else:
+                self._adjust_dir_totals(path, item['size'], 1, 1, item.get('disk_size', item['size']), changed_dirs)
+            affected_categories.add(item['category'])
+            new_items.append(item)
+        self.scan_results.extend(new_items)
+
+        for category in affected_categories:
+            data = self.categorized_data.get(category)
+            if data is not None:
+                data['size'] = self._category_size(category, data)
+        self._rebuild_summary_categories()
+        self.update_category_tree_ui()
+
+        if self.scan_index:
+            try:
+                self.scan_index.apply_changes(list(final), new_items,
+                                              {path: self.dir_totals[path] for path in changed_dirs})
+            except Exception as e:
+                logging.error(f"Could not update scan index with watched changes: {e}")
+
+        logging.debug(f"Watch mode applied {len(final)} changes ({len(new_items)} added or updated).")
+        selection_model = self.cleaner_tab.category_tree.selectionModel()
+        current_index = selection_model.currentIndex()
+        if current_index.isValid():
+            selected_category_name = self.cleaner_tab.category_model.itemFromIndex(current_index).text()
+            if selected_category_name in affected_categories or selected_category_name in (CAT_LARGEST_FILES, CAT_OLD_FILES):
+                self.refresh_current_view()
+
+    def scan_coverage(self, path):
+        """
+        Returns what the last complete scan knows about the tree below `path`
+        for the duplicate finder, or None while a scan is running. The
+        finder checks whether it actually covers `path`.
+        """
+        if self.scanner_thread and self.scanner_thread.isRunning():
+            return None
+        if self.dir_totals and self.last_scan_path:
+            root = os.path.normpath(self.last_scan_path)
+            path = os.path.normpath(path)
+            if path != root and not path.startswith(root.rstrip(os.sep) + os.sep):
+                return None
+            return ResultsCoverage(root, self.scan_exclusions, self.scan_results, self.dir_totals,
+                                   self.scan_results.subtree_rows(path))
+        if self.scan_index:
+            return IndexCoverage(SCAN_INDEX_PATH)
+        return None
+
+    def load_last_scan_from_index(self):
+        """
+        Restores the category tree from the on-disk scan index. Only per-category
+        counts and sizes are read here; items are loaded when a category is opened.
+        """
+        self.scan_index = open_scan_index(SCAN_INDEX_PATH)
+        if not self.scan_index:
+            return
+        try:
+            info = self.scan_index.scan_info()
+            if not info.get('start_path'):
+                logging.info("Scan index is empty - nothing to restore")
+                return
+
+            self.setup_category_data()
+            for category in self.categorized_data:
+                if category != CAT_SUGGESTED:
+                    self.categorized_data[category]['lazy'] = True
+            self._refresh_lazy_categories()
+            self.update_category_tree_ui()
+
+            self.cleaner_tab.path_input.setText(info['start_path'])
+            finished = float(info.get('finished') or info.get('started') or 0)
+            when = datetime.datetime.fromtimestamp(finished).strftime('%Y-%m-%d %H:%M') if finished else "unknown time"
+            partial = "" if info.get('complete') == '1' else " (incomplete)"
+            self.status_label.setText(f"Loaded last scan of '{info['start_path']}' from {when}{partial}.")
+            logging.info(f"Restored category summaries for '{info['start_path']}' from the scan index{partial}.")
+        except Exception as e:
+            logging.error(f"Could not load scan index: {e}")
+
+    def _category_count(self, data):
+        return data['count'] if data.get('lazy') else len(data['items'])
+
+    def _item_size(self, item):
+        """Returns an item's size in the selected basis. Items without an allocated size fall back to the apparent size."""
+        return item.get(self.size_column, item.get('size', 0))
+
+    def _category_size(self, category, data):
+        if category in SUMMARY_CATEGORIES:
+            return sum(self._item_size(item) for item in data['items'])
+        return self.scan_results.category_size(category, self.size_column)
+
+    def _ensure_category_loaded(self, category_name):
+        """Loads a category's items from the scan index the first time it is shown."""
+        data = self.categorized_data.get(category_name)
+        if not data or not data.get('lazy') or not self.scan_index:
+            return
+        try:
+            if category_name == CAT_LARGEST_FILES:
+                items = self.scan_index.largest_files(100, self.size_column)
+            elif category_name == CAT_OLD_FILES:
+                items = self.scan_index.files_older_than(time.time() - 365 * 24 * 60 * 60)
+            else:
+                items = self.scan_index.category_items(category_name)
+                self.dir_sizes.update(self.scan_index.dir_sizes_for_category(category_name, self.size_column))
+        except Exception as e:
+            logging.error(f"Could not load '{category_name}' from scan index: {e}")
+            return
+        if category_name in SUMMARY_CATEGORIES:
+            # Summary rows are copies of rows in other categories, so they get a store of their own
+            summary_results = ScanResults()
+            summary_results.extend(items)
+            data['items'] = summary_results.rows()
+        else:
+            self.scan_results.extend(items)
+            data['items'] = self.scan_results.category_rows(category_name)
+        data['size'] = sum(self._item_size(item) for item in items)
+        data.pop('lazy', None)
+        data.pop('count', None)
+        logging.debug(f"Loaded {len(items)} items for '{category_name}' from scan index")
+
+    def _refresh_lazy_categories(self):
+        """Re-reads counts and sizes of categories that have not been loaded yet."""
+        summary = self.scan_index.category_summary(self.size_column)
+        for category, data in self.categorized_data.items():
+            if not data.get('lazy'):
+                continue
+            if category == CAT_LARGEST_FILES:
+                count, size = self.scan_index.largest_files_summary(100, self.size_column)
+            elif category == CAT_OLD_FILES:
+                count, size = self.scan_index.old_files_summary(time.time() - 365 * 24 * 60 * 60, self.size_column)
+            else:
+                count, size = summary.get(category, (0, 0))
+            data.update({'size': size, 'count': count})
+
     def auto_select_largest_files(self):
         """Automatically select and display the 'Largest Files (Top 100)' category after scan"""
         logging.info("AUTO-SELECT: Selecting 'Largest Files (Top 100)' by default")
@@ -487,33 +976,23 @@ class FileDeleterApp(QWidget):
         """Re-calculates the summary categories like Largest and Old files from the primary data."""
         logging.debug("Rebuilding summary categories.")
         
-        # Get all files from non-summary categories
-        all_files = []
-        for cat_name, data in self.categorized_data.items():
-            # Exclude summary categories themselves from the source of files
-            if cat_name not in [CAT_LARGEST_FILES, CAT_OLD_FILES, CAT_SUGGESTED]:
-                for item in data['items']:
-                    if item['type'] == 'file':
-                        all_files.append(item)
-        
-        logging.debug(f"Found {len(all_files)} total files for summary category rebuild.")
+        # The result store only holds the primary categories, so its rows are the source of files
+        logging.debug(f"Found {len(self.scan_results)} items for summary category rebuild.")
         
         # --- Old Files ---
         now = time.time()
         one_year_ago = now - (365 * 24 * 60 * 60)
-        old_files = [item for item in all_files if item.get('mtime', now) < one_year_ago]
+        old_files = self.scan_results.files_older_than(one_year_ago)
         old_count_before = len(self.categorized_data[CAT_OLD_FILES]['items'])
         self.categorized_data[CAT_OLD_FILES]['items'] = old_files
-        self.categorized_data[CAT_OLD_FILES]['size'] = sum(item['size'] for item in old_files)
+        self.categorized_data[CAT_OLD_FILES]['size'] = sum(self._item_size(item) for item in old_files)
         logging.debug(f"Old files: {old_count_before} -> {len(old_files)}")
 
         # --- Largest Files ---
-        # Sort all files by size in descending order
-        all_files_sorted = sorted(all_files, key=lambda x: x.get('size', 0), reverse=True)
-        largest_files = all_files_sorted[:100]
+        largest_files = self.scan_results.largest_files(100, self.size_column)
         largest_count_before = len(self.categorized_data[CAT_LARGEST_FILES]['items'])
         self.categorized_data[CAT_LARGEST_FILES]['items'] = largest_files
-        self.categorized_data[CAT_LARGEST_FILES]['size'] = sum(item['size'] for item in largest_files)
+        self.categorized_data[CAT_LARGEST_FILES]['size'] = sum(self._item_size(item) for item in largest_files)
         logging.debug(f"Largest files: {largest_count_before} -> {len(largest_files)}")
         
         # Log the paths of largest files for debugging
@@ -521,15 +1000,32 @@ class FileDeleterApp(QWidget):
             largest_paths = [os.path.basename(item['path']) for item in largest_files[:5]]
             logging.debug(f"Top 5 largest files: {largest_paths}")
 
+    def on_suggestion_progress(self, value, text):
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(value)
+        self.status_label.setText(text)
+
+    def on_suggestions_found(self, suggested_files):
+        """Shows the suggestions of one prediction chunk while the rest are still being computed."""
+        suggested = self.categorized_data[CAT_SUGGESTED]
+        suggested['items'].extend(suggested_files)
+        suggested['size'] += sum(self._item_size(item) for item in suggested_files)
+        self.update_category_tree_ui()
+
     def on_suggestion_finished(self, suggested_files):
         logging.info(f"Generated {len(suggested_files)} suggestions.")
+        self.progress_bar.setVisible(False)
         self.categorized_data[CAT_SUGGESTED]['items'] = suggested_files
-        self.categorized_data[CAT_SUGGESTED]['size'] = sum(item['size'] for item in suggested_files)
+        self.categorized_data[CAT_SUGGESTED]['size'] = sum(self._item_size(item) for item in suggested_files)
         self.update_category_tree_ui()
         self.on_category_selected(self.cleaner_tab.category_tree.selectionModel().selection(), None)
         self.status_label.setText("Suggestions ready.")
         self.cleaner_tab.set_scan_mode(is_scanning=False)
-        save_suggester(self.suggester)
+
+    def on_suggestion_failed(self):
+        self.progress_bar.setVisible(False)
+        self.status_label.setText("Could not compute suggestions - see the log for details.")
+        self.cleaner_tab.set_scan_mode(is_scanning=False)
 
     def on_category_selected(self, selected, deselected):
         indexes = selected.indexes()
@@ -542,6 +1038,7 @@ class FileDeleterApp(QWidget):
         logging.debug(f"Category selected: {category_name}")
         
         is_protected = category_name in [CAT_SYSTEM, CAT_APP, CAT_DEV_PROJECT]
+        self._ensure_category_loaded(category_name)
         items_data = self.categorized_data.get(category_name, {}).get('items', [])
         
         # Debug logging for summary categories
@@ -550,7 +1047,7 @@ class FileDeleterApp(QWidget):
             if category_name == CAT_LARGEST_FILES and items_data:
                 top_file = items_data[0] if items_data else None
                 if top_file:
-                    logging.debug(f"Largest file: {os.path.basename(top_file['path'])} ({self.format_size(top_file['size'])})")
+                    logging.debug(f"Largest file: {os.path.basename(top_file['path'])} ({self.format_size(self._item_size(top_file))})")
         
         headers, rows = [], []
         
@@ -558,18 +1055,18 @@ class FileDeleterApp(QWidget):
             headers = ['Name', 'Size', 'Path', 'Original Category']
             for item in items_data:
                 rows.append({
-                    'name': os.path.basename(item['path']), 'size': item['size'], 'path': item['path'], 
+                    'name': os.path.basename(item['path']), 'size': self._item_size(item), 'path': item['path'],
                     'original_category': item['category'], '_item_data': item})
         elif category_name == CAT_SUGGESTED:
             headers = ['Name', 'Confidence', 'Size', 'Path']
             for item in items_data:
                  rows.append({
                     'name': os.path.basename(item['path']), 'confidence': item.get('suggestion_confidence', 0),
-                    'size': item['size'], 'path': item['path'], '_item_data': item})
+                    'size': self._item_size(item), 'path': item['path'], '_item_data': item})
         else:
             headers = ['Name', 'Size', 'Path']
             for item in items_data:
-                 size = self.dir_sizes.get(item['path'], 0) if item['type'] == 'dir' else item['size']
+                 size = self.dir_sizes.get(item['path'], 0) if item['type'] == 'dir' else self._item_size(item)
                  rows.append({'name': os.path.basename(item['path']), 'size': size, 'path': item['path'], '_item_data': item})
 
         self.cleaner_tab.update_file_list(headers, rows, is_protected)
@@ -647,21 +1144,26 @@ class FileDeleterApp(QWidget):
             self.deletion_quarantine_refreshes_remaining = 2  # Allow highlighting to survive through 2 quarantine refreshes
             logging.info(f"Visual tracking: {len(self.recently_deleted_files)} files marked as recently deleted, allowing 2 refresh survivals")
             
-            # Train the suggester model with successful deletions
-            suggested_items_deleted = [item['data'] for item in succeeded_items if item.get('data') and 'confidence' in item.get('data')]
-            if suggested_items_deleted:
-                self.suggester.train(suggested_items_deleted, 'deleted')
+            # Record the deletions for the suggester; the model learns from them after the next scan
+            if self.training_store.add(succeeded_items, LABEL_DELETE):
+                self.training_store.save()
             
             # Remove deleted items from the data model using normalized paths for comparison
             succeeded_paths = {os.path.normpath(item['path']) for item in succeeded_items}
-            for category in self.categorized_data:
-                # The paths in categorized_data should already be normalized by the scanner
-                self.categorized_data[category]['items'] = [
-                    item for item in self.categorized_data[category]['items']
-                    if item['path'] not in succeeded_paths
-                ]
-                # Recalculate category size
-                self.categorized_data[category]['size'] = sum(item.get('size', 0) for item in self.categorized_data[category]['items'])
+            # The paths in the result store should already be normalized by the scanner
+            self.scan_results.remove_paths(succeeded_paths)
+            for category, data in self.categorized_data.items():
+                if category in SUMMARY_CATEGORIES:
+                    data['items'] = [item for item in data['items'] if item['path'] not in succeeded_paths]
+                if not data.get('lazy'):
+                    data['size'] = self._category_size(category, data)
+
+            if self.scan_index:
+                try:
+                    self.scan_index.remove_paths(succeeded_paths)
+                    self._refresh_lazy_categories()
+                except Exception as e:
+                    logging.error(f"Could not update scan index after deletion: {e}")
 
         # Refresh the UI
         self.update_category_tree_ui()
@@ -676,7 +1178,8 @@ class FileDeleterApp(QWidget):
                     break
         
         self.refresh_current_view()
-        self.quarantine_tab.populate_quarantined_files()
+        if self.quarantine_tab is not None:
+            self.quarantine_tab.populate_quarantined_files()
         
         # Notify empty folder tab if callback is registered
         if hasattr(self, 'empty_folder_deletion_callback'):
@@ -701,8 +1204,13 @@ class FileDeleterApp(QWidget):
         self.restoration_scans_remaining = 1  # Allow highlighting to survive through 1 scan+refresh cycle
         logging.info(f"Visual tracking: {len(self.recently_restored_files)} files marked as recently restored, allowing 1 scan survival")
 
+        # A restore means the file should have been kept; the suggester learns from it after the next scan
+        if self.training_store.add(restored_files, LABEL_KEEP):
+            self.training_store.save()
+
         # Update quarantine tab first
-        self.quarantine_tab.populate_quarantined_files()
+        if self.quarantine_tab is not None:
+            self.quarantine_tab.populate_quarantined_files()
         
         # Separate empty folders, duplicates, and regular files
         empty_folders = []
@@ -883,6 +1391,13 @@ class FileDeleterApp(QWidget):
             self.status_label.setText(f"Restoration complete. {len(regular_files)} files restored.")
             return
 
+        # Watch mode picks the restored files up by itself; just refresh once it has flushed them
+        if all(self.is_watching(file_data.get('path', '')) for file_data in regular_files):
+            logging.info("RESTORATION: Watch mode is active - skipping rescan")
+            QTimer.singleShot(int(FLUSH_INTERVAL * 2000), lambda: self.complete_restoration_refresh(selected_category_name))
+            self.status_label.setText(f"Restoration complete. {len(regular_files)} files restored.")
+            return
+
         logging.info(f"RESTORATION: Auto-triggering Smart Cleaner scan + refresh sequence")
         
         # Step 1: Trigger scan (same as clicking Scan button)
@@ -924,12 +1439,12 @@ class FileDeleterApp(QWidget):
 
     def on_tab_changed(self, index):
         current_widget = self.tabs.widget(index)
-        if current_widget == self.quarantine_tab:
+        if current_widget == self.quarantine_page:
             logging.info("Switched to Quarantine tab, refreshing list.")
-            self.quarantine_tab.populate_quarantined_files()
-        elif current_widget == self.deletion_history_tab:
+            self.quarantine_page.ensure_built().populate_quarantined_files()
+        elif current_widget == self.deletion_history_page:
             logging.info("Switched to Deletion History tab, refreshing view.")
-            self.deletion_history_tab.populate_history()
+            self.deletion_history_page.ensure_built().populate_history()
         elif current_widget == self.cleaner_tab:
             # If there were recent restorations, refresh the view
             if self.recent_restorations:
@@ -969,6 +1484,13 @@ class FileDeleterApp(QWidget):
         # Other settings
         self.settings.setValue("theme", self.settings_tab.get_current_theme())
         self.settings.setValue("recycle_bin", self.settings_tab.get_recycle_bin_enabled())
+        self.settings.setValue("scan_workers", self.settings_tab.get_scan_workers())
+        self.settings.setValue("hash_workers", self.settings_tab.get_hash_workers())
+        self.settings.setValue("incremental_scans", self.settings_tab.get_incremental_scans())
+        self.settings.setValue("one_filesystem", self.settings_tab.get_one_filesystem())
+        self.settings.setValue("size_column", self.size_column)
+        self.settings.setValue("watch_changes", self.settings_tab.get_watch_changes())
+        self.settings.setValue("max_watches", self.settings_tab.get_max_watches())
         self.settings.setValue("exclusions", self.exclusions)
         self.settings.setValue("schedule_settings", self.scheduler_tab.get_schedule_settings())
         self.settings.sync()
@@ -984,6 +1506,34 @@ class FileDeleterApp(QWidget):
         recycle_enabled = self.settings.value("recycle_bin", "true") == "true"
         self.settings_tab.set_recycle_bin(recycle_enabled)
         self.set_recycle_bin(recycle_enabled)
+
+        scan_workers = int(self.settings.value("scan_workers", 1))
+        self.settings_tab.set_scan_workers(scan_workers)
+        self.set_scan_workers(scan_workers)
+
+        hash_workers = int(self.settings.value("hash_workers", DEFAULT_HASH_WORKERS))
+        self.settings_tab.set_hash_workers(hash_workers)
+        self.set_hash_workers(hash_workers)
+
+        incremental_scans = self.settings.value("incremental_scans", "true") == "true"
+        self.settings_tab.set_incremental_scans(incremental_scans)
+        self.set_incremental_scans(incremental_scans)
+
+        one_filesystem = self.settings.value("one_filesystem", "false") == "true"
+        self.settings_tab.set_one_filesystem(one_filesystem)
+        self.set_one_filesystem(one_filesystem)
+
+        size_column = self.settings.value("size_column", "size")
+        self.cleaner_tab.set_size_column(size_column)
+        self.set_size_column(size_column)
+
+        watch_changes = self.settings.value("watch_changes", "false") == "true"
+        self.settings_tab.set_watch_changes(watch_changes)
+        self.set_watch_changes(watch_changes)
+
+        max_watches = int(self.settings.value("max_watches", DEFAULT_MAX_WATCHES))
+        self.settings_tab.set_max_watches(max_watches)
+        self.set_max_watches(max_watches)
         
         self.exclusions = self.settings.value("exclusions", [])
         self.exclusions_tab.set_exclusions(self.exclusions)
@@ -1013,7 +1563,139 @@ class FileDeleterApp(QWidget):
         logging.info(f"Recycle bin feature set to {'enabled' if enabled else 'disabled'}.")
         self.recycle_bin_checkbox.setChecked(enabled)
 
+    def set_scan_workers(self, workers):
+        logging.info(f"Scan worker threads set to {workers}.")
+        self.scan_workers = workers
+
+    def set_hash_workers(self, workers):
+        logging.info(f"Duplicate hash threads set to {workers}.")
+        self.hash_workers = workers
+
+    def set_incremental_scans(self, enabled):
+        logging.info(f"Incremental rescans {'enabled' if enabled else 'disabled'}.")
+        self.incremental_scans = enabled
+
+    def set_one_filesystem(self, enabled):
+        logging.info(f"Scans {'stay on one filesystem' if enabled else 'cross into other mounted filesystems'}.")
+        self.one_filesystem = enabled
+
+    def set_watch_changes(self, enabled):
+        logging.info(f"Watch mode {'enabled' if enabled else 'disabled'}.")
+        self.watch_changes = enabled
+        if not enabled:
+            self.stop_watching()
+            self.watch_fallback_timer.stop()
+        elif not (self.scanner_thread and self.scanner_thread.isRunning()):
+            self.start_watching(self.last_scan_path)
+
+    def set_max_watches(self, max_watches):
+        logging.info(f"Watch limit set to {max_watches} folders.")
+        self.max_watches = max_watches
+        self.watch_fallback_timer.stop()
+
+    def set_size_column(self, column):
+        """Switches category sizes, folder sizes and the Largest Files ranking between apparent size and disk usage."""
+        if column == self.size_column:
+            return
+        logging.info(f"Sizes are now measured by {'allocated disk space' if column == 'disk_size' else 'apparent size'}.")
+        self.size_column = column
+        # Batches still waiting for the UI timer are already in the store, so recounting covers them
+        self.pending_updates.clear()
+        if self.dir_totals:
+            self.dir_sizes = {path: getattr(totals, column) for path, totals in self.dir_totals.items()}
+            self._rebuild_summary_categories()
+        elif self.scan_index:
+            # Restored from the scan index: re-read folder sizes and the ranking in the new basis
+            for category, data in self.categorized_data.items():
+                if category not in SUMMARY_CATEGORIES and not data.get('lazy'):
+                    self.dir_sizes.update(self.scan_index.dir_sizes_for_category(category, column))
+            largest = self.categorized_data.get(CAT_LARGEST_FILES)
+            if largest is not None and not largest.get('lazy') and largest['items']:
+                largest['lazy'] = True
+                self._ensure_category_loaded(CAT_LARGEST_FILES)
+
+        for category, data in self.categorized_data.items():
+            if not data.get('lazy'):
+                data['size'] = self._category_size(category, data)
+        if self.scan_index:
+            try:
+                self._refresh_lazy_categories()
+            except Exception as e:
+                logging.error(f"Could not re-read category sizes from the scan index: {e}")
+        self.update_category_tree_ui()
+        self.refresh_current_view()
+
+    def check_category_rules(self):
+        """Polled by rules_timer: re-categorizes the results when the rules file has changed."""
+        if self.category_rules.reload_if_changed():
+            self.apply_category_rules()
+        self.update_rules_status()
+
+    def update_rules_status(self):
+        if self.category_rules.error:
+            text = f"Error in rules file, previous rules kept: {self.category_rules.error}"
+        elif self.category_rules.rules:
+            text = f"{len(self.category_rules.rules)} rule(s) active"
+        else:
+            text = "No rules - built-in categories only"
+        self.settings_tab.set_rules_status(text)
+
+    def open_category_rules(self):
+        try:
+            self.category_rules.ensure_exists()
+        except OSError as e:
+            QMessageBox.warning(self, "Categorization Rules", f"Could not create the rules file: {e}")
+            return
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.category_rules.path))
+
+    def apply_category_rules(self):
+        """Re-categorizes the current scan results with the current rules, in memory and in the scan index, without rescanning."""
+        if self.scanner_thread and self.scanner_thread.isRunning():
+            # The running scan started with the old rules; its results are re-categorized when it finishes
+            self.rules_reload_pending = True
+            return
+        self.rules_reload_pending = False
+        rules = self.category_rules.rules
+        if self.is_watching():
+            self.watcher.set_rules(rules)
+        self._add_rule_categories()
+
+        started = time.time()
+        if self.scan_index:
+            try:
+                changed = self.scan_index.recategorize(Categorizer(rules))
+                logging.debug(f"{changed} items in the scan index changed category.")
+            except Exception as e:
+                logging.error(f"Could not re-categorize the scan index: {e}")
+        if self.dir_totals:
+            # The store holds the whole scan; summary categories are views into it and follow along
+            self.scan_results.recategorize(Categorizer(rules))
+        elif self.scan_index:
+            # Restored from the index: drop the loaded categories so they are re-read when opened
+            self.scan_results = ScanResults()
+            for category, data in self.categorized_data.items():
+                if category != CAT_SUGGESTED:
+                    self.categorized_data[category] = {'items': self.scan_results.category_rows(category),
+                                                       'size': 0, 'lazy': True}
+
+        for category, data in self.categorized_data.items():
+            if not data.get('lazy'):
+                data['size'] = self._category_size(category, data)
+        if self.scan_index:
+            try:
+                self._refresh_lazy_categories()
+            except Exception as e:
+                logging.error(f"Could not re-read category sizes from the scan index: {e}")
+        logging.info(f"Re-categorized scan results with {len(rules)} rule(s) in {time.time() - started:.2f}s.")
+        self.status_label.setText("Categorization rules applied.")
+        self.update_category_tree_ui()
+        self.refresh_current_view()
+
     def update_exclusions(self, exclusions_list): self.exclusions = exclusions_list
+
+    def create_throttle(self, scheduled=False):
+        """Returns a Throttle for a background worker per the Scheduler tab settings, or None."""
+        return create_throttle(self.schedule_settings, scheduled)
     
     def update_schedule_settings(self, settings):
         self.schedule_settings = settings
@@ -1033,7 +1715,7 @@ class FileDeleterApp(QWidget):
         if path and os.path.exists(path):
             self.last_run_date = QDateTime.currentDateTime()
             self.scheduler_tab.update_last_run(self.last_run_date)
-            self.start_scan(path)
+            self.start_scan(path, scheduled=True)
         else:
             logging.error(f"Scheduled scan path '{path}' is invalid or does not exist.")
 
@@ -1057,16 +1739,24 @@ class FileDeleterApp(QWidget):
             logging.info(f"Added '{folder_path}' to exclusions.")
 
     def setup_category_data(self):
+        # Primary categories are live views into one columnar store; summary categories hold row lists
+        self.scan_results = ScanResults()
         self.categorized_data = {
             CAT_LARGEST_FILES: {'items': [], 'size': 0}, CAT_OLD_FILES: {'items': [], 'size': 0},
-            CAT_SUGGESTED: {'items': [], 'size': 0}, CAT_SYSTEM: {'items': [], 'size': 0},
-            CAT_APP: {'items': [], 'size': 0}, CAT_DEV_PROJECT: {'items': [], 'size': 0},
-            CAT_USER_DOWNLOADS: {'items': [], 'size': 0}, CAT_USER_DOCUMENTS: {'items': [], 'size': 0},
-            CAT_SAFE_DELETE: {'items': [], 'size': 0}, CAT_USER: {'items': [], 'size': 0},
-            CAT_UNKNOWN: {'items': [], 'size': 0},
+            CAT_SUGGESTED: {'items': [], 'size': 0},
         }
+        for category in (CAT_SYSTEM, CAT_APP, CAT_DEV_PROJECT, CAT_USER_DOWNLOADS, CAT_USER_DOCUMENTS,
+                         CAT_SAFE_DELETE, CAT_USER, CAT_UNKNOWN):
+            self.categorized_data[category] = {'items': self.scan_results.category_rows(category), 'size': 0}
+        self._add_rule_categories()
         self.update_category_tree_ui()
 
+    def _add_rule_categories(self):
+        """Adds the categories that only user rules assign; they are kept once shown, even if empty."""
+        for category in self.category_rules.rules.categories():
+            if category not in self.categorized_data:
+                self.categorized_data[category] = {'items': self.scan_results.category_rows(category), 'size': 0}
+
     def closeEvent(self, event):
         self.save_settings()
         logging.info("Application closing...")
@@ -1089,11 +1779,18 @@ class FileDeleterApp(QWidget):
                 self.dupe_tab.dupe_worker.stop()
             if hasattr(self, 'empty_tab'): 
                 self.empty_tab.stop_worker()
+            if self.suggester_worker:
+                self.suggester_worker.stop()
             if self.suggester_thread and self.suggester_thread.isRunning(): 
                 self.suggester_thread.terminate()
+            if self.watcher:
+                self.watcher.stop()
         except Exception as e:
             logging.warning(f"Error during thread cleanup: {e}")
         
+        if self.scan_index:
+            self.scan_index.close()
+
         # Stop state saving timer quickly
         try:
             if hasattr(self, 'state_timer'):
@@ -1107,14 +1804,30 @@ class FileDeleterApp(QWidget):
         logging.debug("Scanner thread finished, cleaning up references.")
         self.scanner = None
         self.scanner_thread = None
+        if self.rules_reload_pending:
+            self.apply_category_rules()
 
     def on_suggester_thread_finished(self):
         logging.debug("Suggester thread finished, cleaning up references.")
+        self.suggester_thread.wait()
         self.suggester_worker = None
         self.suggester_thread = None
+        # Saved even if the suggestions were cancelled, as the model may already have been updated
+        from core.persistence import save_suggester
+        save_suggester(self.suggester, SUGGESTER_DIR)
+        self.training_store.save()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     ex = FileDeleterApp()
     ex.show()
+    if '--startup-report' in sys.argv:
+        # Print the startup timing once the deferred loading is done, then quit
+        def print_startup_report():
+            if not ex.startup_finished:
+                QTimer.singleShot(50, print_startup_report)
+                return
+            print(ex.startup_report)
+            app.quit()
+        QTimer.singleShot(0, print_startup_report)
     sys.exit(app.exec())
@@ -19,6 +19,7 @@ class CleanerTab(QWidget):
     add_to_exclusions_requested = pyqtSignal(str)
     explain_suggestion_requested = pyqtSignal(dict)
     refresh_requested = pyqtSignal()
+    size_column_changed = pyqtSignal(str)
 
     def __init__(self, main_window=None):
         super().__init__(main_window)
@@ -49,11 +50,20 @@ class CleanerTab(QWidget):
         self.select_all_button = QPushButton("Select All")
         self.deselect_all_button = QPushButton("Deselect All")
 
+        size_label = QLabel("Sizes:")
+        self.size_combo = QComboBox()
+        self.size_combo.addItem("Apparent Size", userData='size')
+        self.size_combo.addItem("Disk Usage", userData='disk_size')
+        self.size_combo.setToolTip("Disk Usage counts the blocks a file actually occupies, which is what deleting it frees. "
+                                   "Sparse and compressed files use less than their apparent size, small files more.")
+
         top_bar_layout.addWidget(path_label)
         top_bar_layout.addWidget(self.path_input, 1)
         top_bar_layout.addWidget(browse_button)
         top_bar_layout.addWidget(library_label)
         top_bar_layout.addWidget(self.library_combo)
+        top_bar_layout.addWidget(size_label)
+        top_bar_layout.addWidget(self.size_combo)
         top_bar_layout.addWidget(self.scan_button)
         top_bar_layout.addWidget(self.cancel_button)
         top_bar_layout.addWidget(self.refresh_button)
@@ -92,6 +102,7 @@ class CleanerTab(QWidget):
         self.scan_button.clicked.connect(lambda: self.scan_requested.emit(self.path_input.text()))
         self.cancel_button.clicked.connect(self.cancel_requested.emit)
         self.refresh_button.clicked.connect(self.refresh_requested.emit)
+        self.size_combo.currentIndexChanged.connect(lambda index: self.size_column_changed.emit(self.size_combo.itemData(index)))
         self.delete_button.clicked.connect(self._emit_delete_request)
         self.select_all_button.clicked.connect(lambda: self._set_check_state_recursive(self.file_list_model.invisibleRootItem(), Qt.CheckState.Checked))
         self.deselect_all_button.clicked.connect(lambda: self._set_check_state_recursive(self.file_list_model.invisibleRootItem(), Qt.CheckState.Unchecked))
@@ -222,6 +233,16 @@ class CleanerTab(QWidget):
     def get_scan_path(self):
         return self.path_input.text()
 
+    def set_size_column(self, column):
+        index = self.size_combo.findData(column)
+        if index != -1:
+            self.size_combo.blockSignals(True)
+            self.size_combo.setCurrentIndex(index)
+            self.size_combo.blockSignals(False)
+
+    def get_size_column(self):
+        return self.size_combo.currentData()
+
     def set_scan_mode(self, is_scanning):
         self.scan_button.setEnabled(not is_scanning)
         self.cancel_button.setEnabled(is_scanning)
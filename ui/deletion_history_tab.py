@@ -29,8 +29,6 @@ class DeletionHistoryTab(QWidget):
         self.history_view.setOpenExternalLinks(True)
         self.history_view.setLineWrapMode(QTextBrowser.LineWrapMode.NoWrap)
         layout.addWidget(self.history_view)
-        
-        self.populate_history()
 
     def populate_history(self):
         self.history_view.clear()
@@ -1,7 +1,7 @@
 import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QTreeView, QSplitter, QHBoxLayout, QMessageBox, QLabel,
-    QLineEdit, QFileDialog
+    QLineEdit, QFileDialog, QCheckBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QColor
@@ -9,6 +9,7 @@ import os
 import logging
 
 from core.duplicate_finder import DuplicateFinderWorker
+from core.hash_cache import HashCache
 from ui.preview_panel import PreviewPanel
 
 class DuplicateFinderTab(QWidget):
@@ -46,10 +47,19 @@ class DuplicateFinderTab(QWidget):
         top_bar.addWidget(self.delete_button)
         top_bar.addWidget(self.keep_newest_button)
         top_bar.addStretch(1)
+        self.reuse_scan_checkbox = QCheckBox("Reuse Smart Cleaner scan results")
+        self.reuse_scan_checkbox.setToolTip("Take file sizes from the last Smart Cleaner scan when it covers this folder, "
+                                            "instead of walking it again. Files changed since then are not seen.")
+        self.reuse_scan_checkbox.setChecked(True)
+        top_bar.addWidget(self.reuse_scan_checkbox)
         layout.addLayout(top_bar)
         
+        status_bar = QHBoxLayout()
         self.status_label = QLabel("Ready to find duplicates. Select a path and click Scan.")
-        layout.addWidget(self.status_label)
+        self.rate_label = QLabel("")
+        status_bar.addWidget(self.status_label, 1)
+        status_bar.addWidget(self.rate_label)
+        layout.addLayout(status_bar)
 
         # Main content area
         splitter = QSplitter(Qt.Orientation.Vertical)
@@ -98,16 +108,24 @@ class DuplicateFinderTab(QWidget):
         self.set_ui_enabled(False)
         self.status_label.setText(f"Scanning for duplicates in {start_path}...")
         self.model.clear()
+        self.rate_label.setText("")
         
         try:
+            # Files restored from quarantine are not in the scan results yet, so a restoration scan walks
+            coverage = None
+            if self.reuse_scan_checkbox.isChecked() and not getattr(self, '_restoration_scan_active', False):
+                coverage = self.main_window.scan_coverage(start_path)
             self.worker_thread = QThread()
-            self.worker = DuplicateFinderWorker(start_path, self.main_window.exclusions)
+            self.worker = DuplicateFinderWorker(start_path, self.main_window.exclusions,
+                                                throttle=self.main_window.create_throttle(), coverage=coverage,
+                                                hash_cache=HashCache(), hash_workers=self.main_window.hash_workers)
             self.worker.moveToThread(self.worker_thread)
 
             # Connect signals with error handling
             self.worker_thread.started.connect(self.worker.run)
             self.worker.scan_finished.connect(self.on_scan_finished)
             self.worker.progress_update.connect(self.update_status)
+            self.worker.hash_rate.connect(self.update_rate)
             self.worker.duplicates_found.connect(self.populate_tree)
 
             # Cleanup connections
@@ -141,6 +159,9 @@ class DuplicateFinderTab(QWidget):
     def update_status(self, message):
         self.status_label.setText(message)
 
+    def update_rate(self, bytes_per_sec):
+        self.rate_label.setText(f"Reading {self.main_window.format_size(int(bytes_per_sec))}/s")
+
     def on_scan_finished(self):
         self.set_ui_enabled(True)
         
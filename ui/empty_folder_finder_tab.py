@@ -70,7 +70,8 @@ class EmptyFolderFinderTab(QWidget):
         self.main_window.update_status(f"Scanning for empty folders in {scan_path}...")
 
         self.empty_folder_thread = QThread()
-        self.empty_folder_worker = EmptyFolderFinderWorker(scan_path, self.main_window.exclusions)
+        self.empty_folder_worker = EmptyFolderFinderWorker(scan_path, self.main_window.exclusions,
+                                                            throttle=self.main_window.create_throttle())
         self.empty_folder_worker.moveToThread(self.empty_folder_thread)
 
         # Connect to collect folders as they're found
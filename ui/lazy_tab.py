@@ -0,0 +1,30 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+
+class LazyTab(QWidget):
+    """
+    Tab page that builds its real content the first time it is shown.
+
+    `factory` is called with no arguments and returns the widget to show;
+    until then the page is empty, so a tab nobody opens costs nothing at
+    startup. ensure_built() builds it early when its content is needed
+    before the tab is shown.
+    """
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.widget = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_built(self):
+        """Builds the content if it has not been built yet and returns it."""
+        if self.widget is None:
+            self.widget = self.factory()
+            self._layout.addWidget(self.widget)
+        return self.widget
+
+    def showEvent(self, event):
+        self.ensure_built()
+        super().showEvent(event)
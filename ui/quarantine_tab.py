@@ -20,8 +20,8 @@ class QuarantineTab(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
+        # The list is read when the tab is shown (see FileDeleterApp.on_tab_changed), not at construction
         self.init_ui()
-        self.populate_quarantined_files()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -212,6 +212,11 @@ class QuarantineTab(QWidget):
                     restored_file_data['confidence'] = file_info['confidence']
                 if 'reason' in file_info:
                     restored_file_data['reason'] = file_info['reason']
+                # Scan metadata for the suggester, which learns that this file should have been kept
+                restored_file_data['original_path'] = file_info['original_path']
+                for key in ('scan_category', 'size', 'mtime', 'type'):
+                    if key in file_info:
+                        restored_file_data[key] = file_info[key]
                     
                 restored_files_data.append(restored_file_data)
 
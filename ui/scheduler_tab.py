@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QComboBox, 
-                                 QDateTimeEdit, QLineEdit, QPushButton, QFileDialog)
+                                 QDateTimeEdit, QLineEdit, QPushButton, QFileDialog, QLabel, QSpinBox)
 from PyQt6.QtCore import QDateTime, pyqtSignal
+from core.throttle import THROTTLE_MODES, THROTTLE_OFF
 
 class SchedulerTab(QWidget):
     schedule_settings_changed = pyqtSignal(dict)
@@ -34,6 +35,35 @@ class SchedulerTab(QWidget):
         auto_delete_layout.addWidget(self.auto_delete_checkbox)
         auto_delete_layout.addStretch()
         layout.addLayout(auto_delete_layout)
+
+        # Throttling of background scans
+        throttle_layout = QHBoxLayout()
+        throttle_label = QLabel("Throttle:")
+        self.throttle_mode_combo = QComboBox()
+        self.throttle_mode_combo.addItems(THROTTLE_MODES)
+        self.throttle_mode_combo.setToolTip("Run scans at idle CPU/IO priority and slow them down while the "
+                                            "system load or disk busy time is high.")
+        self.max_files_spin = QSpinBox()
+        self.max_files_spin.setRange(0, 1000000)
+        self.max_files_spin.setSingleStep(500)
+        self.max_files_spin.setSpecialValueText("No limit")
+        self.max_files_spin.setSuffix(" files/sec")
+        self.max_mb_spin = QSpinBox()
+        self.max_mb_spin.setRange(0, 100000)
+        self.max_mb_spin.setSingleStep(10)
+        self.max_mb_spin.setSpecialValueText("No limit")
+        self.max_mb_spin.setSuffix(" MB/sec")
+        self.max_mb_spin.setToolTip("Caps the read rate of content hashing in the duplicate finder.")
+
+        throttle_layout.addWidget(throttle_label)
+        throttle_layout.addWidget(self.throttle_mode_combo)
+        throttle_layout.addWidget(self.max_files_spin)
+        throttle_layout.addWidget(self.max_mb_spin)
+        throttle_layout.addStretch()
+        layout.addLayout(throttle_layout)
+
+        self.last_run_label = QLabel("Last run: never")
+        layout.addWidget(self.last_run_label)
         
         layout.addStretch()
 
@@ -43,6 +73,9 @@ class SchedulerTab(QWidget):
         self.schedule_time_edit.dateTimeChanged.connect(self._emit_changes)
         self.schedule_path_input.textChanged.connect(self._emit_changes)
         self.auto_delete_checkbox.stateChanged.connect(self._emit_changes)
+        self.throttle_mode_combo.currentIndexChanged.connect(self._emit_changes)
+        self.max_files_spin.valueChanged.connect(self._emit_changes)
+        self.max_mb_spin.valueChanged.connect(self._emit_changes)
 
     def _browse_for_path(self):
         directory = QFileDialog.getExistingDirectory(self, "Select Path for Scheduled Scan")
@@ -59,7 +92,10 @@ class SchedulerTab(QWidget):
             'frequency': self.schedule_freq_combo.currentText(),
             'time': self.schedule_time_edit.dateTime(),
             'path': self.schedule_path_input.text(),
-            'auto_delete': self.auto_delete_checkbox.isChecked()
+            'auto_delete': self.auto_delete_checkbox.isChecked(),
+            'throttle_mode': self.throttle_mode_combo.currentText(),
+            'max_files_per_sec': self.max_files_spin.value(),
+            'max_mb_per_sec': self.max_mb_spin.value()
         }
 
     def set_schedule_settings(self, settings):
@@ -69,12 +105,18 @@ class SchedulerTab(QWidget):
         self.schedule_time_edit.blockSignals(True)
         self.schedule_path_input.blockSignals(True)
         self.auto_delete_checkbox.blockSignals(True)
+        self.throttle_mode_combo.blockSignals(True)
+        self.max_files_spin.blockSignals(True)
+        self.max_mb_spin.blockSignals(True)
 
         self.schedule_enabled_checkbox.setChecked(settings.get('enabled', False))
         self.schedule_freq_combo.setCurrentText(settings.get('frequency', 'Daily'))
         self.schedule_time_edit.setDateTime(settings.get('time', QDateTime.currentDateTime()))
         self.schedule_path_input.setText(settings.get('path', ''))
         self.auto_delete_checkbox.setChecked(settings.get('auto_delete', False))
+        self.throttle_mode_combo.setCurrentText(settings.get('throttle_mode', THROTTLE_OFF))
+        self.max_files_spin.setValue(int(settings.get('max_files_per_sec', 0) or 0))
+        self.max_mb_spin.setValue(int(settings.get('max_mb_per_sec', 0) or 0))
 
         # Unblock signals
         self.schedule_enabled_checkbox.blockSignals(False)
@@ -82,6 +124,9 @@ class SchedulerTab(QWidget):
         self.schedule_time_edit.blockSignals(False)
         self.schedule_path_input.blockSignals(False)
         self.auto_delete_checkbox.blockSignals(False)
+        self.throttle_mode_combo.blockSignals(False)
+        self.max_files_spin.blockSignals(False)
+        self.max_mb_spin.blockSignals(False)
 
-    def update_last_run(self, a, b):
-        pass
+    def update_last_run(self, last_run):
+        self.last_run_label.setText(f"Last run: {last_run.toString('yyyy-MM-dd hh:mm')}")
@@ -1,9 +1,20 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCheckBox
+import os
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCheckBox, QSpinBox, QPushButton
 from PyQt6.QtCore import Qt, pyqtSignal
+from core.inotify import is_supported, max_user_watches
+from core.watcher import DEFAULT_MAX_WATCHES
+from core.duplicate_finder import DEFAULT_HASH_WORKERS
 
 class SettingsTab(QWidget):
     theme_changed = pyqtSignal(str)
     recycle_bin_changed = pyqtSignal(bool)
+    scan_workers_changed = pyqtSignal(int)
+    hash_workers_changed = pyqtSignal(int)
+    incremental_scans_changed = pyqtSignal(bool)
+    one_filesystem_changed = pyqtSignal(bool)
+    watch_changes_changed = pyqtSignal(bool)
+    max_watches_changed = pyqtSignal(int)
+    edit_rules_requested = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -32,6 +43,102 @@ class SettingsTab(QWidget):
         recycle_layout.addWidget(self.recycle_bin_checkbox)
         recycle_layout.addStretch()
         layout.addLayout(recycle_layout)
+
+        # Scan Worker Threads
+        workers_layout = QHBoxLayout()
+        workers_label = QLabel("Scan Worker Threads:")
+        self.scan_workers_spin = QSpinBox()
+        self.scan_workers_spin.setRange(1, max(32, (os.cpu_count() or 1) * 4))
+        self.scan_workers_spin.setValue(1)
+        self.scan_workers_spin.setToolTip("Number of threads used to list directories. More threads help on SSD arrays and network drives.")
+        self.scan_workers_spin.valueChanged.connect(self.scan_workers_changed.emit)
+
+        workers_layout.addWidget(workers_label)
+        workers_layout.addWidget(self.scan_workers_spin)
+        workers_layout.addStretch()
+        layout.addLayout(workers_layout)
+
+        # Duplicate Hash Threads
+        hash_workers_layout = QHBoxLayout()
+        hash_workers_label = QLabel("Duplicate Hash Threads:")
+        self.hash_workers_spin = QSpinBox()
+        self.hash_workers_spin.setRange(1, max(32, (os.cpu_count() or 1) * 4))
+        self.hash_workers_spin.setValue(DEFAULT_HASH_WORKERS)
+        self.hash_workers_spin.setToolTip("Number of threads reading and hashing files on each SSD or RAID array in the "
+                                          "duplicate finder. Spinning disks are always read by one thread, in on-disk order.")
+        self.hash_workers_spin.valueChanged.connect(self.hash_workers_changed.emit)
+
+        hash_workers_layout.addWidget(hash_workers_label)
+        hash_workers_layout.addWidget(self.hash_workers_spin)
+        hash_workers_layout.addStretch()
+        layout.addLayout(hash_workers_layout)
+
+        # Incremental Rescans
+        incremental_layout = QHBoxLayout()
+        incremental_label = QLabel("Incremental Rescans:")
+        self.incremental_checkbox = QCheckBox()
+        self.incremental_checkbox.setChecked(True)
+        self.incremental_checkbox.setToolTip("Reuse the previous scan for folders whose modification time has not changed. "
+                                             "Disable to force a full rescan.")
+        self.incremental_checkbox.toggled.connect(self.incremental_scans_changed.emit)
+
+        incremental_layout.addWidget(incremental_label)
+        incremental_layout.addWidget(self.incremental_checkbox)
+        incremental_layout.addStretch()
+        layout.addLayout(incremental_layout)
+
+        # Stay on One Filesystem
+        one_filesystem_layout = QHBoxLayout()
+        one_filesystem_label = QLabel("Stay on One Filesystem:")
+        self.one_filesystem_checkbox = QCheckBox()
+        self.one_filesystem_checkbox.setChecked(False)
+        self.one_filesystem_checkbox.setToolTip("Don't descend into other drives or network shares mounted below the "
+                                                "scanned folder. Pseudo filesystems like /proc are always skipped.")
+        self.one_filesystem_checkbox.toggled.connect(self.one_filesystem_changed.emit)
+
+        one_filesystem_layout.addWidget(one_filesystem_label)
+        one_filesystem_layout.addWidget(self.one_filesystem_checkbox)
+        one_filesystem_layout.addStretch()
+        layout.addLayout(one_filesystem_layout)
+
+        # Watch Mode (Linux only)
+        watch_layout = QHBoxLayout()
+        watch_label = QLabel("Watch for Changes (Linux):")
+        self.watch_checkbox = QCheckBox()
+        self.watch_checkbox.setChecked(False)
+        self.watch_checkbox.setEnabled(is_supported())
+        self.watch_checkbox.setToolTip("Keep the scan results up to date with inotify after a scan finishes.")
+        self.watch_checkbox.toggled.connect(self.watch_changes_changed.emit)
+        max_watches_label = QLabel("Max Watches:")
+        self.max_watches_spin = QSpinBox()
+        self.max_watches_spin.setRange(100, max_user_watches() or 1000000)
+        self.max_watches_spin.setSingleStep(1000)
+        self.max_watches_spin.setValue(min(DEFAULT_MAX_WATCHES, self.max_watches_spin.maximum()))
+        self.max_watches_spin.setToolTip("One watch is needed per folder. Above this limit the app falls back to "
+                                         "periodic incremental rescans.")
+        self.max_watches_spin.valueChanged.connect(self.max_watches_changed.emit)
+
+        watch_layout.addWidget(watch_label)
+        watch_layout.addWidget(self.watch_checkbox)
+        watch_layout.addWidget(max_watches_label)
+        watch_layout.addWidget(self.max_watches_spin)
+        watch_layout.addStretch()
+        layout.addLayout(watch_layout)
+
+        # Categorization Rules
+        rules_layout = QHBoxLayout()
+        rules_label = QLabel("Categorization Rules:")
+        self.edit_rules_button = QPushButton("Edit Rules File")
+        self.edit_rules_button.setToolTip("Open the rules file that assigns categories by path, name, extension, "
+                                          "size or age. Changes apply as soon as the file is saved.")
+        self.edit_rules_button.clicked.connect(self.edit_rules_requested.emit)
+        self.rules_status_label = QLabel()
+
+        rules_layout.addWidget(rules_label)
+        rules_layout.addWidget(self.edit_rules_button)
+        rules_layout.addWidget(self.rules_status_label)
+        rules_layout.addStretch()
+        layout.addLayout(rules_layout)
         
         layout.addStretch()
 
@@ -52,3 +159,54 @@ class SettingsTab(QWidget):
 
     def get_recycle_bin_enabled(self):
         return self.recycle_bin_checkbox.isChecked()
+
+    def set_scan_workers(self, workers):
+        self.scan_workers_spin.blockSignals(True)
+        self.scan_workers_spin.setValue(workers)
+        self.scan_workers_spin.blockSignals(False)
+
+    def get_scan_workers(self):
+        return self.scan_workers_spin.value()
+
+    def set_hash_workers(self, workers):
+        self.hash_workers_spin.blockSignals(True)
+        self.hash_workers_spin.setValue(workers)
+        self.hash_workers_spin.blockSignals(False)
+
+    def get_hash_workers(self):
+        return self.hash_workers_spin.value()
+
+    def set_incremental_scans(self, enabled):
+        self.incremental_checkbox.blockSignals(True)
+        self.incremental_checkbox.setChecked(enabled)
+        self.incremental_checkbox.blockSignals(False)
+
+    def get_incremental_scans(self):
+        return self.incremental_checkbox.isChecked()
+
+    def set_one_filesystem(self, enabled):
+        self.one_filesystem_checkbox.blockSignals(True)
+        self.one_filesystem_checkbox.setChecked(enabled)
+        self.one_filesystem_checkbox.blockSignals(False)
+
+    def get_one_filesystem(self):
+        return self.one_filesystem_checkbox.isChecked()
+
+    def set_watch_changes(self, enabled):
+        self.watch_checkbox.blockSignals(True)
+        self.watch_checkbox.setChecked(enabled)
+        self.watch_checkbox.blockSignals(False)
+
+    def get_watch_changes(self):
+        return self.watch_checkbox.isChecked()
+
+    def set_max_watches(self, max_watches):
+        self.max_watches_spin.blockSignals(True)
+        self.max_watches_spin.setValue(max_watches)
+        self.max_watches_spin.blockSignals(False)
+
+    def get_max_watches(self):
+        return self.max_watches_spin.value()
+
+    def set_rules_status(self, text):
+        self.rules_status_label.setText(text)